@@ -0,0 +1,9 @@
+"""
+Benchmarks for the Reddit Persona Analyzer.
+
+Run from the repository root:
+
+    python -m benchmarks.suite            # analyzer and formatter hot paths
+    python -m benchmarks.bench_citations  # citations vs. the original scan
+    python -m benchmarks.bench_records    # memory per item, dicts vs. records
+"""
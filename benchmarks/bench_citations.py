@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Benchmark PersonaAnalyzer._add_citations against the original linear scan.
+
+Builds synthetic users of increasing size whose evidence quotes mostly
+point at late or missing items (the worst case for a first-hit scan) and
+prints the timings. The timing of the current implementation includes
+building the per-user BM25 index.
+
+Usage:
+    python -m benchmarks.bench_citations [--sizes 100 1000 10000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_user  # noqa: E402
+from src.analyzer import PersonaAnalyzer  # noqa: E402
+
+
+def make_persona(user_data, traits: int = 24, seed: int = 0):
+    """Return a raw persona whose evidence quotes are late or absent."""
+    rng = random.Random(seed)
+    comments = user_data["comments"]
+    persona = {}
+    for t in range(traits):
+        category = persona.setdefault(f"category{t % 8}", {})
+        late = comments[-1 - rng.randrange(max(1, len(comments) // 10))]["body"]
+        category[f"trait{t}"] = {
+            "description": "synthetic",
+            "evidence": [
+                " ".join(late.split()[3:9]),
+                f"zzunmatched{t} qqnothing{t} xxabsent{t}",
+            ],
+        }
+    return persona
+
+
+def legacy_add_citations(persona_raw, user_data):
+    """The original nested-loop implementation, kept as the baseline."""
+    persona_with_citations = {}
+    all_content = []
+    for post in user_data["posts"]:
+        all_content.append(
+            {
+                "type": "post",
+                "text": f"{post['title']} {post['content']}",
+                "url": post["url"],
+                "subreddit": post["subreddit"],
+            }
+        )
+    for comment in user_data["comments"]:
+        all_content.append(
+            {
+                "type": "comment",
+                "text": comment["body"],
+                "url": comment["url"],
+                "subreddit": comment["subreddit"],
+            }
+        )
+    for category, traits in persona_raw.items():
+        persona_with_citations[category] = {}
+        for trait_name, trait_info in traits.items():
+            citations = []
+            for evidence in trait_info["evidence"]:
+                for content in all_content:
+                    evidence_lower = evidence.lower()
+                    content_lower = content["text"].lower()
+                    if evidence_lower in content_lower or any(
+                        word in content_lower for word in evidence_lower.split()[:3]
+                    ):
+                        citations.append(
+                            {
+                                "text": content["text"][:200],
+                                "url": content["url"],
+                                "type": content["type"],
+                                "subreddit": content["subreddit"],
+                            }
+                        )
+                        break
+            persona_with_citations[category][trait_name] = {
+                "description": trait_info.get("description", ""),
+                "citations": citations[:3],
+            }
+    return persona_with_citations
+
+
+def best_of(func, repeat):
+    """Return the fastest of ``repeat`` timed calls and the last result."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    parser.add_argument("--traits", type=int, default=24)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    analyzer = PersonaAnalyzer(api_key="benchmark")
+
+    print(f"{'items':>8} {'legacy (s)':>12} {'current (s)':>12} {'speedup':>8}")
+    for size in args.sizes:
+        user_data = make_user(size)
+        persona = make_persona(user_data, traits=args.traits)
+
+        legacy_time, _ = best_of(
+            lambda: legacy_add_citations(persona, user_data), args.repeat
+        )
+        current_time, _ = best_of(
+            lambda: analyzer._add_citations(persona, user_data), args.repeat
+        )
+
+        print(
+            f"{size * 2:>8} {legacy_time:>12.4f} {current_time:>12.4f} "
+            f"{legacy_time / current_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
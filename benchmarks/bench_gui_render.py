@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Measure how long rendering a large persona blocks the GUI event loop.
+
+A synthetic persona is grown until its formatted text reaches --size-kb.
+The baseline inserts the whole text into a results pane in one call, as
+the GUI used to. PersonaView renders the collapsed persona, then every
+category and every trait's citations are expanded, while a heartbeat
+callback scheduled every --tick-ms records how late the event loop runs
+it. The longest gap between heartbeats is the worst UI stall a user
+would notice.
+
+Needs a display (set DISPLAY, or run under xvfb-run on a headless box).
+The numbers are also written as JSON, with the revision and machine they
+were measured on, so they can be recorded alongside the suite results.
+
+Usage:
+    python -m benchmarks.bench_gui_render [--size-kb 1024] [--tick-ms 5]
+                                          [--output FILE]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+import tkinter as tk
+from tkinter import scrolledtext
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.suite import RESULTS_DIR, environment  # noqa: E402
+from benchmarks.synthetic import make_persona, make_user  # noqa: E402
+from gui import PersonaView  # noqa: E402
+from src.analyzer import PersonaAnalyzer  # noqa: E402
+from src.utils import format_output  # noqa: E402
+
+
+def build_persona(size_kb: int):
+    """Return ``(output_text, persona)`` with at least ``size_kb`` KiB of text."""
+    analyzer = PersonaAnalyzer.__new__(PersonaAnalyzer)
+    user_data = make_user(1000)
+    traits = 200
+    while True:
+        persona = analyzer._add_citations(make_persona(user_data, traits), user_data)
+        output_text = format_output("benchmark_user", persona)
+        if len(output_text) >= size_kb * 1024:
+            return output_text, persona
+        traits *= 2
+
+
+def baseline(root, text, output_text) -> float:
+    """Seconds the single whole-text insert blocks the event loop."""
+    start = time.perf_counter()
+    text.insert(1.0, output_text)
+    root.update()
+    return time.perf_counter() - start
+
+
+def incremental(root, text, output_text, persona, tick: float):
+    """
+    Render through PersonaView and expand everything.
+
+    Returns:
+        ``(first paint, longest stall, total)`` in seconds
+    """
+    beats = []
+
+    def heartbeat():
+        beats.append(time.perf_counter())
+        root.after(int(tick * 1000), heartbeat)
+
+    start = time.perf_counter()
+    view = PersonaView(text, output_text.partition("\n\n")[0], persona)
+    root.update()
+    first_paint = time.perf_counter() - start
+
+    heartbeat()
+    for index in range(len(view.categories)):
+        view.toggle(index)
+    while view.busy:
+        root.update()
+    for key in list(view._citations):
+        view.toggle_citations(key)
+    while view.busy:
+        root.update()
+    root.update()
+    total = time.perf_counter() - start
+
+    gaps = [later - earlier for earlier, later in zip(beats, beats[1:])]
+    return first_paint, max(gaps, default=0.0), total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--size-kb", type=int, default=1024)
+    parser.add_argument("--tick-ms", type=float, default=5.0)
+    parser.add_argument(
+        "--output",
+        help="Result file (default: benchmarks/results/gui_render-<revision>.json)",
+    )
+    args = parser.parse_args()
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        sys.exit(f"No display available ({e}); run under xvfb-run")
+    root.geometry("900x700")
+
+    output_text, persona = build_persona(args.size_kb)
+    traits = sum(len(traits) for traits in persona.values())
+    print(f"Persona: {len(output_text) / 1024:.0f} KiB, {traits} traits")
+
+    text = scrolledtext.ScrolledText(root, wrap=tk.WORD, font=("Courier", 10))
+    text.pack(fill="both", expand=True)
+    root.update()
+
+    blocked = baseline(root, text, output_text)
+    first_paint, stall, total = incremental(
+        root, text, output_text, persona, args.tick_ms / 1000
+    )
+    root.destroy()
+
+    print(f"{'renderer':<14} {'longest stall':>14} {'first paint':>12} {'total':>8}")
+    print(f"{'single insert':<14} {blocked:>13.3f}s {blocked:>11.3f}s {blocked:>7.2f}s")
+    print(
+        f"{'PersonaView':<14} {stall:>13.3f}s {first_paint:>11.3f}s {total:>7.2f}s"
+    )
+
+    env = environment()
+    report = {
+        "environment": env,
+        "persona_kib": round(len(output_text) / 1024),
+        "traits": traits,
+        "single_insert": {"longest_stall_s": blocked, "first_paint_s": blocked},
+        "persona_view": {
+            "longest_stall_s": stall,
+            "first_paint_s": first_paint,
+            "total_s": total,
+        },
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"gui_render-{env['revision'] or 'unknown'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Measure memory retained per scraped item: plain dicts vs. slot records.
+
+Fake PRAW submissions and comments are converted with the original
+dict-building code and with Post/Comment.from_praw. The sources are then
+dropped, so what remains traced is what a batch run keeps in memory per
+user: the item containers, their text and any per-item strings.
+
+Usage:
+    python -m benchmarks.bench_records [--items 10000]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_user  # noqa: E402
+from src.records import Comment, Post  # noqa: E402
+from src.utils import format_timestamp  # noqa: E402
+
+
+def legacy_post_to_dict(post):
+    """The original per-post dict, kept as the baseline."""
+    return {
+        "title": post.title,
+        "content": (post.selftext if post.is_self else "[Link Post]"),
+        "subreddit": str(post.subreddit),
+        "url": f"https://reddit.com{post.permalink}",
+        "created_utc": format_timestamp(post.created_utc),
+        "score": post.score,
+        "num_comments": post.num_comments,
+        "id": post.id,
+    }
+
+
+def legacy_comment_to_dict(comment):
+    """The original per-comment dict, kept as the baseline."""
+    return {
+        "body": comment.body,
+        "subreddit": str(comment.subreddit),
+        "url": f"https://reddit.com{comment.permalink}",
+        "created_utc": format_timestamp(comment.created_utc),
+        "score": comment.score,
+        "id": comment.id,
+        "parent_id": comment.parent_id,
+    }
+
+
+def fresh(text: str) -> str:
+    """Return an equal string that is a distinct object, as parsed JSON is."""
+    return "".join(list(text))
+
+
+def make_sources(count: int):
+    """Return PRAW-like submissions and comments, ``count`` of each."""
+    user_data = make_user(count)
+    posts = [
+        SimpleNamespace(
+            title=fresh(p["title"]),
+            selftext=fresh(p["content"]),
+            is_self=p["content"] != "[Link Post]",
+            subreddit=fresh(p["subreddit"]),
+            permalink=fresh(p["url"][len("https://reddit.com") :]),
+            created_utc=1.6e9 + i * 60.0,
+            score=p["score"],
+            num_comments=p["num_comments"],
+            id=fresh(p["id"]),
+        )
+        for i, p in enumerate(user_data["posts"])
+    ]
+    comments = [
+        SimpleNamespace(
+            body=fresh(c["body"]),
+            subreddit=fresh(c["subreddit"]),
+            permalink=fresh(c["url"][len("https://reddit.com") :]),
+            created_utc=1.6e9 + i * 60.0,
+            score=c["score"],
+            id=fresh(c["id"]),
+            parent_id=fresh(c["parent_id"]),
+        )
+        for i, c in enumerate(user_data["comments"])
+    ]
+    return posts, comments
+
+
+def retained(count: int, convert_post, convert_comment) -> int:
+    """Bytes still allocated by the converted items once sources are gone."""
+    gc.collect()
+    tracemalloc.start()
+    posts, comments = make_sources(count)
+    items = [convert_post(p) for p in posts]
+    items += [convert_comment(c) for c in comments]
+    del posts, comments
+    gc.collect()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del items
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--items", type=int, default=10000)
+    args = parser.parse_args()
+
+    # Posts and comments together make up --items
+    half = args.items // 2
+    before = retained(half, legacy_post_to_dict, legacy_comment_to_dict)
+    after = retained(half, Post.from_praw, Comment.from_praw)
+
+    print(f"{'layout':<10} {'KiB':>10} {'bytes/item':>11}")
+    print(f"{'dicts':<10} {before / 1024:>10.1f} {before / (2 * half):>11.0f}")
+    print(f"{'records':<10} {after / 1024:>10.1f} {after / (2 * half):>11.0f}")
+    print(f"Saved {1 - after / before:.0%} of retained memory")
+
+
+if __name__ == "__main__":
+    main()
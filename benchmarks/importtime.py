@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Check that cold-start imports stay lazy and under a time budget.
+
+Each command runs in a fresh interpreter with ``-X importtime``. The
+cumulative import time of every top-level module that a bare interpreter
+does not already import is added up (best of --runs, to smooth out disk
+cache noise), and the command fails the check if that exceeds
+--budget-ms or if any --forbid module (or one of its submodules) was
+imported at all.
+
+Usage:
+    python -m benchmarks.importtime [--budget-ms 150] [--runs 5]
+                                    [--forbid praw openai numpy]
+
+Exits with status 1 if any command fails the check.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COMMANDS = {
+    "main.py --help": ["main.py", "--help"],
+    "import src": ["-c", "import src"],
+    "import config": ["-c", "import config"],
+}
+
+DEFAULT_FORBIDDEN = ["praw", "prawcore", "openai", "numpy", "tiktoken", "asyncio"]
+
+
+def import_times(arguments: List[str]) -> Dict[str, Tuple[int, int]]:
+    """
+    Run Python with ``-X importtime`` and parse its report.
+
+    Returns:
+        Module name -> (cumulative microseconds, nesting depth)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *arguments],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    modules = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules[name.strip()] = (int(cumulative), depth)
+    return modules
+
+
+def measure(arguments: List[str], baseline: set, runs: int) -> Tuple[float, set]:
+    """Return the best import time (ms) and the modules imported."""
+    best = None
+    imported = set()
+    for _ in range(runs):
+        modules = import_times(arguments)
+        imported = set(modules)
+        total = sum(
+            cumulative
+            for name, (cumulative, depth) in modules.items()
+            if depth <= 1 and name not in baseline
+        )
+        best = total if best is None else min(best, total)
+    return best / 1000, imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--forbid", nargs="*", default=DEFAULT_FORBIDDEN)
+    args = parser.parse_args()
+
+    # Modules every interpreter imports at startup (site, encodings, ...)
+    baseline = set(import_times(["-c", "pass"]))
+
+    failed = False
+    print(f"{'command':<16} {'import ms':>10}  result")
+    for label, arguments in COMMANDS.items():
+        elapsed, imported = measure(arguments, baseline, args.runs)
+        problems = []
+        if elapsed > args.budget_ms:
+            problems.append(f"over the {args.budget_ms:.0f} ms budget")
+        leaked = sorted(
+            name
+            for name in args.forbid
+            if any(module.split(".")[0] == name for module in imported)
+        )
+        if leaked:
+            problems.append(f"imports {', '.join(leaked)}")
+        failed = failed or bool(problems)
+        print(f"{label:<16} {elapsed:>10.1f}  {'; '.join(problems) or 'ok'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
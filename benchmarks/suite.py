@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Time the analyzer and formatter hot paths on synthetic users.
+
+For every size, a synthetic user with that many posts and comments and a
+synthetic persona are generated from a fixed seed, so results from
+different branches are comparable. Each benchmark reports its best and
+mean wall time and its peak traced memory (from a separate run, since
+tracemalloc slows the timed code down). Results are written as JSON; pass
+a previous result file with --compare to flag regressions.
+
+Usage:
+    python -m benchmarks.suite [--sizes 10 100 1000 10000 100000]
+                               [--only add_citations format_output]
+                               [--output FILE] [--compare BASELINE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.synthetic import make_persona, make_urls, make_user  # noqa: E402
+from src.analyzer import PersonaAnalyzer  # noqa: E402
+from src.utils import extract_username_from_url, format_output  # noqa: E402
+
+BENCHMARKS = [
+    "prepare_content_summary",
+    "add_citations",
+    "fallback_persona",
+    "format_output",
+    "extract_username_from_url",
+]
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def make_cases(analyzer, size: int, traits: int, seed: int) -> Dict[str, Callable]:
+    """Build the zero-argument callables timed for one user size."""
+    user_data = make_user(size, seed=seed)
+    persona = make_persona(user_data, traits=traits, seed=seed)
+    cited = analyzer._add_citations(persona, user_data)
+    urls = make_urls(size, seed=seed)
+
+    return {
+        "prepare_content_summary": lambda: analyzer._prepare_content_summary(
+            user_data
+        ),
+        "add_citations": lambda: analyzer._add_citations(persona, user_data),
+        "fallback_persona": lambda: analyzer._generate_fallback_persona(user_data),
+        "format_output": lambda: format_output("benchmark_user", cited),
+        "extract_username_from_url": lambda: [
+            extract_username_from_url(url) for url in urls
+        ],
+    }
+
+
+def measure(func: Callable, repeat: int, max_time: float) -> Dict:
+    """
+    Time ``func`` and record its peak memory.
+
+    Runs up to ``repeat`` times, stopping early once ``max_time`` seconds
+    have been spent (at least one run always happens).
+    """
+    times = []
+    started = time.perf_counter()
+    while len(times) < repeat:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        if time.perf_counter() - started > max_time:
+            break
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "best_s": min(times),
+        "mean_s": statistics.fmean(times),
+        "runs": len(times),
+        "peak_kib": peak / 1024,
+    }
+
+
+def run_suite(
+    sizes: List[int],
+    benchmarks: List[str],
+    traits: int = 40,
+    repeat: int = 5,
+    max_time: float = 30.0,
+    seed: int = 0,
+) -> List[Dict]:
+    """Run the selected benchmarks for every size, printing as it goes."""
+    analyzer = PersonaAnalyzer(api_key="benchmark")
+    results = []
+
+    print(f"{'benchmark':<28} {'items':>8} {'best (s)':>10} {'peak (KiB)':>12}")
+    for size in sizes:
+        cases = make_cases(analyzer, size, traits, seed)
+        for name in benchmarks:
+            result = {"benchmark": name, "size": size, "items": size * 2}
+            result.update(measure(cases[name], repeat, max_time))
+            results.append(result)
+            print(
+                f"{name:<28} {result['items']:>8} {result['best_s']:>10.4f} "
+                f"{result['peak_kib']:>12.1f}"
+            )
+
+    return results
+
+
+def environment() -> Dict:
+    """Describe the machine and revision the results were produced on."""
+    try:
+        revision = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": revision,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def compare(
+    results: List[Dict], baseline: List[Dict], tolerance: float, noise_floor: float
+) -> List[str]:
+    """
+    Compare results against a baseline run.
+
+    Returns:
+        Descriptions of every benchmark that got slower or used more
+        memory than ``tolerance`` allows; timings below ``noise_floor``
+        seconds are not flagged
+    """
+    previous = {(r["benchmark"], r["size"]): r for r in baseline}
+    regressions = []
+
+    print(f"\n{'benchmark':<28} {'items':>8} {'time':>8} {'memory':>8}")
+    for result in results:
+        old = previous.get((result["benchmark"], result["size"]))
+        if old is None:
+            continue
+        time_ratio = result["best_s"] / max(old["best_s"], 1e-9)
+        memory_ratio = result["peak_kib"] / max(old["peak_kib"], 1e-9)
+        print(
+            f"{result['benchmark']:<28} {result['items']:>8} "
+            f"{time_ratio:>7.2f}x {memory_ratio:>7.2f}x"
+        )
+
+        label = f"{result['benchmark']} ({result['items']} items)"
+        slow = max(result["best_s"], old["best_s"]) >= noise_floor
+        if slow and time_ratio > 1 + tolerance:
+            regressions.append(f"{label}: {time_ratio:.2f}x slower")
+        if memory_ratio > 1 + tolerance:
+            regressions.append(f"{label}: {memory_ratio:.2f}x more memory")
+
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000, 100000]
+    )
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, default=BENCHMARKS)
+    parser.add_argument("--traits", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-time",
+        type=float,
+        default=30.0,
+        help="Stop repeating a benchmark after this many seconds",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--output", help="Result file (default: benchmarks/results/<revision>.json)"
+    )
+    parser.add_argument("--compare", metavar="BASELINE", help="Earlier result file")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="Allowed relative slowdown or memory growth (default: 0.2)",
+    )
+    parser.add_argument(
+        "--noise-floor",
+        type=float,
+        default=0.001,
+        help="Ignore timing changes of benchmarks faster than this (seconds)",
+    )
+    args = parser.parse_args()
+
+    env = environment()
+    results = run_suite(
+        args.sizes, args.only, args.traits, args.repeat, args.max_time, args.seed
+    )
+    report = {
+        "environment": env,
+        "parameters": {
+            "sizes": args.sizes,
+            "traits": args.traits,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"{env['revision'] or env['timestamp'].replace(':', '')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance, args.noise_floor)
+        if regressions:
+            print("\nRegressions:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            sys.exit(1)
+        print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Synthetic users and personas for the benchmarks."""
+
+import random
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from src.analyzer import CATEGORIES
+
+WORDS = (
+    "reddit python market coffee game river travel budget camera garden "
+    "movie guitar science bicycle kitchen history planet crypto design vote "
+    "weekend family doctor school music server update league recipe city "
+    "winter laptop running chess podcast engine forest honest weird great"
+).split()
+
+_EPOCH = datetime(2020, 1, 1)
+
+
+def _base36(number: int) -> str:
+    """Return ``number`` as a lowercase base-36 Reddit-style id."""
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while True:
+        number, rest = divmod(number, 36)
+        text = digits[rest] + text
+        if not number:
+            return text
+
+
+def make_user(size: int, seed: int = 0, subreddits: int = 40) -> Dict[str, List]:
+    """
+    Return synthetic user data shaped like ``RedditScraper.scrape_user``.
+
+    Args:
+        size: Number of posts and of comments
+        seed: Random seed, so runs on different branches see the same data
+        subreddits: Number of distinct subreddits (Zipf-like popularity)
+
+    Returns:
+        Dictionary containing ``size`` posts and ``size`` comments
+    """
+    rng = random.Random(seed)
+    names = [f"sub{i}" for i in range(subreddits)]
+    popularity = [1 / (rank + 1) for rank in range(subreddits)]
+
+    def sentence(low, high):
+        return " ".join(rng.choice(WORDS) for _ in range(rng.randint(low, high)))
+
+    def timestamp(i):
+        moment = _EPOCH + timedelta(minutes=37 * i + rng.randrange(30))
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+    posts = []
+    comments = []
+    for i in range(size):
+        post_id = _base36(1_000_000 + i)
+        subreddit = rng.choices(names, popularity)[0]
+        is_self = rng.random() < 0.7
+        posts.append(
+            {
+                "title": sentence(4, 14).capitalize(),
+                "content": sentence(10, 120) if is_self else "[Link Post]",
+                "subreddit": subreddit,
+                "url": f"https://reddit.com/r/{subreddit}/comments/{post_id}/",
+                "created_utc": timestamp(i),
+                "score": int(rng.paretovariate(1.2)) - 1,
+                "num_comments": rng.randrange(200),
+                "id": post_id,
+            }
+        )
+
+        comment_id = _base36(5_000_000 + i)
+        subreddit = rng.choices(names, popularity)[0]
+        comments.append(
+            {
+                "body": sentence(3, 80),
+                "subreddit": subreddit,
+                "url": (
+                    f"https://reddit.com/r/{subreddit}/comments/{post_id}/"
+                    f"_/{comment_id}/"
+                ),
+                "created_utc": timestamp(i),
+                "score": int(rng.paretovariate(1.5)) - 1,
+                "id": comment_id,
+                "parent_id": f"t3_{post_id}",
+            }
+        )
+
+    # Newest first, like the scraper returns them
+    posts.reverse()
+    comments.reverse()
+    return {"posts": posts, "comments": comments}
+
+
+def make_persona(user_data: Dict, traits: int = 40, seed: int = 0) -> Dict:
+    """
+    Return a raw (uncited) persona as the model would produce it.
+
+    Evidence quotes are a mix of verbatim excerpts, reworded excerpts that
+    only BM25 can place, and quotes that match nothing.
+
+    Args:
+        user_data: Synthetic user data to quote from
+        traits: Number of traits, spread over the persona categories
+        seed: Random seed
+
+    Returns:
+        ``{category: {trait: {description, evidence, confidence}}}``
+    """
+    rng = random.Random(seed)
+    texts = [post["title"] for post in user_data["posts"]]
+    texts += [comment["body"] for comment in user_data["comments"]]
+    persona = {}
+
+    for t in range(traits):
+        category = persona.setdefault(CATEGORIES[t % len(CATEGORIES)], {})
+        evidence = []
+        for _ in range(3):
+            words = rng.choice(texts).split() if texts else []
+            kind = rng.random()
+            if kind < 0.5 and len(words) >= 3:
+                start = rng.randrange(len(words) - 2)
+                evidence.append(" ".join(words[start : start + 6]))
+            elif kind < 0.8 and words:
+                rng.shuffle(words)
+                evidence.append(" ".join(words[:6]))
+            else:
+                evidence.append(f"zzunmatched{t} qqnothing{t} xxabsent{t}")
+        category[f"Trait {t}"] = {
+            "description": f"Synthetic trait {t}: " + " ".join(rng.sample(WORDS, 8)),
+            "evidence": evidence,
+            "confidence": rng.choice(["high", "medium", "low"]),
+        }
+
+    return persona
+
+
+def make_urls(count: int, seed: int = 0) -> List[str]:
+    """Return profile URLs and bare references in the formats users paste."""
+    rng = random.Random(seed)
+    formats = [
+        "https://www.reddit.com/user/{}/",
+        "https://reddit.com/u/{}",
+        "http://old.reddit.com/user/{}/comments/?sort=top",
+        "www.reddit.com/user/{}",
+        "https://www.reddit.com/r/python/comments/abc123/",
+        "not a url {}",
+    ]
+    return [
+        rng.choice(formats).format(f"user_{rng.randrange(10**6)}")
+        for _ in range(count)
+    ]
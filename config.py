@@ -1,29 +1,129 @@
 """Configuration settings for Reddit Persona Analyzer."""
 
 import os
-from dotenv import load_dotenv
 
-# Load environment variables
-load_dotenv()
-
-# Reddit API Configuration
-REDDIT_CLIENT_ID = os.getenv('REDDIT_CLIENT_ID')
-REDDIT_CLIENT_SECRET = os.getenv('REDDIT_CLIENT_SECRET')
-REDDIT_USER_AGENT = os.getenv(
-    'REDDIT_USER_AGENT',
-    'RedditPersonaAnalyzer/1.0'
-)
+# Settings read from the environment (and the .env file) on first access,
+# so importing config has no side effects: name -> (variable, default)
+_ENVIRONMENT = {
+    # Reddit API Configuration
+    'REDDIT_CLIENT_ID': ('REDDIT_CLIENT_ID', None),
+    'REDDIT_CLIENT_SECRET': ('REDDIT_CLIENT_SECRET', None),
+    'REDDIT_USER_AGENT': ('REDDIT_USER_AGENT', 'RedditPersonaAnalyzer/1.0'),
+    # OpenAI Configuration
+    'OPENAI_API_KEY': ('OPENAI_API_KEY', None),
+    # Record/Replay Fixtures ('record' or 'replay'; used by the GUI, the CLI
+    # takes --record/--replay instead)
+    'FIXTURE_MODE': ('PERSONA_FIXTURE_MODE', None),
+    'FIXTURE_DIR': ('PERSONA_FIXTURE_DIR', os.path.join('fixtures', 'default')),
+}
 
 # OpenAI Configuration
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
+OPENAI_MODEL = 'gpt-4o'
 
 # Scraping Configuration
 MAX_POSTS = 100
 MAX_COMMENTS = 200
-REQUEST_DELAY = 1  # seconds between requests
+SCRAPE_PAGE_SIZE = 100  # items per listing request (Reddit's maximum)
+SCRAPE_FETCH_THREADS = 8  # listing pages requested at once, across all users
+
+# Rate Limiting (shared by every scraper in the process; retuned at runtime
+# from Reddit's x-ratelimit-remaining / x-ratelimit-reset headers)
+RATE_LIMIT_REQUESTS = 100  # requests allowed per period
+RATE_LIMIT_PERIOD = 60  # seconds
+RATE_LIMIT_BURST = 10  # requests that may be issued back to back
+
+# Item Cache Configuration
+CACHE_DIR = '.cache'
+ITEM_CACHE_PATH = os.path.join(CACHE_DIR, 'items.sqlite3')
+ITEM_CACHE_TTL = 3600  # seconds a refreshed user is served without network
+
+# LLM Response Cache Configuration
+LLM_CACHE_PATH = os.path.join(CACHE_DIR, 'responses.sqlite3')
+LLM_CACHE_MAX_ENTRIES = 5000  # least recently used entries are evicted beyond this
+
+# Prompt Packing Configuration
+PROMPT_TOKEN_BUDGET = 6000  # tokens of user content sent to the model
+PACK_ITEM_MAX_TOKENS = 300  # longer posts/comments are truncated to this
+PACK_SUBREDDIT_DECAY = 0.85  # priority factor per item already taken from a subreddit
+STREAM_OVERSAMPLE = 2.0  # stop streaming pages once candidates fill this many budgets
+ESTIMATED_ITEM_TOKENS = 60  # average packed item size; sizes the up-front scrape
+
+# Near-Duplicate Filtering (repeated text is collapsed before packing)
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.8  # estimated Jaccard similarity of near-identical items
+DEDUP_SHINGLE_WORDS = 3  # words per shingle
+DEDUP_BANDS = 16  # LSH bands; 16 bands of 4 rows compare pairs from ~0.5 similarity
+DEDUP_ROWS = 4  # signature values per band
+
+# Local Feature Extraction (statistics computed without the model)
+FEATURES_ENABLED = True  # prepend activity statistics to the prompt content
+FEATURE_TOP_SUBREDDITS = 8  # subreddits listed with their share and mean score
+FEATURE_VOCABULARY_WORDS = 20000  # newest words sampled for vocabulary richness
+
+# Request each persona category as its own concurrent LLM call
+PARALLEL_CATEGORIES = False
+
+# OpenAI requests in flight across the whole process (batch workers, service
+# requests, map-reduce chunks and per-category calls all share these slots)
+LLM_MAX_CONCURRENCY = 8
+
+# Map-Reduce Configuration (heavy users whose corpus exceeds the token budget)
+MAP_REDUCE_ENABLED = False  # analyze the full corpus in parallel chunks
+MAP_REDUCE_WORKERS = 4  # concurrent chunk requests
+MAP_REDUCE_MAX_CHUNKS = 8  # newest chunks analyzed; bounds cost per user
+
+# Citation Configuration
+CITATION_TOP_K = 5  # BM25 candidates considered per evidence quote
+CITATION_DIVERSITY_PENALTY = 0.5  # score divisor growth per earlier citation
+CITATION_FETCH_PAGES = 2  # extra listing pages fetched for quotes with no match
+
+# Batch Configuration
+BATCH_SCRAPE_WORKERS = 4  # concurrent Reddit scrape workers
+BATCH_LLM_WORKERS = 4  # concurrent OpenAI analysis workers
+BATCH_QUEUE_SIZE = 32  # capacity of the queues between pipeline stages
+
+# GUI Configuration
+GUI_WORKERS = 2  # profiles the GUI analyzes at the same time
+
+# Service Configuration (python main.py --serve)
+SERVICE_HOST = '127.0.0.1'  # interface the persona service listens on
+SERVICE_PORT = 8765
+SERVICE_MAX_CONCURRENCY = 4  # users scraped and analyzed at the same time
+
+# Metrics Configuration
+METRICS_MAX_USERS = 1000  # most recently active users keeping a stage breakdown
 
 # Output Configuration
 OUTPUT_DIR = 'output'
+OUTPUT_INDEX_PATH = os.path.join(CACHE_DIR, 'outputs.sqlite3')  # saved-file index
+PREVIEW_CHUNK_CHARS = 65536  # characters inserted per step when showing a file
+RENDER_CHUNK_CHARS = 16384  # characters of persona traits inserted per UI tick
+
+_env_loaded = False
+
+
+def load_env():
+    """Load the .env file into the environment, once."""
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+
+
+def __getattr__(name):
+    """Resolve environment settings on first access and keep the value."""
+    if name not in _ENVIRONMENT:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    load_env()
+    variable, default = _ENVIRONMENT[name]
+    value = os.getenv(variable, default)
+    globals()[name] = value
+    return value
+
 
-# Ensure output directory exists
-os.makedirs(OUTPUT_DIR, exist_ok=True)
\ No newline at end of file
+def ensure_output_dir():
+    """Create OUTPUT_DIR if it does not exist yet and return it."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    return OUTPUT_DIR
\ No newline at end of file
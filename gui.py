@@ -6,20 +6,39 @@ using web scraping and AI-powered analysis.
 """
 
 import os
+import sqlite3
 import sys
 import threading
+from collections import deque
+from contextlib import nullcontext
 from datetime import datetime
-from pathlib import Path
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog
+from tkinter import font as tkfont
 
 # Add project root to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from src.scraper import RedditScraper
+from src.store import ItemStore
 from src.analyzer import PersonaAnalyzer
-from src.utils import extract_username_from_url, format_output, sanitize_filename
+from src.cache import ResponseCache
+from src.jobs import CANCELLED, DONE, FAILED, JobCancelled, JobQueue
+from src.fixtures import (
+    RecordingOpenAIClient,
+    RecordingScraper,
+    ReplayOpenAIClient,
+    ReplayScraper,
+)
+from src.output_index import OutputIndex
+from src.profiling import Profiler
+from src.utils import (
+    extract_username_from_url,
+    format_output,
+    format_trait,
+    sanitize_filename,
+)
 import config
 
 
@@ -50,6 +69,31 @@ class RedditPersonaAnalyzerGUI:
         self.url_var = tk.StringVar()
         self.status_var = tk.StringVar(value="Ready to analyze")
         self.progress_var = tk.DoubleVar()
+        self.profile_var = tk.BooleanVar(value=False)
+
+        # Result tabs: notebook tab id -> (text widget, job or None)
+        self._tabs = {}
+        self._job_tabs = {}
+        # Jobs whose final result has been put in their tab
+        self._settled = set()
+        # Text widget -> token of the file load currently filling it
+        self._loads = {}
+        # Text widget -> PersonaView of a finished job
+        self._views = {}
+
+        self.index = OutputIndex()
+
+        # Scraper and analyzer shared by every job, created on first use
+        self._clients = None
+        self._clients_lock = threading.Lock()
+        # Profiler state (tracemalloc, span listeners) is process-wide
+        self._profile_lock = threading.Lock()
+
+        self.jobs = JobQueue(
+            self._run_job,
+            on_update=lambda job: self.root.after(0, self._refresh_job, job),
+        )
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
 
         # Create GUI
         self.create_widgets()
@@ -82,6 +126,7 @@ class RedditPersonaAnalyzerGUI:
 
         self._create_input_section(main_container)
         self._create_progress_section(main_container)
+        self._create_jobs_section(main_container)
         self._create_results_section(main_container)
         self._create_buttons_section(main_container)
 
@@ -122,6 +167,16 @@ class RedditPersonaAnalyzerGUI:
         )
         self.analyze_btn.pack(side="left")
 
+        # Profiling toggle
+        self.profile_check = tk.Checkbutton(
+            input_frame,
+            text="Profile run",
+            variable=self.profile_var,
+            bg=self.bg_color,
+            font=("Arial", 10),
+        )
+        self.profile_check.pack(side="left", padx=(10, 0))
+
         # Example Buttons
         self._create_example_buttons(input_frame)
 
@@ -172,9 +227,49 @@ class RedditPersonaAnalyzerGUI:
         )
         self.status_label.pack(pady=(5, 0))
 
+    def _create_jobs_section(self, parent):
+        """
+        Create the job list with its cancel button.
+
+        Args:
+            parent: The parent widget container.
+        """
+        jobs_frame = tk.LabelFrame(
+            parent,
+            text="Jobs",
+            font=("Arial", 12, "bold"),
+            bg=self.bg_color,
+            padx=10,
+            pady=5,
+        )
+        jobs_frame.pack(fill="x", pady=(0, 10))
+
+        self.jobs_tree = ttk.Treeview(
+            jobs_frame,
+            columns=("user", "state", "status"),
+            show="headings",
+            height=4,
+            selectmode="browse",
+        )
+        self.jobs_tree.heading("user", text="User")
+        self.jobs_tree.heading("state", text="State")
+        self.jobs_tree.heading("status", text="Status")
+        self.jobs_tree.column("user", width=150, stretch=False)
+        self.jobs_tree.column("state", width=80, stretch=False)
+        self.jobs_tree.pack(side="left", fill="x", expand=True)
+        self.jobs_tree.bind("<<TreeviewSelect>>", self._on_job_selected)
+
+        tk.Button(
+            jobs_frame,
+            text="⏹ Cancel Job",
+            command=self.cancel_job,
+            font=("Arial", 10),
+            cursor="hand2",
+        ).pack(side="left", padx=(10, 0))
+
     def _create_results_section(self, parent):
         """
-        Create the results display section.
+        Create the results display section, one tab per job.
 
         Args:
             parent: The parent widget container.
@@ -189,10 +284,35 @@ class RedditPersonaAnalyzerGUI:
         )
         results_frame.pack(fill="both", expand=True)
 
-        self.results_text = scrolledtext.ScrolledText(
-            results_frame, wrap=tk.WORD, font=("Courier", 10), height=20
+        self.results_notebook = ttk.Notebook(results_frame)
+        self.results_notebook.pack(fill="both", expand=True)
+        self.results_notebook.bind("<<NotebookTabChanged>>", self._on_tab_changed)
+
+    def _new_tab(self, title, job=None):
+        """
+        Add and select a result tab.
+
+        Args:
+            title: Tab label.
+            job: The job whose results the tab shows, if any.
+
+        Returns:
+            The tab's text widget.
+        """
+        text = scrolledtext.ScrolledText(
+            self.results_notebook, wrap=tk.WORD, font=("Courier", 10), height=20
         )
-        self.results_text.pack(fill="both", expand=True)
+        self.results_notebook.add(text, text=title)
+        tab = str(text)
+        self._tabs[tab] = (text, job)
+        if job is not None:
+            self._job_tabs[job.id] = tab
+        self.results_notebook.select(text)
+        return text
+
+    def _current_tab(self):
+        """Return ``(text widget, job)`` of the selected tab, or (None, None)."""
+        return self._tabs.get(self.results_notebook.select(), (None, None))
 
     def _create_buttons_section(self, parent):
         """
@@ -218,8 +338,8 @@ class RedditPersonaAnalyzerGUI:
         # Clear Button
         tk.Button(
             buttons_frame,
-            text="🗑️ Clear",
-            command=self.clear_results,
+            text="🗑️ Close Tab",
+            command=self.close_tab,
             font=("Arial", 10),
             cursor="hand2",
         ).pack(side="left", padx=(0, 10))
@@ -241,6 +361,12 @@ class RedditPersonaAnalyzerGUI:
 
     def check_api_keys(self):
         """Check if API keys are properly configured."""
+        if config.FIXTURE_MODE == "replay":
+            self.api_status_label.config(
+                text=f"▶ Replaying fixtures from {config.FIXTURE_DIR}", fg="blue"
+            )
+            return
+
         issues = []
 
         if (
@@ -284,7 +410,7 @@ class RedditPersonaAnalyzerGUI:
         self.url_var.set(f"https://www.reddit.com/user/{username}/")
 
     def analyze_profile(self):
-        """Analyze Reddit profile in a separate thread."""
+        """Queue an analysis of the entered profile."""
         url = self.url_var.get().strip()
 
         if not url:
@@ -298,93 +424,241 @@ class RedditPersonaAnalyzerGUI:
             )
             return
 
-        # Disable button during analysis
-        self.analyze_btn.config(state="disabled")
-        self.save_btn.config(state="disabled")
-        self.results_text.delete(1.0, tk.END)
+        job = self.jobs.submit(username, self.profile_var.get())
+        self.jobs_tree.insert("", tk.END, iid=str(job.id))
+        self._new_tab(f"u/{username}", job)
+        self._refresh_job(job)
 
-        # Start analysis in separate thread
-        thread = threading.Thread(target=self._analyze_profile_thread, args=(username,))
-        thread.daemon = True
-        thread.start()
+    def cancel_job(self):
+        """Cancel the job selected in the job list, or that of the current tab."""
+        selection = self.jobs_tree.selection()
+        if selection:
+            job = self.jobs.jobs[int(selection[0]) - 1]
+        else:
+            job = self._current_tab()[1]
+        if job is not None and job.active:
+            self.jobs.cancel(job)
 
-    def _analyze_profile_thread(self, username):
+    def _run_job(self, job):
         """
-        Perform analysis in separate thread.
+        Perform one analysis on a worker thread of the job queue.
 
         Args:
-            username: The Reddit username to analyze.
-        """
-        try:
-            # Update progress
-            self.update_progress(10, "Initializing Reddit scraper...")
-            scraper = RedditScraper()
-
-            # Scrape user data
-            self.update_progress(30, f"Scraping posts and comments for u/{username}...")
-            user_data = scraper.scrape_user(username)
-
-            # Show statistics
-            stats = (
-                f"Found {len(user_data['posts'])} posts and "
-                f"{len(user_data['comments'])} comments\n"
-            )
-            self.update_progress(50, stats)
-
-            # Analyze user data
-            self.update_progress(70, "Analyzing user data with AI...")
-            analyzer = PersonaAnalyzer()
-            persona = analyzer.analyze_user(user_data)
-
-            # Format output
-            self.update_progress(90, "Formatting results...")
-            output_text = format_output(username, persona)
-
-            # Save to file
-            filename = f"{sanitize_filename(username)}.txt"
-            output_path = os.path.join(config.OUTPUT_DIR, filename)
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write(output_text)
+            job: The job to run; progress is reported through it, and
+                cancellation takes effect between pages, stages and traits.
 
-            # Display results
-            self.update_progress(100, f"Analysis complete! Saved to {filename}")
-            self.display_results(output_text)
-
-            # Enable save button
-            self.root.after(0, lambda: self.save_btn.config(state="normal"))
-
-        except Exception as e:
-            error_msg = str(e)
-            self.update_progress(0, f"Error: {error_msg}")
+        Returns:
+            ``(output_text, persona)``: the formatted and the raw persona.
+        """
+        username = job.username
+        job.update(10, "Initializing Reddit scraper...")
+        scraper, analyzer = self._get_clients()
+
+        # One profiled run at a time; other jobs keep running meanwhile
+        lock = self._profile_lock if job.profiling else nullcontext()
+        with lock:
+            profiler = Profiler(username) if job.profiling else nullcontext()
+            with profiler:
+                # Scrape user data, packing each page as it arrives
+                job.update(30, f"Scraping posts and comments for u/{username}...")
+                pages = scraper.iter_pages(username)
+                try:
+                    user_data, content_summary, corpus = analyzer.consume_pages(
+                        username,
+                        pages,
+                        progress=lambda count: job.update(
+                            min(30 + count // 50, 49),
+                            f"Scraping u/{username}... {count} items so far",
+                        ),
+                    )
+                except JobCancelled:
+                    # Stop paging; the pages read so far are stored
+                    pages.close()
+                    raise
+
+                try:
+                    # Show statistics
+                    job.update(
+                        50,
+                        f"Found {len(user_data['posts'])} posts and "
+                        f"{len(user_data['comments'])} comments",
+                    )
+
+                    # Analyze user data
+                    job.update(70, "Analyzing user data with AI...")
+                    persona = self._stream_persona(
+                        job, analyzer, user_data, content_summary, corpus
+                    )
+                finally:
+                    corpus.close()
+
+                # Format output
+                job.update(90, "Formatting results...")
+                output_text = format_output(username, persona)
+
+                # Save to file
+                filename = f"{sanitize_filename(username)}.txt"
+                output_path = os.path.join(config.ensure_output_dir(), filename)
+                with open(output_path, "w", encoding="utf-8") as f:
+                    f.write(output_text)
+                self.index.record(output_path, username, persona)
+
+        job.update(
+            100,
+            f"Analysis complete! Saved to {filename} | {analyzer.cache.summary()}",
+        )
+        if job.profiling:
             self.root.after(
-                0, lambda msg=error_msg: messagebox.showerror("Analysis Error", msg)
+                0,
+                lambda: messagebox.showinfo("Profile Written", profiler.summary()),
             )
+        return output_text, persona
+
+    def _get_clients(self):
+        """Return the scraper and analyzer shared by all jobs."""
+        with self._clients_lock:
+            if self._clients is None:
+                self._clients = (self._create_scraper(), self._create_analyzer())
+            return self._clients
+
+    def _create_scraper(self):
+        """Create the scraper, honouring config.FIXTURE_MODE."""
+        if config.FIXTURE_MODE == "replay":
+            return ReplayScraper(config.FIXTURE_DIR)
+        scraper = RedditScraper(store=ItemStore())
+        if config.FIXTURE_MODE == "record":
+            scraper = RecordingScraper(scraper, config.FIXTURE_DIR)
+        return scraper
+
+    def _create_analyzer(self):
+        """Create the analyzer, honouring config.FIXTURE_MODE."""
+        if config.FIXTURE_MODE == "replay":
+            client = ReplayOpenAIClient(config.FIXTURE_DIR)
+            return PersonaAnalyzer(client=client, cache=ResponseCache())
+        analyzer = PersonaAnalyzer(cache=ResponseCache())
+        if config.FIXTURE_MODE == "record":
+            analyzer.client = RecordingOpenAIClient(analyzer.client, config.FIXTURE_DIR)
+        return analyzer
+
+    def _stream_persona(
+        self, job, analyzer, user_data, content_summary=None, corpus=None
+    ):
+        """
+        Show persona traits in the job's tab as the model produces them.
+
+        Args:
+            job: The job the persona belongs to.
+            analyzer: The PersonaAnalyzer to stream from.
+            user_data: Scraped user data to analyze.
+            content_summary: Packed prompt content from consume_pages.
+            corpus: Citation corpus from consume_pages.
+
+        Returns:
+            The finished persona dictionary.
+        """
+        category = None
+        traits_shown = 0
+        events = analyzer.stream_user(user_data, content_summary, corpus)
+        try:
+            for event in events:
+                job.check()
+                if event["type"] == "persona":
+                    return event["persona"]
+
+                lines = []
+                if event["category"] != category:
+                    category = event["category"]
+                    lines.append(f"\n{category.upper()}")
+                lines.extend(format_trait(event["trait"], event["info"]))
+                self.append_results(job, "\n".join(lines) + "\n")
+
+                traits_shown += 1
+                job.update(
+                    min(70 + traits_shown, 89),
+                    f"Analyzing user data with AI... {traits_shown} traits so far",
+                )
         finally:
-            self.root.after(0, lambda: self.analyze_btn.config(state="normal"))
+            # Stops the model stream if the job was cancelled
+            events.close()
 
-    def update_progress(self, value, message):
+    def _refresh_job(self, job):
         """
-        Update progress bar and status message.
+        Show a job's latest state; runs on the UI thread.
 
         Args:
-            value: Progress value (0-100).
-            message: Status message to display.
+            job: The job that changed.
         """
-        self.root.after(0, lambda: self.progress_var.set(value))
-        self.root.after(0, lambda: self.status_var.set(message))
+        if self.jobs_tree.exists(str(job.id)):
+            self.jobs_tree.item(
+                str(job.id), values=(f"u/{job.username}", job.state, job.message)
+            )
+
+        tab = self._job_tabs.get(job.id)
+        if tab in self._tabs and not job.active and job.id not in self._settled:
+            self._settled.add(job.id)
+            text = self._tabs[tab][0]
+            if job.state == DONE:
+                # Replaces the streamed traits with a collapsible view
+                output_text, persona = job.result
+                header = output_text.partition("\n\n")[0]
+                self._views[tab] = PersonaView(text, header, persona)
+            elif job.state == CANCELLED:
+                text.insert(tk.END, "\n[Analysis cancelled]\n")
+            elif job.state == FAILED:
+                messagebox.showerror("Analysis Error", job.error)
+
+        if self._current_tab()[1] is job:
+            self._show_status(job)
+
+    def _show_status(self, job):
+        """Point the progress bar and buttons at the job of the current tab."""
+        text, _ = self._current_tab()
+        if job is None:
+            self.progress_var.set(0)
+            self.status_var.set("Ready to analyze")
+        else:
+            self.progress_var.set(job.progress)
+            self.status_var.set(job.message)
+        has_text = text is not None and (job is None or job.state == DONE)
+        self.save_btn.config(state="normal" if has_text else "disabled")
+
+    def _on_tab_changed(self, _event=None):
+        """Follow the selected result tab with the status widgets."""
+        self._show_status(self._current_tab()[1])
+
+    def _on_job_selected(self, _event=None):
+        """Bring up the result tab of the job selected in the job list."""
+        selection = self.jobs_tree.selection()
+        if not selection:
+            return
+        tab = self._job_tabs.get(int(selection[0]))
+        if tab in self._tabs:
+            self.results_notebook.select(tab)
 
-    def display_results(self, text):
+    def append_results(self, job, text):
         """
-        Display results in text area.
+        Append partial results to the end of a job's tab.
 
         Args:
-            text: The text content to display.
+            job: The job the text belongs to.
+            text: The text content to append.
         """
-        self.root.after(0, lambda: self.results_text.insert(1.0, text))
+
+        def append():
+            tab = self._job_tabs.get(job.id)
+            if tab in self._tabs:
+                self._tabs[tab][0].insert(tk.END, text)
+
+        self.root.after(0, append)
 
     def save_analysis(self):
         """Save analysis to a custom location."""
-        text = self.results_text.get(1.0, tk.END).strip()
+        widget, job = self._current_tab()
+        if job is not None and job.state == DONE:
+            # The widget only holds the categories expanded so far
+            text = job.result[0]
+        else:
+            text = widget.get(1.0, tk.END).strip() if widget is not None else ""
         if not text:
             messagebox.showwarning("Warning", "No analysis to save")
             return
@@ -403,58 +677,98 @@ class RedditPersonaAnalyzerGUI:
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to save file: {str(e)}")
 
-    def clear_results(self):
-        """Clear all results from the display."""
-        self.results_text.delete(1.0, tk.END)
-        self.progress_var.set(0)
-        self.status_var.set("Ready to analyze")
-        self.save_btn.config(state="disabled")
+    def close_tab(self):
+        """Close the current result tab, cancelling its job if still running."""
+        text, job = self._current_tab()
+        if text is None:
+            return
+        if job is not None:
+            if job.active:
+                self.jobs.cancel(job)
+            del self._job_tabs[job.id]
+        del self._tabs[str(text)]
+        self._loads.pop(str(text), None)
+        view = self._views.pop(str(text), None)
+        if view is not None:
+            view.stop()
+        self.results_notebook.forget(text)
+        text.destroy()
+        self._on_tab_changed()
+
+    def on_close(self):
+        """Cancel outstanding jobs and close the window."""
+        self.jobs.shutdown()
+        self.root.destroy()
 
     def view_saved_analyses(self):
-        """Open window to view previously saved analyses."""
+        """Open a searchable browser of previously saved analyses."""
         saved_window = tk.Toplevel(self.root)
         saved_window.title("Saved Analyses")
-        saved_window.geometry("600x400")
+        saved_window.geometry("900x500")
+
+        # Search box
+        search_var = tk.StringVar()
+        search_frame = tk.Frame(saved_window)
+        search_frame.pack(fill="x", padx=10, pady=(10, 0))
+        tk.Label(search_frame, text="Search:", font=("Arial", 11)).pack(side="left")
+        search_entry = tk.Entry(
+            search_frame, textvariable=search_var, font=("Arial", 11)
+        )
+        search_entry.pack(side="left", fill="x", expand=True, padx=(5, 10))
+        count_label = tk.Label(search_frame, text="", font=("Arial", 10))
+        count_label.pack(side="right")
+
+        # File list next to a preview of the selected file
+        panes = tk.PanedWindow(saved_window, orient=tk.HORIZONTAL)
+        panes.pack(fill="both", expand=True, padx=10, pady=10)
+        files = VirtualList(
+            panes,
+            fetch=lambda offset, limit: self.index.page(
+                search_var.get(), offset, limit
+            ),
+            render=_describe_analysis,
+            font=("Arial", 11),
+        )
+        preview = scrolledtext.ScrolledText(
+            panes, wrap=tk.WORD, font=("Courier", 10), width=50
+        )
+        panes.add(files, minsize=250)
+        panes.add(preview, minsize=200)
 
-        # List frame
-        list_frame = tk.Frame(saved_window)
-        list_frame.pack(fill="both", expand=True, padx=10, pady=10)
+        def requery():
+            """Show the first page of files matching the search."""
+            if not saved_window.winfo_exists():
+                return
+            total = self.index.count(search_var.get())
+            count_label.config(text=f"{total} analyses")
+            files.reset(total)
 
-        # Listbox with scrollbar
-        scrollbar = tk.Scrollbar(list_frame)
-        scrollbar.pack(side="right", fill="y")
+        # Requery once typing pauses rather than on every keystroke
+        pending = []
 
-        listbox = tk.Listbox(
-            list_frame, yscrollcommand=scrollbar.set, font=("Arial", 11), height=15
-        )
-        listbox.pack(side="left", fill="both", expand=True)
-        scrollbar.config(command=listbox.yview)
+        def on_search(*_args):
+            while pending:
+                saved_window.after_cancel(pending.pop())
+            pending.append(saved_window.after(200, requery))
 
-        # Load saved files
-        output_files = sorted(
-            Path("output").glob("*.txt"), key=os.path.getmtime, reverse=True
-        )
+        search_var.trace_add("write", on_search)
 
-        file_paths = []
-        for file_path in output_files:
-            mod_time = datetime.fromtimestamp(os.path.getmtime(file_path))
-            display_text = (
-                f"{file_path.stem} - " f"{mod_time.strftime('%Y-%m-%d %H:%M')}"
-            )
-            listbox.insert(tk.END, display_text)
-            file_paths.append(file_path)
+        def show_preview(_event=None):
+            """Load the selected analysis into the preview pane."""
+            row = files.selected()
+            if row:
+                self._load_file(self.index.file_path(row["name"]), preview)
+
+        files.listbox.bind("<<ListboxSelect>>", show_preview, add="+")
 
         # View button
         def view_selected():
-            """View the selected saved analysis."""
-            selection = listbox.curselection()
-            if selection:
-                file_path = file_paths[selection[0]]
-                with open(file_path, "r", encoding="utf-8") as f:
-                    content = f.read()
-                self.results_text.delete(1.0, tk.END)
-                self.results_text.insert(1.0, content)
-                self.save_btn.config(state="normal")
+            """Open the selected saved analysis in a result tab."""
+            row = files.selected()
+            if row:
+                text = self._new_tab(row["username"])
+                self._load_file(self.index.file_path(row["name"]), text)
+                self._on_tab_changed()
                 saved_window.destroy()
 
         tk.Button(
@@ -465,7 +779,385 @@ class RedditPersonaAnalyzerGUI:
             bg=self.reddit_orange,
             fg="white",
             cursor="hand2",
-        ).pack(pady=10)
+        ).pack(pady=(0, 10))
+
+        # Show the index as it is, then bring it up to date in the background
+        requery()
+        search_entry.focus_set()
+
+        def sync():
+            try:
+                self.index.refresh()
+            except (OSError, sqlite3.Error) as e:
+                print(f"Error indexing saved analyses: {e}")
+            self.root.after(0, requery)
+
+        threading.Thread(target=sync, daemon=True).start()
+
+    def _load_file(self, path, text):
+        """
+        Fill a text widget with a file, read in chunks off the UI thread.
+
+        Each chunk is inserted before the next is read, so the UI stays
+        responsive while large files load. Starting another load into the
+        same widget abandons the previous one.
+
+        Args:
+            path: The file to show.
+            text: The text widget to fill.
+        """
+        key = str(text)
+        token = object()
+        self._loads[key] = token
+        text.delete(1.0, tk.END)
+
+        def current():
+            return self._loads.get(key) is token
+
+        def insert(chunk, inserted):
+            if current() and text.winfo_exists():
+                text.insert(tk.END, chunk)
+            inserted.set()
+
+        def read():
+            try:
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    while current():
+                        chunk = f.read(config.PREVIEW_CHUNK_CHARS)
+                        if not chunk:
+                            break
+                        inserted = threading.Event()
+                        self.root.after(0, insert, chunk, inserted)
+                        while current() and not inserted.wait(0.5):
+                            pass
+            except OSError as e:
+                self.root.after(
+                    0, insert, f"Could not read {path}: {e}", threading.Event()
+                )
+
+        threading.Thread(target=read, daemon=True).start()
+
+
+class PersonaView:
+    """
+    Collapsible, incrementally rendered persona in a text widget.
+
+    Only the header and one line per category are inserted up front.
+    Clicking a category renders its traits, and clicking a trait's link
+    renders its citations; either is inserted in chunks of about
+    ``config.RENDER_CHUNK_CHARS`` characters, one chunk per event-loop
+    tick, so even a multi-megabyte persona never blocks the UI. Collapsing
+    hides the rendered lines without deleting them.
+    """
+
+    def __init__(self, text, header, persona):
+        """
+        Replace the widget's content with the collapsed persona.
+
+        Args:
+            text: The text widget to render into.
+            header: Title lines shown above the categories.
+            persona: The persona dictionary to show.
+        """
+        self.text = text
+        self.categories = list(persona.items())
+        # Pending insertions: (mark, [(chars, tags), ...], callback)
+        self._queue = deque()
+        self._after = None
+        self._rendered = set()
+        self._shown = set()
+        # Trait key -> (category key, citations); category key -> trait keys
+        self._citations = {}
+        self._traits = {}
+
+        text.delete(1.0, tk.END)
+        text.tag_configure("heading", font=("Courier", 10, "bold"))
+        text.tag_configure("link", foreground="blue", underline=True)
+        for name in ("heading", "link"):
+            text.tag_bind(name, "<Enter>", lambda _event: text.config(cursor="hand2"))
+            text.tag_bind(name, "<Leave>", lambda _event: text.config(cursor=""))
+
+        text.insert(tk.END, f"{header}\n(click a category to expand it)\n")
+        for index, (category, traits) in enumerate(self.categories):
+            count = len(traits) if isinstance(traits, dict) else 1
+            key = f"category{index}"
+            text.insert(
+                tk.END,
+                "\n",
+                (),
+                "▶",
+                ("heading", key, f"{key}.closed"),
+                "▼",
+                ("heading", key, f"{key}.open"),
+                f" {category.upper()} ({count} traits)",
+                ("heading", key),
+                "\n",
+                (),
+            )
+            text.mark_set(key, "end-1c")
+            text.mark_gravity(key, "left")
+            text.tag_configure(f"{key}.open", elide=True)
+            text.tag_bind(key, "<Button-1>", lambda _e, i=index: self.toggle(i))
+
+        # Set only now so the headings above stay after the marks
+        for index in range(len(self.categories)):
+            text.mark_gravity(f"category{index}", "right")
+
+    @property
+    def busy(self):
+        """Whether insertions are still pending."""
+        return bool(self._queue)
+
+    def stop(self):
+        """Drop pending insertions, e.g. when the widget goes away."""
+        self._queue.clear()
+        if self._after is not None:
+            self.text.after_cancel(self._after)
+            self._after = None
+
+    def toggle(self, index):
+        """Expand or collapse the category at ``index``."""
+        key = f"category{index}"
+        if key not in self._rendered:
+            self._rendered.add(key)
+            self._traits[key] = []
+            category, traits = self.categories[index]
+            if not isinstance(traits, dict):
+                self._enqueue(key, [(f"{traits}\n", (f"{key}.body",))])
+            else:
+                for number, (trait, info) in enumerate(traits.items()):
+                    self._enqueue_trait(key, f"trait{index}_{number}", trait, info)
+
+        shown = self._flip(key)
+        self.text.tag_configure(f"{key}.body", elide=not shown)
+        self.text.tag_configure(f"{key}.open", elide=not shown)
+        self.text.tag_configure(f"{key}.closed", elide=shown)
+        for trait in self._traits[key]:
+            self._show_citations(key, trait)
+        return "break"
+
+    def toggle_citations(self, key):
+        """Show or hide the citations of the trait ``key``."""
+        category, citations = self._citations[key]
+        if key not in self._rendered:
+            self._rendered.add(key)
+            segments = []
+            tags = (f"{key}.body",)
+            for citation in citations:
+                segments.append((f"    - {citation['text'][:100]}...\n", tags))
+                segments.append((f"      Link: {citation['url']}\n", tags))
+            self._enqueue(key, segments)
+
+        self._flip(key)
+        self._show_citations(category, key)
+        return "break"
+
+    def _flip(self, key):
+        """Toggle whether ``key`` is expanded; return the new state."""
+        if key in self._shown:
+            self._shown.discard(key)
+            return False
+        self._shown.add(key)
+        return True
+
+    def _show_citations(self, category, key):
+        """
+        Elide a trait's citation lines and links to match its state.
+
+        Tags are set explicitly from both the category's and the trait's
+        state, since a tag can only hide text, not override another tag
+        that hides it.
+        """
+        visible = category in self._shown
+        expanded = visible and key in self._shown
+        self.text.tag_configure(f"{key}.body", elide=not expanded)
+        self.text.tag_configure(f"{key}.open", elide=not expanded)
+        self.text.tag_configure(f"{key}.closed", elide=not visible or expanded)
+
+    def _enqueue_trait(self, category, key, trait, info):
+        tags = (f"{category}.body",)
+        segments = [(f"\n• {trait}\n", tags)]
+        if "description" in info:
+            segments.append((f"  {info['description']}\n", tags))
+
+        callback = None
+        citations = info.get("citations")
+        if citations:
+            segments += [
+                ("  ", tags),
+                (f"[show {len(citations)} citations]", ("link", key, f"{key}.closed")),
+                ("[hide citations]", ("link", key, f"{key}.open")),
+                ("\n", tags),
+            ]
+            self._citations[key] = (category, citations)
+
+            def callback():
+                # Citations go right below the link line
+                self.text.mark_set(key, category)
+                self.text.mark_gravity(key, "left")
+                self._traits[category].append(key)
+                self._show_citations(category, key)
+                self.text.tag_bind(
+                    key, "<Button-1>", lambda _event: self.toggle_citations(key)
+                )
+
+        self._enqueue(category, segments, callback)
+
+    def _enqueue(self, mark, segments, callback=None):
+        self._queue.append((mark, segments, callback))
+        if self._after is None:
+            self._after = self.text.after(1, self._pump)
+
+    def _pump(self):
+        """Insert queued lines until the chunk budget is used up."""
+        self._after = None
+        budget = config.RENDER_CHUNK_CHARS
+        while self._queue and budget > 0:
+            mark, segments, callback = self._queue.popleft()
+            arguments = []
+            for chars, tags in segments:
+                arguments += [chars, tags]
+                budget -= len(chars)
+            # Right gravity while inserting keeps the segments in order;
+            # category marks always have it
+            self.text.mark_gravity(mark, "right")
+            self.text.insert(mark, *arguments)
+            if not mark.startswith("category"):
+                self.text.mark_gravity(mark, "left")
+            if callback:
+                callback()
+        if self._queue:
+            self._after = self.text.after(1, self._pump)
+
+
+class VirtualList(tk.Frame):
+    """
+    Listbox that only holds the rows on screen.
+
+    Rows are fetched on demand with ``fetch(offset, limit)`` as the list
+    scrolls, so any number of rows costs one screenful of widgets.
+    """
+
+    def __init__(self, parent, fetch, render, **listbox_options):
+        """
+        Initialize the list; call ``reset`` to show rows.
+
+        Args:
+            parent: The parent widget container.
+            fetch: Called with ``(offset, limit)``; returns that page of rows.
+            render: Turns a row into its display text.
+            listbox_options: Options for the underlying listbox.
+        """
+        super().__init__(parent)
+        self.fetch = fetch
+        self.render = render
+        self.total = 0
+        self.offset = 0
+        self.rows = []
+        self._selected = None
+
+        self.scrollbar = tk.Scrollbar(self, command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+        self.listbox = tk.Listbox(self, exportselection=False, **listbox_options)
+        self.listbox.pack(side="left", fill="both", expand=True)
+        self._line_height = (
+            tkfont.Font(font=self.listbox.cget("font")).metrics("linespace") + 1
+        )
+
+        self.listbox.bind("<Configure>", lambda _event: self._render())
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+        self.listbox.bind(
+            "<MouseWheel>", lambda event: self.scroll(-3 if event.delta > 0 else 3)
+        )
+        self.listbox.bind("<Button-4>", lambda _event: self.scroll(-3))
+        self.listbox.bind("<Button-5>", lambda _event: self.scroll(3))
+        self.listbox.bind("<Up>", lambda _event: self._step(-1))
+        self.listbox.bind("<Down>", lambda _event: self._step(1))
+
+    @property
+    def visible(self):
+        """Number of rows that fit in the listbox."""
+        return max(1, self.listbox.winfo_height() // self._line_height)
+
+    def reset(self, total):
+        """
+        Show the first rows of a new result set.
+
+        Args:
+            total: Number of rows ``fetch`` can return.
+        """
+        self.total = total
+        self.offset = 0
+        self._selected = None
+        self._render()
+
+    def selected(self):
+        """Return the selected row, or None."""
+        index = self._selected
+        if index is None or not self.offset <= index < self.offset + len(self.rows):
+            return None
+        return self.rows[index - self.offset]
+
+    def scroll(self, rows):
+        """Scroll by ``rows`` rows; negative values scroll up."""
+        self.offset = max(0, min(self.offset + rows, self.total - self.visible))
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll(int(float(amount) * self.total) - self.offset)
+        else:
+            step = self.visible if unit == "pages" else 1
+            self.scroll(int(amount) * step)
+
+    def _on_select(self, _event=None):
+        selection = self.listbox.curselection()
+        if selection:
+            self._selected = self.offset + selection[0]
+
+    def _step(self, rows):
+        """Move the selection with the arrow keys, scrolling as needed."""
+        if not self.total:
+            return "break"
+        current = self.offset - 1 if self._selected is None else self._selected
+        index = max(0, min(current + rows, self.total - 1))
+        if index < self.offset:
+            self.scroll(index - self.offset)
+        elif index >= self.offset + self.visible:
+            self.scroll(index - self.offset - self.visible + 1)
+        self._selected = index
+        self._render()
+        self.listbox.event_generate("<<ListboxSelect>>")
+        return "break"
+
+    def _render(self):
+        """Fetch and show the rows of the current window."""
+        visible = self.visible
+        self.rows = self.fetch(self.offset, visible) if self.total else []
+        self.listbox.delete(0, tk.END)
+        for row in self.rows:
+            self.listbox.insert(tk.END, self.render(row))
+
+        if self._selected is not None:
+            position = self._selected - self.offset
+            if 0 <= position < len(self.rows):
+                self.listbox.selection_set(position)
+
+        if self.total:
+            first = self.offset / self.total
+            self.scrollbar.set(first, min(1.0, first + visible / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+
+def _describe_analysis(row):
+    """Render an index row as a line of the saved-analyses list."""
+    modified = datetime.fromtimestamp(row["mtime"]).strftime("%Y-%m-%d %H:%M")
+    line = f"{row['username']} - {modified} - {max(1, row['size'] // 1024)} KB"
+    if row["categories"]:
+        line += f" - {row['categories']}"
+    return line
 
 
 def main():
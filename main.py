@@ -9,10 +9,26 @@ and generating personas.
 import argparse
 import sys
 import os
+from contextlib import nullcontext
 
-from src.scraper import RedditScraper
-from src.analyzer import PersonaAnalyzer
-from src.utils import extract_username_from_url, format_output, sanitize_filename
+from src.cache import ResponseCache
+from src.fixtures import (
+    RecordingOpenAIClient,
+    RecordingScraper,
+    ReplayOpenAIClient,
+    ReplayScraper,
+)
+from src.metrics import get_registry
+from src.output_index import OutputIndex
+from src.profiling import Profiler
+from src.pipeline import BatchPipeline, read_user_list
+from src.store import ItemStore
+from src.utils import (
+    extract_username_from_url,
+    format_output,
+    format_trait,
+    sanitize_filename,
+)
 import config
 
 
@@ -27,10 +43,55 @@ def main():
     )
     parser.add_argument(
         "url",
+        nargs="?",
         help=(
             "Reddit user profile URL " "(e.g., https://www.reddit.com/user/username/)"
         ),
     )
+    parser.add_argument(
+        "--batch",
+        "-b",
+        metavar="FILE",
+        help=(
+            "Analyze every profile URL or username listed in FILE "
+            "(one per line, '-' reads from stdin)"
+        ),
+        default=None,
+    )
+    parser.add_argument(
+        "--scrape-workers",
+        type=int,
+        default=config.BATCH_SCRAPE_WORKERS,
+        help="Concurrent scrape workers in batch mode",
+    )
+    parser.add_argument(
+        "--llm-workers",
+        type=int,
+        default=config.BATCH_LLM_WORKERS,
+        help="Concurrent LLM workers in batch mode",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Run a local HTTP service that returns personas as JSON",
+    )
+    parser.add_argument(
+        "--host",
+        default=config.SERVICE_HOST,
+        help="Interface the --serve service listens on",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=config.SERVICE_PORT,
+        help="Port the --serve service listens on",
+    )
+    parser.add_argument(
+        "--service-workers",
+        type=int,
+        default=config.SERVICE_MAX_CONCURRENCY,
+        help="Users the --serve service analyzes at the same time",
+    )
     parser.add_argument(
         "--output",
         "-o",
@@ -40,9 +101,101 @@ def main():
     parser.add_argument(
         "--verbose", "-v", action="store_true", help="Enable verbose output"
     )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or update the local cache of scraped items",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Check Reddit for new items even if the cached copy is fresh",
+    )
+    parser.add_argument(
+        "--map-reduce",
+        action="store_true",
+        help=(
+            "Analyze the full history of heavy users in parallel chunks "
+            "instead of the best items that fit one prompt"
+        ),
+    )
+    parser.add_argument(
+        "--chunk-workers",
+        type=int,
+        default=config.MAP_REDUCE_WORKERS,
+        help="Concurrent chunk requests with --map-reduce",
+    )
+    parser.add_argument(
+        "--parallel-categories",
+        action="store_true",
+        help="Request each persona category as a separate concurrent LLM call",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Print each persona trait as soon as the model produces it",
+    )
+    parser.add_argument(
+        "--bypass-llm-cache",
+        action="store_true",
+        help="Always call the LLM, refreshing any cached persona response",
+    )
+
+    parser.add_argument(
+        "--record",
+        metavar="DIR",
+        help="Record scraped users and raw LLM responses into fixture DIR",
+    )
+    parser.add_argument(
+        "--replay",
+        metavar="DIR",
+        help="Serve users and LLM responses from fixture DIR (no network)",
+    )
+    parser.add_argument(
+        "--replay-latency",
+        type=float,
+        metavar="SECONDS",
+        default=0.0,
+        help="Simulated seconds per replayed scrape and LLM response",
+    )
+    parser.add_argument(
+        "--replay-error-rate",
+        type=float,
+        metavar="P",
+        default=0.0,
+        help="Probability that a replayed call raises an injected error",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="Write stage timings and counters to FILE "
+        "(Prometheus text for .prom/.txt, JSON otherwise)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Write cProfile stats, a tracemalloc report and a Chrome trace "
+        "of the run to OUTPUT_DIR/profiles/<username>/",
+    )
 
     args = parser.parse_args()
 
+    if args.serve:
+        if args.profile or args.batch:
+            parser.error("--serve cannot be combined with --profile or --batch")
+        run_service(args)
+        return
+
+    if args.batch:
+        if args.profile:
+            parser.error("--profile profiles a single user, not --batch runs")
+        run_batch(args)
+        return
+
+    if not args.url:
+        parser.error("either a profile url or --batch FILE is required")
+
     # Extract username from URL
     username = extract_username_from_url(args.url)
     if not username:
@@ -53,40 +206,56 @@ def main():
     print(f"Analyzing Reddit user: {username}")
 
     try:
-        # Initialize scraper
-        print("Initializing Reddit scraper...")
-        scraper = RedditScraper()
+        profiler = Profiler(username) if args.profile else nullcontext()
+        with profiler:
+            # Initialize scraper
+            print("Initializing Reddit scraper...")
+            scraper = create_scraper(args)
 
-        # Scrape user data
-        print(f"Scraping posts and comments for u/{username}...")
-        user_data = scraper.scrape_user(username)
+            analyzer = create_analyzer(args)
 
-        if args.verbose:
-            print(
-                f"Found {len(user_data['posts'])} posts and "
-                f"{len(user_data['comments'])} comments"
+            # Scrape user data, packing each page as it arrives
+            print(f"Scraping posts and comments for u/{username}...")
+            user_data, content_summary, corpus = analyzer.consume_pages(
+                username, scraper.iter_pages(username)
             )
 
-        # Analyze user data
-        print("Analyzing user data to build persona...")
-        analyzer = PersonaAnalyzer()
-        persona = analyzer.analyze_user(user_data)
+            if args.verbose:
+                print(
+                    f"Found {len(user_data['posts'])} posts and "
+                    f"{len(user_data['comments'])} comments"
+                )
+
+            # Analyze user data
+            print("Analyzing user data to build persona...")
+            if args.stream:
+                persona = stream_persona(analyzer, user_data, content_summary, corpus)
+            else:
+                persona = analyzer.analyze_user(user_data, content_summary, corpus)
 
-        # Format output
-        output_text = format_output(username, persona)
+            # Format output
+            output_text = format_output(username, persona)
 
-        # Determine output file path
-        if args.output:
-            output_path = args.output
-        else:
-            filename = f"{sanitize_filename(username)}.txt"
-            output_path = os.path.join(config.OUTPUT_DIR, filename)
+            # Determine output file path
+            if args.output:
+                output_path = args.output
+            else:
+                filename = f"{sanitize_filename(username)}.txt"
+                output_path = os.path.join(config.ensure_output_dir(), filename)
 
-        # Save to file
-        with open(output_path, "w", encoding="utf-8") as f:
-            f.write(output_text)
+            # Save to file
+            with open(output_path, "w", encoding="utf-8") as f:
+                f.write(output_text)
+            OutputIndex().record(output_path, username, persona)
 
         print(f"\nPersona analysis complete! " f"Output saved to: {output_path}")
+        if args.profile:
+            print(profiler.summary())
+        if args.verbose:
+            print(analyzer.cache.summary())
+            print(get_registry().summary())
+        if args.metrics:
+            get_registry().write(args.metrics)
 
         # Also print a summary to console
         if args.verbose:
@@ -107,5 +276,140 @@ def main():
         sys.exit(1)
 
 
+def stream_persona(analyzer, user_data, content_summary=None, corpus=None):
+    """Print traits as they stream in and return the finished persona."""
+    category = None
+    for event in analyzer.stream_user(user_data, content_summary, corpus):
+        if event["type"] == "persona":
+            return event["persona"]
+        if event["category"] != category:
+            category = event["category"]
+            print(f"\n{category.upper()}")
+        for line in format_trait(event["trait"], event["info"]):
+            print(line)
+        sys.stdout.flush()
+
+
+def create_scraper(args):
+    """Create the scraper, attaching the item cache unless disabled."""
+    # Imported on first use, so --help and argument errors start quickly
+    from src.scraper import RedditScraper
+
+    if args.replay:
+        return ReplayScraper(
+            args.replay,
+            latency=args.replay_latency,
+            error_rate=args.replay_error_rate,
+        )
+
+    if args.no_cache:
+        scraper = RedditScraper()
+    else:
+        store = ItemStore(ttl=0 if args.refresh else None)
+        scraper = RedditScraper(store=store)
+
+    if args.record:
+        scraper = RecordingScraper(scraper, args.record)
+    return scraper
+
+
+def create_analyzer(args):
+    """Create the analyzer with the persistent LLM response cache."""
+    # Imported on first use; the analyzer pulls in numpy
+    from src.analyzer import PersonaAnalyzer
+
+    client = None
+    if args.replay:
+        client = ReplayOpenAIClient(
+            args.replay,
+            latency=args.replay_latency,
+            error_rate=args.replay_error_rate,
+        )
+
+    analyzer = PersonaAnalyzer(
+        client=client,
+        cache=ResponseCache(),
+        bypass_cache=args.bypass_llm_cache,
+        map_reduce=args.map_reduce or None,
+        chunk_workers=args.chunk_workers,
+        parallel_categories=args.parallel_categories or None,
+    )
+
+    if args.record:
+        analyzer.client = RecordingOpenAIClient(analyzer.client, args.record)
+    return analyzer
+
+
+def run_batch(args):
+    """Analyze every user listed in ``args.batch`` through the pipeline."""
+    try:
+        scraper = create_scraper(args)
+        analyzer = create_analyzer(args)
+    except Exception as e:
+        print(f"Error initializing clients: {e}")
+        sys.exit(1)
+
+    pipeline = BatchPipeline(
+        scraper,
+        analyzer,
+        scrape_workers=args.scrape_workers,
+        llm_workers=args.llm_workers,
+        verbose=args.verbose,
+        index=OutputIndex(),
+    )
+
+    print(
+        f"Running batch with {pipeline.scrape_workers} scrape workers and "
+        f"{pipeline.llm_workers} LLM workers..."
+    )
+    if args.batch == "-":
+        stats = pipeline.run(read_user_list(sys.stdin))
+    else:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            stats = pipeline.run(read_user_list(f))
+
+    print("\n" + "=" * 50)
+    print("BATCH SUMMARY")
+    print("=" * 50)
+    print(stats.summary())
+    if hasattr(scraper, "limiter"):
+        print(scraper.limiter.summary())
+    print(analyzer.cache.summary())
+    print(get_registry().summary())
+    if args.metrics:
+        get_registry().write(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+
+    if stats.failed:
+        sys.exit(1)
+
+
+def run_service(args):
+    """Serve personas over HTTP until interrupted."""
+    # Imported on first use; aiohttp is only needed in service mode
+    from src.service import serve
+
+    try:
+        scraper = create_scraper(args)
+        analyzer = create_analyzer(args)
+    except Exception as e:
+        print(f"Error initializing clients: {e}")
+        sys.exit(1)
+
+    serve(
+        scraper,
+        analyzer,
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.service_workers,
+    )
+    if args.verbose:
+        print(analyzer.cache.summary())
+        print(get_registry().summary())
+    if args.metrics:
+        get_registry().write(args.metrics)
+        print(f"Metrics written to {args.metrics}")
+
+
 if __name__ == "__main__":
     main()
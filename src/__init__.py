@@ -1,12 +1,28 @@
 """Reddit Persona Analyzer – public package interface"""
 
-from .scraper import RedditScraper
-from .analyzer import PersonaAnalyzer
-from .utils import extract_username_from_url, format_output
-
-__all__ = [
-    "RedditScraper",
-    "PersonaAnalyzer",
-    "extract_username_from_url",
-    "format_output",
-]
+from importlib import import_module
+
+# Exported names and their modules, imported on first access so that
+# ``import src`` does not pull in praw, openai or numpy
+_EXPORTS = {
+    "RedditScraper": ".scraper",
+    "PersonaAnalyzer": ".analyzer",
+    "Post": ".records",
+    "Comment": ".records",
+    "extract_username_from_url": ".utils",
+    "format_output": ".utils",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
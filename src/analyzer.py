@@ -1,67 +1,450 @@
 """Persona analysis using LLM."""
 
 import json
-from typing import Dict
-
-from openai import OpenAI
+import math
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
 
 import config
+from .cache import ResponseCache, make_cache_key
+from .citations import CitationCorpus
+from .features import WEEKDAYS, extract_features, render_features
+from .metrics import bind_user, get_registry, inc, span, user_scope
+from .packing import IncrementalPacker, chunk_content, count_tokens, pack_content
+from .streaming import IncrementalPersonaParser
+
+MODEL = config.OPENAI_MODEL
+TEMPERATURE = 0.7
+
+# Bump whenever the prompt changes so cached responses are not reused
+PROMPT_VERSION = "1"
+
+SYSTEM_PROMPT = "You are a skilled data analyst specializing in user persona creation."
+
+# Persona categories, in the order the prompt lists them
+CATEGORIES = [
+    "demographics",
+    "interests",
+    "professional",
+    "personality",
+    "values",
+    "communication",
+    "expertise",
+    "lifestyle",
+]
+
+# What each category covers, for category-scoped prompts
+CATEGORY_GUIDANCE = {
+    "demographics": "Demographics (age range, location hints, gender if apparent)",
+    "interests": "Interests and Hobbies",
+    "professional": "Professional Background",
+    "personality": "Personality Traits",
+    "values": "Values and Beliefs",
+    "communication": "Communication Style",
+    "expertise": "Areas of Expertise",
+    "lifestyle": "Lifestyle Indicators",
+}
+
+_llm_slots = None
+_llm_slots_lock = threading.Lock()
+
+
+def get_llm_slots() -> threading.BoundedSemaphore:
+    """
+    Return the semaphore bounding LLM requests in flight in this process.
+
+    Batch workers, service requests, map-reduce chunks and per-category
+    requests all fan out on their own pools; every model call takes one
+    of these ``config.LLM_MAX_CONCURRENCY`` slots, so together they stay
+    within the provider's limits.
+    """
+    global _llm_slots
+    with _llm_slots_lock:
+        if _llm_slots is None:
+            _llm_slots = threading.BoundedSemaphore(config.LLM_MAX_CONCURRENCY)
+        return _llm_slots
+
+
+@contextmanager
+def _llm_slot() -> Iterator[None]:
+    """Hold one process-wide LLM request slot for the enclosed block."""
+    slots = get_llm_slots()
+    with span("llm.queue"):
+        slots.acquire()
+    try:
+        yield
+    finally:
+        slots.release()
+
+
+def _trait_key(name: str) -> str:
+    """Normalize a trait name so spelling variants merge together."""
+    return " ".join(name.lower().replace("_", " ").replace("-", " ").split())
+
+
+def merge_personas(partials: List[Dict], max_evidence: int = 5) -> Dict:
+    """
+    Merge partial personas from separate content chunks into one.
+
+    Traits with the same normalized name are combined: the longest
+    description wins and evidence quotes are pooled without duplicates.
+    Within a category, traits found in more chunks come first.
+
+    Args:
+        partials: Raw persona dicts as returned by the model
+        max_evidence: Evidence quotes kept per merged trait
+
+    Returns:
+        Raw persona dict in the usual category schema
+    """
+    merged = {}
+    support = Counter()
+
+    for partial in partials:
+        for category, traits in partial.items():
+            if not isinstance(traits, dict):
+                continue
+            category = category.lower()
+            bucket = merged.setdefault(category, {})
+            for trait_name, trait_info in traits.items():
+                if not isinstance(trait_info, dict):
+                    continue
+                key = _trait_key(trait_name)
+                support[(category, key)] += 1
+                trait = bucket.setdefault(
+                    key, {"name": trait_name, "description": "", "evidence": []}
+                )
+                description = trait_info.get("description", "")
+                if len(description) > len(trait["description"]):
+                    trait["description"] = description
+                for evidence in trait_info.get("evidence", []):
+                    if evidence not in trait["evidence"]:
+                        trait["evidence"].append(evidence)
+
+    ordered = [c for c in CATEGORIES if c in merged]
+    ordered += [c for c in merged if c not in CATEGORIES]
+
+    persona_raw = {}
+    for category in ordered:
+        keys = sorted(merged[category], key=lambda k: -support[(category, k)])
+        persona_raw[category] = {
+            merged[category][key]["name"]: {
+                "description": merged[category][key]["description"],
+                "evidence": merged[category][key]["evidence"][:max_evidence],
+            }
+            for key in keys
+        }
+    return persona_raw
+
+
+def _join(statistics: str, content: str) -> str:
+    """Put the statistics block (if any) ahead of the packed content."""
+    return f"{statistics}\n\n{content}" if statistics else content
 
 
 class PersonaAnalyzer:
     """Analyze Reddit user data to build persona."""
 
-    def __init__(self, api_key: str = None):
-        """Initialize analyzer with OpenAI API key."""
-        self.client = OpenAI(api_key=api_key or config.OPENAI_API_KEY)
+    def __init__(
+        self,
+        api_key: str = None,
+        cache: ResponseCache = None,
+        bypass_cache: bool = False,
+        token_budget: int = None,
+        map_reduce: bool = None,
+        chunk_workers: int = None,
+        parallel_categories: bool = None,
+        client=None,
+    ):
+        """
+        Initialize analyzer with OpenAI API key.
+
+        Args:
+            api_key: OpenAI API key (default: config.OPENAI_API_KEY)
+            cache: Optional persistent cache of LLM responses
+            bypass_cache: Always call the model, but still refresh the cache
+            token_budget: Prompt tokens spent on user content
+                (default: config.PROMPT_TOKEN_BUDGET)
+            map_reduce: Analyze corpora larger than the token budget in
+                parallel chunks (default: config.MAP_REDUCE_ENABLED)
+            chunk_workers: Concurrent chunk requests in map-reduce mode
+                (default: config.MAP_REDUCE_WORKERS)
+            parallel_categories: Request each persona category separately
+                and concurrently (default: config.PARALLEL_CATEGORIES)
+            client: Chat completions client to use instead of a new OpenAI
+                client (e.g. a record/replay fixture client)
+        """
+        if client is None:
+            # Imported here: the openai package is slow to import
+            from openai import OpenAI
+
+            client = OpenAI(api_key=api_key or config.OPENAI_API_KEY)
+        self.client = client
+        self.cache = cache
+        self.bypass_cache = bypass_cache
+        self.token_budget = token_budget or config.PROMPT_TOKEN_BUDGET
+        self.map_reduce = (
+            config.MAP_REDUCE_ENABLED if map_reduce is None else map_reduce
+        )
+        self.chunk_workers = chunk_workers or config.MAP_REDUCE_WORKERS
+        self.parallel_categories = (
+            config.PARALLEL_CATEGORIES
+            if parallel_categories is None
+            else parallel_categories
+        )
+
+    def item_demand(self) -> Dict[str, int]:
+        """
+        Posts and comments worth fetching for one analysis.
+
+        Map-reduce analyzes the whole history. Otherwise the prompt holds
+        one token budget, so enough items to fill ``STREAM_OVERSAMPLE``
+        budgets at ``ESTIMATED_ITEM_TOKENS`` each leave packing a choice
+        without fetching pages it would never use.
 
-    def analyze_user(self, user_data: Dict) -> Dict:
+        Returns:
+            ``{"post": count, "comment": count}``
+        """
+        if self.map_reduce:
+            return {"post": config.MAX_POSTS, "comment": config.MAX_COMMENTS}
+        tokens = self.token_budget * config.STREAM_OVERSAMPLE
+        per_kind = math.ceil(tokens / config.ESTIMATED_ITEM_TOKENS / 2)
+        return {
+            "post": min(per_kind, config.MAX_POSTS),
+            "comment": min(per_kind, config.MAX_COMMENTS),
+        }
+
+    def consume_pages(
+        self,
+        username: str,
+        pages: Iterable[Tuple[str, List[Dict]]],
+        progress: Callable[[int], None] = None,
+    ) -> Tuple[Dict, str, CitationCorpus]:
+        """
+        Read scraped pages, packing and indexing them as they arrive.
+
+        Each page is tokenized for the prompt and added to the citation
+        corpus while the next one is being fetched. Reading stops once
+        ``item_demand`` items have arrived or the candidates cover
+        ``config.STREAM_OVERSAMPLE`` token budgets; the remaining pages
+        are left to the citation corpus, which only fetches them if a
+        quote matches nothing read so far. Map-reduce mode reads every
+        page. A scraper with an item store keeps every page that was read,
+        including the late ones, so a repeat run can be served from it.
+
+        Args:
+            username: Reddit username the pages belong to
+            pages: ``(kind, items)`` pages, e.g. RedditScraper.iter_pages
+            progress: Called with the number of items read after each page
+
+        Returns:
+            ``(user_data, content_summary, corpus)`` to pass on to
+            analyze_user or stream_user; ``content_summary`` is None in
+            map-reduce mode
+        """
+        user_data = {"username": username, "posts": [], "comments": []}
+        packer = None if self.map_reduce else IncrementalPacker(self.token_budget)
+        demand = None if self.map_reduce else sum(self.item_demand().values())
+        corpus = CitationCorpus()
+        pages = iter(pages)
+
+        with user_scope(username):
+            for kind, page in pages:
+                user_data["posts" if kind == "post" else "comments"].extend(page)
+                corpus.add(kind, page)
+                read = len(user_data["posts"]) + len(user_data["comments"])
+                if progress:
+                    progress(read)
+                if packer is None:
+                    continue
+                packer.add(kind, page)
+                if read >= demand or packer.full:
+                    # Later pages are only fetched if citations need them
+                    inc("scrape_early_stops_total")
+                    corpus.defer(pages)
+                    break
+
+            user_data["scrape_timestamp"] = datetime.now().isoformat()
+            content_summary = None
+            if packer is not None:
+                content_summary = self._prepare_content_summary(user_data, packer)
+
+        # Build the paraphrase index while the model request is in flight
+        threading.Thread(target=corpus.build_index, daemon=True).start()
+        return user_data, content_summary, corpus
+
+    def analyze_user(
+        self,
+        user_data: Dict,
+        content_summary: str = None,
+        corpus: CitationCorpus = None,
+    ) -> Dict:
         """
         Analyze user data to build persona.
 
         Args:
             user_data: Dictionary containing posts and comments
+            content_summary: Packed prompt content, e.g. from consume_pages
+                (default: packed from ``user_data``)
+            corpus: Citation corpus of ``user_data``, e.g. from
+                consume_pages (default: built from ``user_data``)
 
         Returns:
             Dictionary containing persona analysis with citations
         """
+        try:
+            with user_scope(user_data.get("username")):
+                return self._analyze_user(user_data, content_summary, corpus)
+        finally:
+            # Nothing is cited after this; stop any deferred scrape
+            if corpus is not None:
+                corpus.close()
+
+    def _analyze_user(
+        self, user_data: Dict, content_summary: str, corpus: CitationCorpus
+    ) -> Dict:
+        # Heavy users: analyze the whole corpus in token-bounded chunks
+        if self.map_reduce:
+            with span("summary"):
+                statistics = self._statistics(user_data)
+                budget = self.token_budget - count_tokens(statistics)
+                summaries = [
+                    _join(statistics, chunk)
+                    for chunk in chunk_content(user_data, budget)
+                ]
+            if len(summaries) > 1:
+                summaries = summaries[: config.MAP_REDUCE_MAX_CHUNKS]
+                return self._generate_persona_chunked(summaries, user_data, corpus)
+
         # Prepare content for analysis
-        content_summary = self._prepare_content_summary(user_data)
+        if content_summary is None:
+            content_summary = self._prepare_content_summary(user_data)
 
         # Generate persona analysis
-        persona = self._generate_persona(content_summary, user_data)
+        persona = self._generate_persona(content_summary, user_data, corpus)
 
         return persona
 
-    def _prepare_content_summary(self, user_data: Dict) -> str:
-        """Prepare a summary of user content for analysis."""
-        summary_parts = []
+    def stream_user(
+        self,
+        user_data: Dict,
+        content_summary: str = None,
+        corpus: CitationCorpus = None,
+    ) -> Iterator[Dict]:
+        """
+        Analyze user data, yielding each trait as soon as it is generated.
 
-        # Add posts summary
-        summary_parts.append("POSTS:")
-        # Limit to avoid token limits
-        for i, post in enumerate(user_data["posts"][:50]):
-            summary_parts.append(
-                f"Post {i + 1} (r/{post['subreddit']}): {post['title']}"
-            )
-            if post["content"] and post["content"] != "[Link Post]":
-                summary_parts.append(f"Content: {post['content'][:200]}...")
-
-        # Add comments summary
-        summary_parts.append("\nCOMMENTS:")
-        for i, comment in enumerate(user_data["comments"][:50]):
-            summary_parts.append(
-                f"Comment {i + 1} (r/{comment['subreddit']}): "
-                f"{comment['body'][:200]}..."
-            )
+        The model's response is streamed and parsed incrementally, so the
+        first traits arrive after a fraction of the full response time.
+        Citations are attached to each trait before it is yielded.
 
-        return "\n".join(summary_parts)
+        Map-reduce and per-category modes have no single response to
+        stream; in those modes the traits are yielded once the persona is
+        complete.
 
-    def _generate_persona(self, content_summary: str, user_data: Dict) -> Dict:
-        """Generate persona using OpenAI GPT."""
+        Args:
+            user_data: Dictionary containing posts and comments
+            content_summary: Packed prompt content, as for analyze_user
+            corpus: Citation corpus of ``user_data``, as for analyze_user
+
+        Yields:
+            ``{"type": "trait", "category", "trait", "info"}`` events,
+            then one ``{"type": "persona", "persona"}`` event holding the
+            same result analyze_user would return
+        """
+        try:
+            with user_scope(user_data.get("username")):
+                yield from self._stream_user(user_data, content_summary, corpus)
+        finally:
+            if corpus is not None:
+                corpus.close()
+
+    def _stream_user(
+        self, user_data: Dict, content_summary: str, corpus: CitationCorpus
+    ) -> Iterator[Dict]:
+        if self.map_reduce or self.parallel_categories:
+            persona = self._analyze_user(user_data, content_summary, corpus)
+            for category, traits in persona.items():
+                for trait_name, info in traits.items():
+                    yield {
+                        "type": "trait",
+                        "category": category,
+                        "trait": trait_name,
+                        "info": info,
+                    }
+            yield {"type": "persona", "persona": persona}
+            return
 
-        prompt = f"""Analyze the following Reddit user's posts and comments to create a detailed user persona. 
+        if content_summary is None:
+            content_summary = self._prepare_content_summary(user_data)
+        if corpus is None:
+            corpus = CitationCorpus(user_data)
+        usage = Counter()
+        parser = IncrementalPersonaParser()
+        streamed = {}
+
+        try:
+            prompt = self._build_prompt(content_summary)
+            for piece in self._complete_stream(prompt):
+                for category, trait_name, trait_info in parser.feed(piece):
+                    with span("citations"):
+                        info = self._cite_trait(corpus, usage, trait_info)
+                    streamed.setdefault(category, {})[trait_name] = info
+                    yield {
+                        "type": "trait",
+                        "category": category,
+                        "trait": trait_name,
+                        "info": info,
+                    }
+
+            # Keep the category layout of the complete response
+            persona_raw = json.loads(parser.text)
+            persona = {category: streamed.get(category, {}) for category in persona_raw}
+
+        except Exception as e:
+            print(f"Error generating persona: {e}")
+            persona = self._generate_fallback_persona(user_data)
+
+        yield {"type": "persona", "persona": persona}
+
+    def _prepare_content_summary(
+        self, user_data: Dict, packer: IncrementalPacker = None
+    ) -> str:
+        """
+        Prepare a summary of user content for analysis.
+
+        Args:
+            user_data: Dictionary containing posts and comments
+            packer: Packer already holding the user's items as candidates
+        """
+        with span("summary"):
+            # Statistics stand in for raw text the model would infer them from
+            statistics = self._statistics(user_data)
+            budget = self.token_budget - count_tokens(statistics)
+
+            # Fill the rest of the token budget with the most informative items
+            if packer is not None:
+                content = packer.pack(budget)
+            else:
+                content = pack_content(user_data, budget)
+            return _join(statistics, content)
+
+    def _statistics(self, user_data: Dict) -> str:
+        """Render the user's activity statistics for the prompt."""
+        if not config.FEATURES_ENABLED:
+            return ""
+        with span("features"):
+            return render_features(extract_features(user_data))
+
+    def _build_prompt(self, content_summary: str) -> str:
+        """Build the persona prompt for a content summary."""
+        return f"""Analyze the following Reddit user's posts and comments to create a detailed user persona. 
         For each characteristic you identify, provide specific examples from their content.
+        Base activity patterns on the ACTIVITY STATISTICS (they cover the number of most recent posts and comments given in their header, which may be more than are quoted below) and quote evidence only from the posts and comments.
 
         Categories to analyze:
         1. Demographics (age range, location hints, gender if apparent)
@@ -94,28 +477,176 @@ class PersonaAnalyzer:
         }}
         """
 
+    def _build_category_prompt(self, content_summary: str, category: str) -> str:
+        """Build a prompt that asks for a single persona category."""
+        return f"""Analyze the following Reddit user's posts and comments and describe
+        only this aspect of their persona: {CATEGORY_GUIDANCE[category]}.
+        For each characteristic you identify, provide specific examples from their content.
+        Base activity patterns on the ACTIVITY STATISTICS (they cover the number of most recent posts and comments given in their header, which may be more than are quoted below) and quote evidence only from the posts and comments.
+
+        User Content:
+        {content_summary}
+
+        Return the analysis as a JSON object with this structure:
+        {{
+            "{category}": {{
+                "trait_name": {{
+                    "description": "description",
+                    "evidence": ["quote1", "quote2"]
+                }}
+            }}
+        }}
+        """
+
+    def _complete(self, prompt: str) -> str:
+        """
+        Return the model's JSON response text for a prompt.
+
+        Responses are served from the cache when one is attached and the
+        same prompt was answered before.
+        """
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(prompt, MODEL, TEMPERATURE, PROMPT_VERSION)
+            if not self.bypass_cache:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    inc("llm_requests_total", outcome="cached")
+                    return cached
+
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {
-                        "role": "system",
-                        "content": (
-                            "You are a skilled data analyst "
-                            "specializing in user persona creation."
-                        ),
-                    },
-                    {"role": "user", "content": prompt},
-                ],
-                response_format={"type": "json_object"},
-                temperature=0.7,
+            with _llm_slot(), span("llm"):
+                response = self.client.chat.completions.create(
+                    model=MODEL,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=TEMPERATURE,
+                )
+        except Exception:
+            inc("llm_requests_total", outcome="error")
+            raise
+        inc("llm_requests_total", outcome="ok")
+        get_registry().record_usage(getattr(response, "usage", None))
+        content = response.choices[0].message.content
+
+        if key is not None:
+            self.cache.put(key, content)
+
+        return content
+
+    def _complete_stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yield the model's JSON response text for a prompt as it arrives.
+
+        A cached response is yielded in one piece; a fresh one is cached
+        once it has been received completely.
+        """
+        key = None
+        if self.cache is not None:
+            key = make_cache_key(prompt, MODEL, TEMPERATURE, PROMPT_VERSION)
+            if not self.bypass_cache:
+                cached = self.cache.get(key)
+                if cached is not None:
+                    inc("llm_requests_total", outcome="cached")
+                    yield cached
+                    return
+
+        pieces = []
+        try:
+            # The slot and span are held until the stream ends, including
+            # consumer time
+            with _llm_slot(), span("llm"):
+                stream = self.client.chat.completions.create(
+                    model=MODEL,
+                    messages=[
+                        {"role": "system", "content": SYSTEM_PROMPT},
+                        {"role": "user", "content": prompt},
+                    ],
+                    response_format={"type": "json_object"},
+                    temperature=TEMPERATURE,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+
+                for chunk in stream:
+                    # The final chunk only carries token usage
+                    get_registry().record_usage(getattr(chunk, "usage", None))
+                    if not chunk.choices:
+                        continue
+                    piece = chunk.choices[0].delta.content
+                    if piece:
+                        pieces.append(piece)
+                        yield piece
+        except Exception:
+            inc("llm_requests_total", outcome="error")
+            raise
+        inc("llm_requests_total", outcome="ok")
+
+        if key is not None:
+            self.cache.put(key, "".join(pieces))
+
+    def _request_persona(self, content_summary: str) -> Dict:
+        """Ask the model for a raw persona of one content summary."""
+        if self.parallel_categories:
+            return self._request_persona_by_category(content_summary)
+        prompt = self._build_prompt(content_summary)
+        return json.loads(self._complete(prompt))
+
+    def _request_persona_by_category(self, content_summary: str) -> Dict:
+        """
+        Request every category concurrently and merge the answers.
+
+        Each request only generates one category's traits, so the
+        persona's latency is that of the slowest category instead of one
+        long response. A failed category is left out rather than failing
+        the whole persona.
+        """
+        with ThreadPoolExecutor(max_workers=len(CATEGORIES)) as pool:
+            results = pool.map(
+                bind_user(
+                    lambda category: self._request_category(content_summary, category)
+                ),
+                CATEGORIES,
             )
+            persona_raw = {
+                category: traits
+                for category, traits in zip(CATEGORIES, results)
+                if traits is not None
+            }
+
+        if not persona_raw:
+            raise ValueError("every persona category failed")
+        return persona_raw
+
+    def _request_category(self, content_summary: str, category: str):
+        """Request one category's traits, returning None if it fails."""
+        try:
+            prompt = self._build_category_prompt(content_summary, category)
+            result = json.loads(self._complete(prompt))
+            traits = result.get(category, result)
+            if not isinstance(traits, dict):
+                raise ValueError("unexpected response shape")
+            return traits
+        except Exception as e:
+            print(f"Error analyzing {category}: {e}")
+            inc("llm_partial_failures_total", part="category")
+            return None
 
+    def _generate_persona(
+        self, content_summary: str, user_data: Dict, corpus: CitationCorpus = None
+    ) -> Dict:
+        """Generate persona using OpenAI GPT."""
+        try:
             # Parse the response
-            persona_raw = json.loads(response.choices[0].message.content)
+            persona_raw = self._request_persona(content_summary)
 
             # Add citations to the persona
-            persona_with_citations = self._add_citations(persona_raw, user_data)
+            persona_with_citations = self._add_citations(
+                persona_raw, user_data, corpus
+            )
 
             return persona_with_citations
 
@@ -123,104 +654,146 @@ class PersonaAnalyzer:
             print(f"Error generating persona: {e}")
             return self._generate_fallback_persona(user_data)
 
-    def _add_citations(self, persona_raw: Dict, user_data: Dict) -> Dict:
+    def _generate_persona_chunked(
+        self,
+        content_summaries: List[str],
+        user_data: Dict,
+        corpus: CitationCorpus = None,
+    ) -> Dict:
+        """
+        Generate persona from several content chunks analyzed concurrently.
+
+        Each chunk yields a partial persona (map); the partials are merged
+        into the usual category schema (reduce). A failed chunk only loses
+        its own traits.
+        """
+        workers = min(self.chunk_workers, len(content_summaries))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                request = bind_user(self._request_partial)
+                results = list(pool.map(request, content_summaries))
+
+            partials = [partial for partial in results if partial is not None]
+            if not partials:
+                raise ValueError("every content chunk failed")
+
+            persona_raw = merge_personas(partials)
+            return self._add_citations(persona_raw, user_data, corpus)
+
+        except Exception as e:
+            print(f"Error generating persona: {e}")
+            return self._generate_fallback_persona(user_data)
+
+    def _request_partial(self, content_summary: str):
+        """Request a partial persona, returning None if the chunk fails."""
+        try:
+            return self._request_persona(content_summary)
+        except Exception as e:
+            print(f"Error analyzing content chunk: {e}")
+            inc("llm_partial_failures_total", part="chunk")
+            return None
+
+    def _add_citations(
+        self, persona_raw: Dict, user_data: Dict, corpus: CitationCorpus = None
+    ) -> Dict:
         """Add citations from actual posts/comments to persona traits."""
         persona_with_citations = {}
 
-        all_content = []
-
-        # Combine posts and comments for searching
-        for post in user_data["posts"]:
-            all_content.append(
-                {
-                    "type": "post",
-                    "text": f"{post['title']} {post['content']}",
-                    "url": post["url"],
-                    "subreddit": post["subreddit"],
-                }
-            )
+        with span("citations"):
+            # Normalize and index the corpus once for all evidence lookups
+            if corpus is None:
+                corpus = CitationCorpus(user_data)
+            usage = Counter()
 
-        for comment in user_data["comments"]:
-            all_content.append(
-                {
-                    "type": "comment",
-                    "text": comment["body"],
-                    "url": comment["url"],
-                    "subreddit": comment["subreddit"],
-                }
-            )
+            # Process each category
+            for category, traits in persona_raw.items():
+                persona_with_citations[category] = {}
 
-        # Process each category
-        for category, traits in persona_raw.items():
-            persona_with_citations[category] = {}
-
-            if isinstance(traits, dict):
-                for trait_name, trait_info in traits.items():
-                    citations = []
-
-                    # Find relevant content for evidence
-                    if "evidence" in trait_info:
-                        for evidence in trait_info["evidence"]:
-                            # Find matching content
-                            for content in all_content:
-                                evidence_lower = evidence.lower()
-                                content_lower = content["text"].lower()
-
-                                # Check if evidence matches content
-                                if evidence_lower in content_lower or any(
-                                    word in content_lower
-                                    for word in evidence_lower.split()[:3]
-                                ):
-                                    citations.append(
-                                        {
-                                            "text": content["text"][:200],
-                                            "url": content["url"],
-                                            "type": content["type"],
-                                            "subreddit": content["subreddit"],
-                                        }
-                                    )
-                                    break
-
-                    persona_with_citations[category][trait_name] = {
-                        "description": trait_info.get("description", ""),
-                        "citations": citations[:3],  # Limit citations
-                    }
+                if isinstance(traits, dict):
+                    for trait_name, trait_info in traits.items():
+                        persona_with_citations[category][trait_name] = (
+                            self._cite_trait(corpus, usage, trait_info)
+                        )
 
         return persona_with_citations
 
-    def _generate_fallback_persona(self, user_data: Dict) -> Dict:
-        """Generate basic persona when API fails."""
-        # Count subreddits
-        subreddit_counts = {}
-        for post in user_data["posts"]:
-            sub = post["subreddit"]
-            subreddit_counts[sub] = subreddit_counts.get(sub, 0) + 1
-        for comment in user_data["comments"]:
-            sub = comment["subreddit"]
-            subreddit_counts[sub] = subreddit_counts.get(sub, 0) + 1
-
-        top_subreddits = sorted(
-            subreddit_counts.items(), key=lambda x: x[1], reverse=True
-        )[:5]
+    def _cite_trait(
+        self, corpus: CitationCorpus, usage: Counter, trait_info: Dict
+    ) -> Dict:
+        """Resolve one trait's evidence quotes into citations."""
+        citations = []
+        cited = set()
+
+        # Find relevant content for evidence
+        for evidence in trait_info.get("evidence", []):
+            index = corpus.find_evidence(evidence, cited, usage)
+            if index is None:
+                continue
+            cited.add(index)
+            usage[index] += 1
+            citations.append(corpus.citation(index))
 
         return {
-            "interests": {
-                "Active Subreddits": {
-                    "description": (
-                        f"Most active in: "
-                        f"{', '.join([sub[0] for sub in top_subreddits])}"
-                    ),
-                    "citations": [],
-                }
-            },
+            "description": trait_info.get("description", ""),
+            "citations": citations[:3],  # Limit citations
+        }
+
+    def _generate_fallback_persona(self, user_data: Dict) -> Dict:
+        """Generate basic persona from activity statistics when the API fails."""
+        inc("fallbacks_total")
+        features = extract_features(user_data)
+
+        def trait(description: str) -> Dict:
+            return {"description": description, "citations": []}
+
+        persona = {
+            "interests": {},
             "activity": {
-                "Post Count": {
-                    "description": f"Total posts: {len(user_data['posts'])}",
-                    "citations": [],
-                },
-                "Comment Count": {
-                    "description": (f"Total comments: {len(user_data['comments'])}"),
-                    "citations": [],
-                },
+                "Post Count": trait(f"Total posts: {features['posts']}"),
+                "Comment Count": trait(f"Total comments: {features['comments']}"),
             },
         }
+        if not features["items"]:
+            return persona
+
+        subreddits = features["subreddits"][:5]
+        persona["interests"]["Active Subreddits"] = trait(
+            "Most active in: "
+            + ", ".join(f"{sub['name']} ({sub['share']:.0%})" for sub in subreddits)
+        )
+        best = max(features["subreddits"], key=lambda sub: sub["mean_score"])
+        persona["interests"]["Best Received"] = trait(
+            f"Highest mean score in r/{best['name']} ({best['mean_score']:.0f})"
+        )
+
+        if "hours" in features:
+            hours = ", ".join(f"{hour:02d}h" for hour in features["peak_hours"])
+            busiest = WEEKDAYS[features["weekdays"].index(max(features["weekdays"]))]
+            persona["activity"]["Activity Rate"] = trait(
+                f"{features['items_per_day']:.1f} items per day over "
+                f"{features['active_days']:.0f} days"
+            )
+            persona["activity"]["Active Hours"] = trait(
+                f"Most active around {hours} UTC, busiest on {busiest}, "
+                f"{features['weekend_share']:.0%} of activity on weekends"
+            )
+
+        communication = {
+            "Verbosity": trait(
+                f"Writes {features['words_per_item']:.0f} words per item on average"
+            ),
+            "Reception": trait(
+                f"Median score {features['comment_scores']['median']:g} per comment "
+                f"and {features['post_scores']['median']:g} per post; "
+                f"{features['negative_share']:.0%} of items score below zero"
+            ),
+        }
+        vocabulary = features.get("vocabulary")
+        if vocabulary:
+            communication["Vocabulary"] = trait(
+                f"{vocabulary['distinct']} distinct words in the newest "
+                f"{vocabulary['sampled']} (root type-token ratio "
+                f"{vocabulary['richness']:.1f})"
+            )
+        persona["communication"] = communication
+        return persona
@@ -0,0 +1,123 @@
+"""Persistent content-addressed cache for LLM responses."""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_by_use ON responses (last_used);
+"""
+
+
+def make_cache_key(
+    content: str, model: str, temperature: float, prompt_version: str
+) -> str:
+    """Return the SHA-256 key identifying one LLM request."""
+    payload = json.dumps([prompt_version, model, temperature, content])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    SQLite-backed LRU cache of raw LLM responses.
+
+    Entries are keyed by a hash of everything that determines the model's
+    answer, so an unchanged content summary never pays for a second call.
+    """
+
+    def __init__(self, path: str = None, max_entries: int = None):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite database file (default: config.LLM_CACHE_PATH)
+            max_entries: Entries kept before the least recently used are
+                evicted (default: config.LLM_CACHE_MAX_ENTRIES)
+        """
+        self.path = path or config.LLM_CACHE_PATH
+        self.max_entries = max_entries or config.LLM_CACHE_MAX_ENTRIES
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for ``key`` and mark it recently used."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT response FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET last_used = ? WHERE key = ?",
+                (time.time(), key),
+            )
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, response: str) -> None:
+        """Store a response, evicting the least recently used over capacity."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(key, response, created_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, now, now),
+            )
+            evicted = self._conn.execute(
+                "DELETE FROM responses WHERE key IN (SELECT key FROM responses "
+                "ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+            self.evictions += max(evicted, 0)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters for reporting."""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self),
+        }
+
+    def summary(self) -> str:
+        """Return a one-line human-readable report of the counters."""
+        stats = self.stats()
+        lookups = stats["hits"] + stats["misses"]
+        rate = stats["hits"] / lookups * 100 if lookups else 0.0
+        return (
+            f"LLM cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({rate:.0f}% hit rate), {stats['entries']} entries"
+        )
@@ -0,0 +1,248 @@
+"""Lookup of evidence quotes in a user's posts and comments."""
+
+import threading
+from bisect import bisect_right
+from typing import Container, Dict, Iterator, List, Mapping, Optional, Tuple
+
+import config
+from .metrics import inc
+from .retrieval import BM25Index
+
+# Joins item texts into one searchable string; never occurs in a quote
+_SEPARATOR = "\x00"
+
+
+class CitationCorpus:
+    """
+    A user's posts and comments, normalized once for citation lookup.
+
+    Verbatim quotes are found with one C-level ``str.find`` over all
+    lowercased item texts joined into a single string, followed by a
+    binary search over the item offsets; a word-level index of the corpus
+    vocabulary rejects quotes that cannot occur anywhere without scanning
+    the corpus at all. Paraphrased quotes fall back to a BM25 index that
+    is built on first use and shared by every trait of the persona.
+
+    A corpus built from the first pages of a scrape can keep the rest of
+    the page stream (``defer``) and read a few more pages when a quote
+    matches nothing it holds yet.
+    """
+
+    def __init__(self, user_data: Dict = None):
+        """
+        Collect citable items from scraped user data.
+
+        Args:
+            user_data: Dictionary containing posts and comments; omit it
+                to fill the corpus page by page with ``add``
+        """
+        # Posts are cited before comments, however the pages arrive; pages
+        # fetched for lookups go last so earlier item indices stay valid
+        self._parts = {"post": [], "comment": [], "late": []}
+        self._lowered = {"post": [], "comment": [], "late": []}
+        self._vocabulary = set()
+        self._lock = threading.RLock()
+        self._pending = None
+        self._pending_pages = 0
+        self._invalidate()
+
+        if user_data is not None:
+            self.add("post", user_data["posts"])
+            self.add("comment", user_data["comments"])
+
+    def add(self, kind: str, sources: List[Dict]) -> None:
+        """Add a page of posts (``kind="post"``) or comments before lookups."""
+        self._add(kind, sources, kind)
+
+    def _add(self, kind: str, sources: List[Dict], section: str) -> None:
+        with self._lock:
+            for source in sources:
+                if kind == "post":
+                    text = f"{source['title']} {source['content']}"
+                else:
+                    text = source["body"]
+                lowered = text.lower()
+                self._parts[section].append(
+                    {
+                        "type": kind,
+                        "text": text,
+                        "url": source["url"],
+                        "subreddit": source["subreddit"],
+                    }
+                )
+                self._lowered[section].append(lowered)
+                self._vocabulary.update(lowered.split())
+            self._invalidate()
+
+    def defer(self, pages: Iterator[Tuple[str, List[Dict]]], limit: int = None) -> None:
+        """
+        Keep the rest of a page stream for quotes that match nothing.
+
+        Args:
+            pages: Unread ``(kind, items)`` pages, e.g. from iter_pages
+            limit: Pages that may be read
+                (default: config.CITATION_FETCH_PAGES)
+        """
+        self._pending = pages
+        self._pending_pages = config.CITATION_FETCH_PAGES if limit is None else limit
+
+    def close(self) -> None:
+        """Drop the deferred pages, closing their stream."""
+        pending, self._pending = self._pending, None
+        close = getattr(pending, "close", None)
+        if close:
+            close()
+
+    def _fetch_more(self) -> bool:
+        """Read one more deferred page; return False if none is left."""
+        if self._pending is None or self._pending_pages <= 0:
+            return False
+        self._pending_pages -= 1
+        page = next(self._pending, None)
+        if page is None:
+            self._pending = None
+            return False
+        inc("citation_fetches_total")
+        kind, sources = page
+        self._add(kind, sources, "late")
+        return True
+
+    def _invalidate(self) -> None:
+        """Drop the lookup structures; they are rebuilt on next use."""
+        with self._lock:
+            self._items = None
+            self._index = None
+
+    def _build(self) -> None:
+        """Join the item texts into the structures used by lookups."""
+        with self._lock:
+            if self._items is not None:
+                return
+            self._lowered_all = (
+                self._lowered["post"] + self._lowered["comment"] + self._lowered["late"]
+            )
+            self._text = _SEPARATOR.join(self._lowered_all)
+
+            self._offsets = []
+            offset = 0
+            for text in self._lowered_all:
+                self._offsets.append(offset)
+                offset += len(text) + 1
+
+            self._vocabulary_text = _SEPARATOR.join(self._vocabulary)
+            # Set last: a non-None _items means every structure is ready
+            self._items = (
+                self._parts["post"] + self._parts["comment"] + self._parts["late"]
+            )
+
+    @property
+    def items(self) -> List[Dict]:
+        """Citable items: every post, then every comment, then fetched ones."""
+        if self._items is None:
+            self._build()
+        return self._items
+
+    @property
+    def lowered(self) -> List[str]:
+        """Lowercased item texts, in citation order."""
+        self._build()
+        return self._lowered_all
+
+    @property
+    def index(self) -> BM25Index:
+        """BM25 index over the item texts, built on first use."""
+        with self._lock:
+            if self._index is None:
+                self._index = BM25Index(self.lowered)
+            return self._index
+
+    def build_index(self) -> None:
+        """Build the BM25 index ahead of use, e.g. while waiting on the LLM."""
+        self.index
+
+    def _may_contain(self, pattern: str) -> bool:
+        """
+        Cheap necessary condition for ``pattern`` occurring in the corpus.
+
+        Words strictly inside the pattern are whitespace-delimited in any
+        match, so they must be whole vocabulary words; the outer words may
+        be parts of longer words, so they only need to occur inside one.
+        """
+        words = pattern.split()
+        if not words:
+            return True
+        if any(word not in self._vocabulary for word in words[1:-1]):
+            return False
+        return words[0] in self._vocabulary_text and (
+            words[-1] in self._vocabulary_text
+        )
+
+    def first_occurrence(self, pattern: str) -> int:
+        """
+        Find the first item containing a lowercase pattern.
+
+        Returns:
+            Index of the item, or -1 if no item contains the pattern
+        """
+        if not self.items or not self._may_contain(pattern):
+            return -1
+        position = self._text.find(pattern)
+        if position < 0:
+            return -1
+        return bisect_right(self._offsets, position) - 1
+
+    def find_evidence(
+        self,
+        evidence: str,
+        exclude: Container[int] = (),
+        usage: Mapping[int, int] = None,
+    ) -> Optional[int]:
+        """
+        Pick the item that best supports an evidence quote.
+
+        An item containing the quote verbatim wins outright. Otherwise the
+        BM25 top-k candidates are re-ranked with a penalty for items that
+        other traits already cite, so one popular post does not end up as
+        the citation for every trait. If nothing matches at all, deferred
+        pages are read until something does or the page limit is reached.
+
+        Args:
+            evidence: Quote returned by the model
+            exclude: Item indices that must not be returned
+            usage: Times each item index has been cited so far
+
+        Returns:
+            Index of the chosen item, or None if nothing matches
+        """
+        quote = evidence.lower()
+        while True:
+            best = self._match(quote, exclude, usage or {})
+            if best is not None or not self._fetch_more():
+                return best
+
+    def _match(
+        self, quote: str, exclude: Container[int], usage: Mapping[int, int]
+    ) -> Optional[int]:
+        exact = self.first_occurrence(quote)
+        if exact >= 0 and exact not in exclude:
+            return exact
+
+        penalty = config.CITATION_DIVERSITY_PENALTY
+        best, best_score = None, 0.0
+        for index, score in self.index.top_k(quote, config.CITATION_TOP_K):
+            if index in exclude:
+                continue
+            score /= 1 + penalty * usage.get(index, 0)
+            if score > best_score:
+                best, best_score = index, score
+        return best
+
+    def citation(self, index: int) -> Dict:
+        """Return the citation dict for the item at ``index``."""
+        item = self.items[index]
+        return {
+            "text": item["text"][:200],
+            "url": item["url"],
+            "type": item["type"],
+            "subreddit": item["subreddit"],
+        }
@@ -0,0 +1,176 @@
+"""Near-duplicate detection over a user's posts and comments."""
+
+import zlib
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+
+import config
+
+# Multiplier combining the word hashes of a shingle
+_SHINGLE_BASE = np.uint64(1000003)
+_SHIFT = np.uint64(32)
+
+# Shingles hashed at once; bounds the temporary hash matrix
+_BLOCK = 1 << 16
+
+
+def shingle_hashes(
+    texts: Sequence[str], size: int = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Hash the word ``size``-grams of many texts.
+
+    Texts shorter than one shingle are hashed as a whole, so very short
+    items only match texts with the same words.
+
+    Args:
+        texts: Texts to shingle
+        size: Words per shingle (default: config.DEDUP_SHINGLE_WORDS)
+
+    Returns:
+        ``(hashes, counts)``: the shingle hashes of every text, concatenated,
+        and the number of shingles of each text
+    """
+    size = size or config.DEDUP_SHINGLE_WORDS
+    cache: Dict[str, int] = {}
+    words: List[int] = []
+    starts, counts = [], []
+
+    # Each text is followed by ``size`` zero words, so no shingle reaches
+    # into the next text
+    padding = [0] * size
+    for text in texts:
+        tokens = text.lower().split()
+        for token in set(tokens).difference(cache):
+            cache[token] = zlib.crc32(token.encode("utf-8")) + 1
+        starts.append(len(words))
+        counts.append(max(len(tokens) - size + 1, 1))
+        words.extend(map(cache.__getitem__, tokens))
+        words.extend(padding)
+
+    words = np.array(words, dtype=np.uint64)
+    counts = np.array(counts, dtype=np.int64)
+    # Position of every shingle's first word
+    offsets = np.cumsum(counts) - counts
+    positions = np.repeat(np.array(starts, dtype=np.int64) - offsets, counts)
+    positions += np.arange(len(positions))
+
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    for offset in range(size):
+        hashes = hashes * _SHINGLE_BASE + words[positions + offset]
+    return hashes, counts
+
+
+class MinHasher:
+    """
+    MinHash signatures with banded locality-sensitive hashing.
+
+    Each signature holds ``bands * rows`` minimum hash values; two texts
+    agree on each value with probability equal to the Jaccard similarity
+    of their shingle sets. Texts agreeing on every value of at least one
+    band become candidate pairs, so only likely duplicates are compared.
+    """
+
+    def __init__(self, bands: int = None, rows: int = None, seed: int = 1):
+        """
+        Args:
+            bands: LSH bands (default: config.DEDUP_BANDS)
+            rows: Signature values per band (default: config.DEDUP_ROWS)
+            seed: Seed of the hash functions
+        """
+        self.bands = bands or config.DEDUP_BANDS
+        self.rows = rows or config.DEDUP_ROWS
+        rng = np.random.default_rng(seed)
+        size = self.bands * self.rows
+        # Multiply-shift hashing: the high half of a * x + b (mod 2**64),
+        # with odd multipliers
+        self._a = rng.integers(0, 2**63, size=(size, 1), dtype=np.uint64) * 2 + 1
+        self._b = rng.integers(0, 2**63, size=(size, 1), dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Return the MinHash signature of a text."""
+        return self.signatures([text])[0]
+
+    def signatures(self, texts: Sequence[str]) -> np.ndarray:
+        """Return the MinHash signatures of many texts, one row per text."""
+        hashes, counts = shingle_hashes(texts)
+        ends = np.cumsum(counts)
+        result = np.empty((len(texts), self.bands * self.rows), dtype=np.uint64)
+
+        # Hash the shingles of a block of texts at once, then take the
+        # minimum per hash function over each text's run of columns
+        start = 0
+        while start < len(texts):
+            base = ends[start] - counts[start]
+            stop = int(np.searchsorted(ends, base + _BLOCK, side="right"))
+            stop = max(stop, start + 1)
+            # In place: one temporary for the block instead of three
+            hashed = np.multiply(self._a, hashes[base : ends[stop - 1]])
+            hashed += self._b
+            hashed >>= _SHIFT
+            offsets = ends[start:stop] - counts[start:stop] - base
+            result[start:stop] = np.minimum.reduceat(hashed, offsets, axis=1).T
+            start = stop
+        return result
+
+    def clusters(
+        self, texts: Sequence[str], threshold: float = None
+    ) -> List[List[int]]:
+        """
+        Group near-identical texts.
+
+        Args:
+            texts: Texts to compare
+            threshold: Minimum estimated Jaccard similarity of two texts
+                in one cluster (default: config.DEDUP_THRESHOLD)
+
+        Returns:
+            Clusters of text indices, in order of their first member; every
+            text is in exactly one cluster
+        """
+        threshold = config.DEDUP_THRESHOLD if threshold is None else threshold
+        if not texts:
+            return []
+        signatures = self.signatures(texts)
+        parent = list(range(len(texts)))
+
+        def find(i: int) -> int:
+            while parent[i] != i:
+                parent[i] = parent[parent[i]]
+                i = parent[i]
+            return i
+
+        # Each band's values viewed as one opaque key per text
+        key_type = np.dtype((np.void, signatures.itemsize * self.rows))
+        order = np.arange(len(texts))
+        for band in range(self.bands):
+            columns = signatures[:, band * self.rows : (band + 1) * self.rows]
+            keys = np.ascontiguousarray(columns).view(key_type).ravel()
+            _, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+            # Pair every text with the first text of its bucket
+            leaders = first[inverse.ravel()]
+            for index in np.flatnonzero(leaders != order):
+                leader = int(leaders[index])
+                a, b = find(leader), find(int(index))
+                if a == b:
+                    continue
+                # Confirm the candidate pair on the full signature
+                if np.mean(signatures[leader] == signatures[index]) >= threshold:
+                    parent[max(a, b)] = min(a, b)
+
+        groups: Dict[int, List[int]] = {}
+        for index in range(len(texts)):
+            groups.setdefault(find(index), []).append(index)
+        return list(groups.values())
+
+
+_hasher = None
+
+
+def get_hasher() -> MinHasher:
+    """Return the process-wide hasher built from the config."""
+    global _hasher
+    if _hasher is None:
+        _hasher = MinHasher()
+    return _hasher
@@ -0,0 +1,196 @@
+"""Per-user activity features computed locally, without the model."""
+
+from itertools import zip_longest
+from typing import Dict, List
+
+import numpy as np
+
+import config
+from .records import LINK_POST, _parse_timestamp, _Record
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+
+def _created(item) -> object:
+    """Raw creation time: a Unix timestamp, a formatted string or None."""
+    if isinstance(item, _Record):
+        return item.created
+    return item.get("created_utc")
+
+
+def _timestamps(items: List) -> np.ndarray:
+    """Unix timestamps of the items, NaN where unknown."""
+    # Formatted strings (plain item dicts) hold local time, as written by
+    # format_timestamp, and are converted back the way records do
+    values = [_parse_timestamp(_created(item)) for item in items]
+    return np.array(
+        [v if isinstance(v, float) else np.nan for v in values],
+        dtype=np.float64,
+    )
+
+
+def _text(item, kind: str) -> str:
+    if kind == "comment":
+        return item["body"] or ""
+    content = item["content"]
+    if not content or content == LINK_POST:
+        return item["title"] or ""
+    return f"{item['title']} {content}"
+
+
+def _score_stats(scores: np.ndarray) -> Dict:
+    if not len(scores):
+        return {"median": 0, "p90": 0, "max": 0}
+    median, p90 = np.percentile(scores, [50, 90])
+    return {"median": float(median), "p90": float(p90), "max": int(scores.max())}
+
+
+def extract_features(user_data: Dict) -> Dict:
+    """
+    Compute activity statistics over the posts and comments that were read.
+
+    Every feature comes from one NumPy array per field, so the cost is a
+    single pass over the items plus vectorized reductions; vocabulary
+    richness is measured on the newest ``config.FEATURE_VOCABULARY_WORDS``
+    words only.
+
+    Args:
+        user_data: Dictionary containing posts and comments
+
+    Returns:
+        Dictionary of features, as rendered by render_features
+    """
+    posts, comments = user_data["posts"], user_data["comments"]
+    items = list(posts) + list(comments)
+    total = len(items)
+    features = {"posts": len(posts), "comments": len(comments), "items": total}
+    if not total:
+        return features
+
+    # Subreddit distribution, with the mean score of each subreddit
+    names, codes = np.unique(
+        np.array([str(item["subreddit"]) for item in items]), return_inverse=True
+    )
+    scores = np.array([item.get("score") or 0 for item in items], dtype=np.int64)
+    counts = np.bincount(codes, minlength=len(names))
+    mean_scores = np.bincount(codes, weights=scores, minlength=len(names)) / counts
+    share = counts / total
+    top = np.argsort(-counts, kind="stable")[: config.FEATURE_TOP_SUBREDDITS]
+    features["subreddit_count"] = len(names)
+    features["subreddits"] = [
+        {
+            "name": str(names[i]),
+            "count": int(counts[i]),
+            "share": float(share[i]),
+            "mean_score": float(mean_scores[i]),
+        }
+        for i in top
+    ]
+    # Normalized entropy: 0 for a single subreddit, 1 for an even spread
+    entropy = float(-(share * np.log(share)).sum())
+    spread = entropy / np.log(len(names)) if len(names) > 1 else 0.0
+    features["subreddit_spread"] = spread
+
+    # Activity by hour of day and day of week (UTC)
+    stamps = _timestamps(items)
+    known = stamps[~np.isnan(stamps)].astype(np.int64)
+    if len(known):
+        hours = np.bincount((known // 3600) % 24, minlength=24)
+        weekdays = np.bincount((known // 86400 + _EPOCH_WEEKDAY) % 7, minlength=7)
+        days = max((known.max() - known.min()) / 86400, 1.0)
+        features["hours"] = hours.tolist()
+        features["weekdays"] = weekdays.tolist()
+        features["peak_hours"] = sorted(np.argsort(-hours, kind="stable")[:3].tolist())
+        features["weekend_share"] = float(weekdays[5:].sum() / len(known))
+        features["active_days"] = float(days)
+        features["items_per_day"] = len(known) / days
+
+    # Score distributions
+    post_scores, comment_scores = scores[: len(posts)], scores[len(posts) :]
+    features["post_scores"] = _score_stats(post_scores)
+    features["comment_scores"] = _score_stats(comment_scores)
+    features["negative_share"] = float((scores < 0).mean())
+
+    # Lexical statistics: lengths of every item, vocabulary of the newest
+    texts = [_text(post, "post") for post in posts]
+    texts += [_text(comment, "comment") for comment in comments]
+    lengths = np.array([t.count(" ") + 1 if t else 0 for t in texts])
+    features["words_per_item"] = float(lengths.mean())
+
+    budget = config.FEATURE_VOCABULARY_WORDS
+    sample: List[str] = []
+    # Posts and comments are both newest first; alternate to mix them
+    newest = zip_longest(texts[: len(posts)], texts[len(posts) :], fillvalue="")
+    for post_text, comment_text in newest:
+        sample.extend(post_text.lower().split())
+        sample.extend(comment_text.lower().split())
+        if len(sample) >= budget:
+            break
+    sample = sample[:budget]
+    if sample:
+        distinct = len(set(sample))
+        features["vocabulary"] = {
+            "sampled": len(sample),
+            "distinct": distinct,
+            # Root type-token ratio: stable across sample sizes, unlike TTR
+            "richness": distinct / np.sqrt(len(sample)),
+        }
+    return features
+
+
+def render_features(features: Dict) -> str:
+    """Render features as the compact statistics block of the prompt."""
+    total = features["items"]
+    if not total:
+        return ""
+    lines = [
+        f"ACTIVITY STATISTICS ({features['posts']} most recent posts and "
+        f"{features['comments']} most recent comments; times in UTC):"
+    ]
+
+    activity = f"- {features['comments'] / total:.0%} comments"
+    if "active_days" in features:
+        activity += (
+            f" over {features['active_days']:.0f} days "
+            f"({features['items_per_day']:.1f} per day)"
+        )
+    lines.append(activity)
+
+    top = ", ".join(
+        f"r/{sub['name']} {sub['share']:.0%} (mean score {sub['mean_score']:.0f})"
+        for sub in features["subreddits"]
+    )
+    lines.append(
+        f"- {features['subreddit_count']} subreddits "
+        f"(spread {features['subreddit_spread']:.2f}); top: {top}"
+    )
+
+    if "hours" in features:
+        hours = ", ".join(f"{hour:02d}h" for hour in features["peak_hours"])
+        busiest = np.argsort(-np.array(features["weekdays"]), kind="stable")[:2]
+        days = ", ".join(WEEKDAYS[day] for day in busiest)
+        lines.append(
+            f"- Most active hours: {hours}; busiest days: {days}; "
+            f"weekend share {features['weekend_share']:.0%}"
+        )
+
+    posts, comments = features["post_scores"], features["comment_scores"]
+    lines.append(
+        f"- Scores: posts median {posts['median']:g} (p90 {posts['p90']:g}, "
+        f"max {posts['max']}), comments median {comments['median']:g} "
+        f"(p90 {comments['p90']:g}, max {comments['max']}); "
+        f"{features['negative_share']:.0%} negative"
+    )
+
+    writing = f"- {features['words_per_item']:.0f} words per item on average"
+    vocabulary = features.get("vocabulary")
+    if vocabulary:
+        writing += (
+            f"; {vocabulary['distinct']} distinct words in the newest "
+            f"{vocabulary['sampled']} (root TTR {vocabulary['richness']:.1f})"
+        )
+    lines.append(writing)
+    return "\n".join(lines)
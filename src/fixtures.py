@@ -0,0 +1,267 @@
+"""Record/replay fixtures for Reddit scrapes and OpenAI responses.
+
+Recording wraps the real clients and appends everything they return to
+gzip-compressed JSONL files in a fixture directory. Replaying serves the
+recorded data back through the same ``scrape_user``/``iter_pages`` and
+``chat.completions.create`` interfaces, optionally with simulated latency
+and injected errors, so the whole pipeline runs offline and repeatably.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+from typing import Dict, Iterator, List
+
+from .metrics import span, user_scope
+from .records import to_json_default, to_records
+from .scraper import UserNotFound, paginate
+
+SCRAPES_FILE = "scrapes.jsonl.gz"
+COMPLETIONS_FILE = "completions.jsonl.gz"
+
+
+class InjectedError(Exception):
+    """Error raised on purpose by a replay client."""
+
+
+def request_key(request: Dict) -> str:
+    """Return the key identifying a chat completion request."""
+    relevant = {
+        "model": request.get("model"),
+        "messages": request.get("messages"),
+        "temperature": request.get("temperature"),
+        "response_format": request.get("response_format"),
+    }
+    payload = json.dumps(relevant, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _append(path: str, record: Dict, lock: threading.Lock) -> None:
+    """Append one JSON record to a gzip JSONL file."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    line = json.dumps(record, ensure_ascii=False, default=to_json_default) + "\n"
+    with lock, gzip.open(path, "at", encoding="utf-8") as f:
+        f.write(line)
+
+
+def _read(path: str) -> List[Dict]:
+    """Read every record of a gzip JSONL file."""
+    if not os.path.exists(path):
+        return []
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class _Simulation:
+    """Seeded latency and error injection shared by the replay clients."""
+
+    def __init__(self, latency: float, error_rate: float, seed: int):
+        self.latency = latency
+        self.error_rate = error_rate
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def maybe_fail(self, what: str) -> None:
+        """Raise InjectedError with the configured probability."""
+        with self._lock:
+            failed = self._random.random() < self.error_rate
+        if failed:
+            raise InjectedError(f"Injected error for {what}")
+
+    def wait(self, fraction: float = 1.0) -> None:
+        """Sleep for a share of the simulated latency."""
+        if self.latency > 0:
+            time.sleep(self.latency * fraction)
+
+
+class RecordingScraper:
+    """Scraper wrapper that records every scraped user."""
+
+    def __init__(self, scraper, directory: str):
+        """
+        Args:
+            scraper: Scraper to delegate to
+            directory: Fixture directory to record into
+        """
+        self.scraper = scraper
+        self.path = os.path.join(directory, SCRAPES_FILE)
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        return getattr(self.scraper, name)
+
+    def scrape_user(self, username: str) -> Dict[str, List[Dict]]:
+        """Scrape through the wrapped scraper and record the result."""
+        user_data = self.scraper.scrape_user(username)
+        self._record(username, user_data)
+        return user_data
+
+    def iter_pages(self, username: str) -> Iterator:
+        """
+        Stream pages through the wrapped scraper and record what was read.
+
+        A consumer that stops early records only the pages it read, which
+        are exactly the pages it will ask for again on replay.
+        """
+        user_data = {
+            "username": username,
+            "posts": [],
+            "comments": [],
+            "scrape_timestamp": datetime.now().isoformat(),
+        }
+        pages = self.scraper.iter_pages(username)
+        try:
+            for kind, page in pages:
+                user_data["posts" if kind == "post" else "comments"].extend(page)
+                yield kind, page
+        except GeneratorExit:
+            pages.close()
+            self._record(username, user_data)
+            raise
+        self._record(username, user_data)
+
+    def _record(self, username: str, user_data: Dict) -> None:
+        record = {"username": username, "user_data": user_data}
+        _append(self.path, record, self._lock)
+
+
+class ReplayScraper:
+    """Serve recorded user data through the scraper interface."""
+
+    def __init__(
+        self,
+        directory: str,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        """
+        Args:
+            directory: Fixture directory to replay from
+            latency: Simulated seconds per scrape
+            error_rate: Probability that a scrape raises InjectedError
+            seed: Seed for error injection
+        """
+        self.users = {}
+        for record in _read(os.path.join(directory, SCRAPES_FILE)):
+            user_data = record["user_data"]
+            user_data["posts"] = to_records("post", user_data["posts"])
+            user_data["comments"] = to_records("comment", user_data["comments"])
+            self.users[record["username"].lower()] = user_data
+        self._simulation = _Simulation(latency, error_rate, seed)
+
+    def scrape_user(self, username: str) -> Dict[str, List[Dict]]:
+        """Return the recorded data for a user."""
+        with user_scope(username), span("scrape"):
+            self._simulation.wait()
+        return self._lookup(username)
+
+    def iter_pages(self, username: str) -> Iterator:
+        """Yield the recorded data page by page, spreading the latency."""
+        user_data = self._lookup(username)
+        total = len(user_data["posts"]) + len(user_data["comments"])
+        for kind, page in paginate(user_data["posts"], user_data["comments"]):
+            with span(f"scrape.{kind}s"):
+                self._simulation.wait(len(page) / total)
+            yield kind, page
+
+    def _lookup(self, username: str) -> Dict:
+        self._simulation.maybe_fail(f"u/{username}")
+        user_data = self.users.get(username.lower())
+        if user_data is None:
+            raise UserNotFound(f"User '{username}' not found in replay fixtures")
+        return user_data
+
+
+class RecordingOpenAIClient:
+    """OpenAI client wrapper that records raw chat completion responses."""
+
+    def __init__(self, client, directory: str):
+        """
+        Args:
+            client: OpenAI client to delegate to
+            directory: Fixture directory to record into
+        """
+        self.client = client
+        self.path = os.path.join(directory, COMPLETIONS_FILE)
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _record(self, request: Dict, content: str) -> None:
+        _append(
+            self.path, {"key": request_key(request), "content": content}, self._lock
+        )
+
+    def _create(self, **request):
+        response = self.client.chat.completions.create(**request)
+        if request.get("stream"):
+            return self._record_stream(request, response)
+        self._record(request, response.choices[0].message.content)
+        return response
+
+    def _record_stream(self, request: Dict, stream) -> Iterator:
+        pieces = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                pieces.append(chunk.choices[0].delta.content)
+            yield chunk
+        self._record(request, "".join(pieces))
+
+
+class ReplayOpenAIClient:
+    """Serve recorded responses through the OpenAI chat completions interface."""
+
+    def __init__(
+        self,
+        directory: str,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        chunk_size: int = 16,
+    ):
+        """
+        Args:
+            directory: Fixture directory to replay from
+            latency: Simulated seconds per complete response
+            error_rate: Probability that a request raises InjectedError
+            seed: Seed for error injection
+            chunk_size: Characters per chunk when streaming
+        """
+        self.responses = {
+            record["key"]: record["content"]
+            for record in _read(os.path.join(directory, COMPLETIONS_FILE))
+        }
+        self.chunk_size = chunk_size
+        self._simulation = _Simulation(latency, error_rate, seed)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        self._simulation.maybe_fail("chat completion")
+        content = self.responses.get(request_key(request))
+        if content is None:
+            raise KeyError("No recorded response for this request")
+
+        if request.get("stream"):
+            return self._stream(content)
+
+        self._simulation.wait()
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+    def _stream(self, content: str) -> Iterator:
+        pieces = [
+            content[i : i + self.chunk_size]
+            for i in range(0, len(content), self.chunk_size)
+        ]
+        for piece in pieces:
+            self._simulation.wait(1 / len(pieces))
+            delta = SimpleNamespace(content=piece)
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=delta)])
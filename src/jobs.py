@@ -0,0 +1,164 @@
+"""Background job queue for interactive front ends such as the GUI."""
+
+import itertools
+import queue
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, List
+
+import config
+
+# Marker placed on the queue to tell a worker to shut down
+_STOP = object()
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when it was cancelled."""
+
+
+@dataclass
+class Job:
+    """One profile analysis queued by the user."""
+
+    id: int
+    username: str
+    profiling: bool = False
+    state: str = QUEUED
+    progress: float = 0.0
+    message: str = "Queued"
+    result: Any = None  # what ``run`` returned, e.g. (output_text, persona)
+    error: str = None
+    _cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+    _notify: Callable = field(default=None, repr=False)
+
+    @property
+    def active(self) -> bool:
+        """Whether the job is still queued or running."""
+        return self.state in (QUEUED, RUNNING)
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether cancellation was requested."""
+        return self._cancel.is_set()
+
+    def cancel(self) -> None:
+        """Ask the job to stop at its next checkpoint."""
+        self._cancel.set()
+
+    def check(self) -> None:
+        """
+        Checkpoint between stages of the job.
+
+        Raises:
+            JobCancelled: If cancellation was requested
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(f"Analysis of u/{self.username} cancelled")
+
+    def update(self, progress: float, message: str) -> None:
+        """Report progress; also a cancellation checkpoint."""
+        self.check()
+        self.progress = progress
+        self.message = message
+        self._changed()
+
+    def _changed(self) -> None:
+        if self._notify:
+            self._notify(self)
+
+
+class JobQueue:
+    """
+    Run jobs on a bounded pool of worker threads.
+
+    Jobs wait in a FIFO queue until a worker is free. Cancellation is
+    cooperative: a queued job is dropped before it starts, and a running
+    job stops at its next ``Job.check`` or ``Job.update`` call.
+    """
+
+    def __init__(
+        self,
+        run: Callable[[Job], Any],
+        workers: int = None,
+        on_update: Callable[[Job], None] = None,
+    ):
+        """
+        Start the workers.
+
+        Args:
+            run: Called with each job on a worker thread; returns the result
+            workers: Number of concurrent jobs (default: config.GUI_WORKERS)
+            on_update: Called, on the worker thread, whenever a job changes
+        """
+        self.run = run
+        self.on_update = on_update
+        self.jobs: List[Job] = []
+        self._ids = itertools.count(1)
+        self._queue = queue.Queue()
+        self._threads = []
+        for _ in range(max(1, workers or config.GUI_WORKERS)):
+            thread = threading.Thread(target=self._work, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, username: str, profiling: bool = False) -> Job:
+        """Queue an analysis of ``username`` and return its job."""
+        job = Job(next(self._ids), username, profiling, _notify=self._notify)
+        self.jobs.append(job)
+        self._queue.put(job)
+        return job
+
+    def cancel(self, job: Job) -> None:
+        """Cancel a job; a queued job is marked cancelled immediately."""
+        job.cancel()
+        if job.state == QUEUED:
+            self._finish(job, CANCELLED, "Cancelled")
+
+    def shutdown(self, wait: bool = False) -> None:
+        """Cancel every job and stop the workers."""
+        for job in self.jobs:
+            if job.active:
+                self.cancel(job)
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            if job.cancelled:
+                continue
+
+            job.state = RUNNING
+            try:
+                job.update(0, "Starting...")
+                result = self.run(job)
+            except JobCancelled:
+                self._finish(job, CANCELLED, "Cancelled")
+            except Exception as e:
+                job.error = str(e)
+                self._finish(job, FAILED, f"Error: {e}")
+            else:
+                job.result = result
+                self._finish(job, DONE, job.message)
+
+    def _finish(self, job: Job, state: str, message: str) -> None:
+        job.state = state
+        job.message = message
+        if state == DONE:
+            job.progress = 100
+        job._changed()
+
+    def _notify(self, job: Job) -> None:
+        if self.on_update:
+            self.on_update(job)
@@ -0,0 +1,308 @@
+"""In-process metrics: stage timings, token counts and event counters."""
+
+import functools
+import json
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import config
+
+# Upper bounds (seconds) of the stage latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+PREFIX = "persona_"
+
+_local = threading.local()
+
+
+def current_user() -> Optional[str]:
+    """Return the user the calling thread is working on, if any."""
+    return getattr(_local, "user", None)
+
+
+@contextmanager
+def user_scope(username: Optional[str]) -> Iterator[None]:
+    """Attribute spans recorded by this thread to ``username``."""
+    previous = current_user()
+    _local.user = username
+    try:
+        yield
+    finally:
+        _local.user = previous
+
+
+def bind_user(func: Callable) -> Callable:
+    """Wrap ``func`` to run in the caller's user scope (e.g. on a pool thread)."""
+    username = current_user()
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with user_scope(username):
+            return func(*args, **kwargs)
+
+    return wrapper
+
+
+class _Histogram:
+    """Bucketed distribution of observed values."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile as the upper bound of its bucket."""
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+
+def _label_key(labels: Dict) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(key: Tuple, extra: Tuple = ()) -> str:
+    pairs = key + extra
+    if not pairs:
+        return ""
+    inner = ",".join(f'{k}="{v}"' for k, v in pairs)
+    return "{" + inner + "}"
+
+
+class MetricsRegistry:
+    """
+    Thread-safe registry of counters and latency histograms.
+
+    Stage timings are recorded with ``span``, which also adds the elapsed
+    time to the current user's breakdown and notifies span listeners
+    (used by the profiler to draw a timeline). Only the most recently
+    active users keep a breakdown, so a long-running service does not grow
+    without bound. Everything can be exported as Prometheus text or as a
+    JSON summary.
+    """
+
+    def __init__(
+        self, buckets: Tuple[float, ...] = LATENCY_BUCKETS, max_users: int = None
+    ):
+        """
+        Args:
+            buckets: Upper bounds of the latency histogram buckets
+            max_users: Users whose per-stage breakdown is kept
+                (default: config.METRICS_MAX_USERS)
+        """
+        self.buckets = buckets
+        self.max_users = max_users or config.METRICS_MAX_USERS
+        self._lock = threading.Lock()
+        self._listeners: List[Callable] = []
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard everything recorded so far."""
+        with self._lock:
+            self._counters: Dict[str, Dict[Tuple, float]] = defaultdict(dict)
+            self._histograms: Dict[str, Dict[Tuple, _Histogram]] = defaultdict(dict)
+            # Least recently active first
+            self._users: Dict[str, Dict[str, float]] = OrderedDict()
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add ``amount`` to a counter."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._counters[name]
+            series[key] = series.get(key, 0) + amount
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record a value in a histogram."""
+        key = _label_key(labels)
+        with self._lock:
+            series = self._histograms[name]
+            if key not in series:
+                series[key] = _Histogram(self.buckets)
+            series[key].observe(value)
+
+    def add_listener(self, listener: Callable) -> None:
+        """
+        Call ``listener(stage, start, end, user)`` for every finished span.
+
+        ``start`` and ``end`` are ``time.perf_counter`` readings.
+        """
+        with self._lock:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable) -> None:
+        """Stop notifying a listener added with add_listener."""
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    @contextmanager
+    def span(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as one occurrence of ``stage``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.record_span(stage, start, end)
+
+    def record_span(self, stage: str, start: float, end: float) -> None:
+        """Record a stage that ran from ``start`` to ``end`` (perf_counter)."""
+        elapsed = end - start
+        user = current_user()
+        self.observe("stage_seconds", elapsed, stage=stage)
+        with self._lock:
+            if user is not None:
+                breakdown = self._users.get(user)
+                if breakdown is None:
+                    breakdown = self._users[user] = defaultdict(float)
+                    if len(self._users) > self.max_users:
+                        self._users.popitem(last=False)
+                else:
+                    self._users.move_to_end(user)
+                breakdown[stage] += elapsed
+            listeners = list(self._listeners)
+        for listener in listeners:
+            listener(stage, start, end, user)
+
+    def record_usage(self, usage) -> None:
+        """Count the prompt and completion tokens of an OpenAI usage object."""
+        if usage is None:
+            return
+        self.inc("llm_tokens_total", usage.prompt_tokens or 0, kind="prompt")
+        self.inc("llm_tokens_total", usage.completion_tokens or 0, kind="completion")
+
+    def to_prometheus(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                lines.append(f"# TYPE {PREFIX}{name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"{PREFIX}{name}{_format_labels(key)} {value:g}")
+
+            for name, series in sorted(self._histograms.items()):
+                lines.append(f"# TYPE {PREFIX}{name} histogram")
+                for key, hist in sorted(series.items()):
+                    cumulative = 0
+                    bounds = [f"{b:g}" for b in hist.buckets] + ["+Inf"]
+                    for bound, count in zip(bounds, hist.counts):
+                        cumulative += count
+                        labels = _format_labels(key, (("le", bound),))
+                        lines.append(f"{PREFIX}{name}_bucket{labels} {cumulative}")
+                    labels = _format_labels(key)
+                    lines.append(f"{PREFIX}{name}_sum{labels} {hist.sum:.6f}")
+                    lines.append(f"{PREFIX}{name}_count{labels} {hist.count}")
+
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> Dict:
+        """Summarize the run: per-stage latencies, counters and per-user time."""
+        with self._lock:
+            stages = {}
+            for key, hist in self._histograms.get("stage_seconds", {}).items():
+                stages[dict(key)["stage"]] = {
+                    "count": hist.count,
+                    "total_s": round(hist.sum, 6),
+                    "mean_s": round(hist.sum / hist.count, 6),
+                    "p50_s": round(hist.quantile(0.5), 6),
+                    "p95_s": round(hist.quantile(0.95), 6),
+                    "max_s": round(hist.max, 6),
+                }
+
+            counters = {}
+            for name, series in self._counters.items():
+                for key, value in series.items():
+                    counters[f"{name}{_format_labels(key)}"] = value
+
+            users = {
+                user: {stage: round(s, 6) for stage, s in breakdown.items()}
+                for user, breakdown in self._users.items()
+            }
+
+        return {
+            "stages": dict(sorted(stages.items())),
+            "counters": dict(sorted(counters.items())),
+            "dedup": _dedup_summary(counters),
+            "users": users,
+        }
+
+    def summary(self) -> str:
+        """One line per stage: count, mean, p95 (bucket estimate) and total."""
+        report = self.to_json()
+        stages = report["stages"]
+        if not stages:
+            return "Stage timings: none recorded"
+        lines = ["Stage timings:"]
+        for stage, s in stages.items():
+            lines.append(
+                f"  {stage:<16} {s['count']:>5}x  mean {s['mean_s']:.3f}s  "
+                f"p95 ~{s['p95_s']:.3f}s  total {s['total_s']:.2f}s"
+            )
+        dedup = report["dedup"]
+        if dedup["collapsed"]:
+            lines.append(
+                f"Near-duplicates: {dedup['collapsed']:g} of {dedup['items']:g} "
+                f"items collapsed ({dedup['ratio']:.0%}), "
+                f"{dedup['tokens_saved']:g} tokens saved"
+            )
+        return "\n".join(lines)
+
+    def write(self, path: str) -> None:
+        """Write Prometheus text (``.prom``/``.txt``) or else JSON to ``path``."""
+        if path.endswith((".prom", ".txt")):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_json(), indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def _dedup_summary(counters: Dict[str, float]) -> Dict:
+    """Derive the near-duplicate ratio from the packing counters."""
+    items = counters.get("dedup_items_total", 0)
+    collapsed = counters.get("dedup_collapsed_total", 0)
+    return {
+        "items": items,
+        "collapsed": collapsed,
+        "ratio": round(collapsed / items, 4) if items else 0.0,
+        "tokens_saved": counters.get("dedup_tokens_saved_total", 0),
+    }
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """Return the registry shared by the whole process."""
+    return _registry
+
+
+def span(stage: str):
+    """Time a block as ``stage`` in the process-wide registry."""
+    return _registry.span(stage)
+
+
+def inc(name: str, amount: float = 1, **labels) -> None:
+    """Increment a counter in the process-wide registry."""
+    _registry.inc(name, amount, **labels)
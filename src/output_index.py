@@ -0,0 +1,219 @@
+"""Persistent index of the saved persona files in the output directory."""
+
+import os
+import sqlite3
+import threading
+from contextlib import nullcontext
+from typing import Dict, List, Tuple
+
+import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analyses (
+    name TEXT PRIMARY KEY,
+    username TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL,
+    categories TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS analyses_by_mtime ON analyses (mtime DESC);
+"""
+
+# Header line written by utils.format_output
+_TITLE = "Reddit User Persona: "
+
+
+def summarize_persona(persona: Dict) -> str:
+    """Summarize a persona as its categories with their trait counts."""
+    return ", ".join(
+        f"{category} {len(traits) if isinstance(traits, dict) else 1}"
+        for category, traits in persona.items()
+    )
+
+
+def _summarize_file(path: str) -> Tuple[str, str]:
+    """
+    Read a saved persona's username and category summary.
+
+    Categories are the upper-case headings underlined with dashes by
+    format_output; traits are the bullet lines below them.
+    """
+    username = None
+    counts: Dict[str, int] = {}
+    category = None
+    previous = ""
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if username is None and line.startswith(_TITLE):
+                username = line[len(_TITLE) :].strip()
+            elif line and line == "-" * len(line) and previous.isupper():
+                category = previous.lower()
+                counts[category] = 0
+            elif category and line.startswith("• "):
+                counts[category] += 1
+            previous = line
+    summary = ", ".join(f"{name} {count}" for name, count in counts.items())
+    return username, summary
+
+
+class OutputIndex:
+    """
+    Username, mtime, size and category summary of every saved persona.
+
+    ``refresh`` brings the index up to date with one directory scan and
+    only reads files whose mtime or size changed; runs that write a file
+    call ``record`` so the next refresh does not have to read it. Queries
+    are paged, so browsing tens of thousands of files only touches the
+    rows on screen.
+    """
+
+    def __init__(self, directory: str = None, path: str = None):
+        """
+        Open (or create) the index.
+
+        Args:
+            directory: Directory of persona files (default: config.OUTPUT_DIR)
+            path: SQLite database file (default: config.OUTPUT_INDEX_PATH)
+        """
+        self.directory = os.path.abspath(directory or config.OUTPUT_DIR)
+        self.path = path or config.OUTPUT_INDEX_PATH
+
+        parent = os.path.dirname(self.path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def file_path(self, name: str) -> str:
+        """Return the full path of an indexed file."""
+        return os.path.join(self.directory, name)
+
+    def refresh(self) -> int:
+        """
+        Sync the index with the directory.
+
+        Returns:
+            Number of files (re)indexed
+        """
+        with self._lock:
+            indexed = {
+                name: (mtime, size)
+                for name, mtime, size in self._conn.execute(
+                    "SELECT name, mtime, size FROM analyses"
+                )
+            }
+
+        rows = []
+        seen = set()
+        try:
+            scan = os.scandir(self.directory)
+        except FileNotFoundError:
+            # Nothing written yet (or the directory was removed)
+            scan = nullcontext([])
+        with scan as entries:
+            for entry in entries:
+                if not entry.name.endswith(".txt") or not entry.is_file():
+                    continue
+                seen.add(entry.name)
+                stat = entry.stat()
+                if indexed.get(entry.name) == (stat.st_mtime, stat.st_size):
+                    continue
+                try:
+                    username, summary = _summarize_file(entry.path)
+                except OSError:
+                    continue
+                rows.append(
+                    (
+                        entry.name,
+                        username or entry.name[:-4],
+                        stat.st_mtime,
+                        stat.st_size,
+                        summary,
+                    )
+                )
+
+        removed = [(name,) for name in indexed.keys() - seen]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)", rows
+            )
+            self._conn.executemany("DELETE FROM analyses WHERE name = ?", removed)
+        return len(rows)
+
+    def record(self, path: str, username: str, persona: Dict) -> None:
+        """
+        Index a persona file that was just written.
+
+        Files outside the indexed directory are ignored.
+
+        Args:
+            path: Path of the written file
+            username: Reddit username of the persona
+            persona: The persona dictionary the file was rendered from
+        """
+        path = os.path.abspath(path)
+        if os.path.dirname(path) != self.directory or not path.endswith(".txt"):
+            return
+        try:
+            stat = os.stat(path)
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO analyses VALUES (?, ?, ?, ?, ?)",
+                    (
+                        os.path.basename(path),
+                        username,
+                        stat.st_mtime,
+                        stat.st_size,
+                        summarize_persona(persona),
+                    ),
+                )
+        except (OSError, sqlite3.Error) as e:
+            print(f"Error indexing {path}: {e}")
+
+    def count(self, query: str = "") -> int:
+        """Return the number of indexed files whose username matches ``query``."""
+        where, params = _filter(query)
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM analyses{where}", params
+            ).fetchone()[0]
+
+    def page(self, query: str = "", offset: int = 0, limit: int = 50) -> List[Dict]:
+        """
+        Return one page of matching files, newest first.
+
+        Args:
+            query: Case-insensitive substring of the username
+            offset: Matching files to skip
+            limit: Maximum number of files returned
+
+        Returns:
+            Dicts with name, username, mtime, size and categories
+        """
+        where, params = _filter(query)
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT name, username, mtime, size, categories FROM analyses"
+                f"{where} ORDER BY mtime DESC, name LIMIT ? OFFSET ?",
+                params + (limit, offset),
+            ).fetchall()
+        keys = ("name", "username", "mtime", "size", "categories")
+        return [dict(zip(keys, row)) for row in rows]
+
+
+def _filter(query: str) -> Tuple[str, tuple]:
+    """SQL condition matching usernames that contain ``query``."""
+    query = query.strip()
+    if not query:
+        return "", ()
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return " WHERE username LIKE ? ESCAPE '\\'", (f"%{escaped}%",)
@@ -0,0 +1,280 @@
+"""Token-budgeted packing of user content into the persona prompt."""
+
+import heapq
+import math
+from collections import Counter
+from typing import Dict, List
+
+import config
+from .dedup import get_hasher
+from .metrics import inc
+
+try:
+    import tiktoken
+except ImportError:  # optional dependency
+    tiktoken = None
+
+_encoding = None
+
+
+def _get_encoding():
+    """Return the tiktoken encoding for the analysis model, if available."""
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.encoding_for_model(config.OPENAI_MODEL)
+        except KeyError:
+            _encoding = tiktoken.get_encoding("o200k_base")
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count prompt tokens in ``text``.
+
+    Uses the model's tokenizer when tiktoken is installed and falls back
+    to the usual four-characters-per-token estimate otherwise.
+    """
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return (len(text) + 3) // 4
+
+
+def truncate_tokens(text: str, max_tokens: int) -> str:
+    """Cut ``text`` to at most ``max_tokens`` tokens, marking the cut."""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return encoding.decode(tokens[:max_tokens]) + "..."
+    max_chars = max_tokens * 4
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars] + "..."
+
+
+def _candidate(kind: str, source: Dict) -> Dict:
+    """Turn one post or comment into a pre-rendered prompt item."""
+    if kind == "post":
+        text = " ".join(source["title"].split())
+        if source["content"] and source["content"] != "[Link Post]":
+            text += f"\nContent: {' '.join(source['content'].split())}"
+    else:
+        text = " ".join(source["body"].split())
+
+    text = truncate_tokens(text, config.PACK_ITEM_MAX_TOKENS)
+    # Label and numbering overhead of the rendered line
+    tokens = count_tokens(text) + 8
+    return {"kind": kind, "source": source, "text": text, "tokens": tokens}
+
+
+def _score(items: List[Dict]) -> List[Dict]:
+    """Rate candidates by informativeness: length, score and recency."""
+    # Recency as a 0..1 percentile; timestamps are sortable strings
+    order = sorted(
+        range(len(items)), key=lambda i: items[i]["source"].get("created_utc", "")
+    )
+    for rank, index in enumerate(order):
+        items[index]["recency"] = (rank + 1) / len(items)
+
+    for item in items:
+        item["value"] = (
+            math.log1p(item["tokens"])
+            + 0.5 * math.log1p(max(item["source"].get("score", 0) or 0, 0))
+            + item["recency"]
+        )
+
+    return items
+
+
+def _collapse(items: List[Dict]) -> List[Dict]:
+    """
+    Keep one representative per cluster of near-identical items.
+
+    The first (newest) item of a cluster stands in for the others and
+    carries their number as ``copies``. The run metrics count the items
+    dropped and the tokens they would have cost.
+    """
+    if not config.DEDUP_ENABLED or len(items) < 2:
+        return items
+
+    kept = []
+    saved = 0
+    for cluster in get_hasher().clusters([item["text"] for item in items]):
+        item = items[cluster[0]]
+        if len(cluster) > 1:
+            # Plus the tokens of the "N near-identical" label
+            item = dict(item, copies=len(cluster), tokens=item["tokens"] + 4)
+            saved += sum(items[index]["tokens"] for index in cluster[1:])
+        kept.append(item)
+
+    inc("dedup_items_total", len(items))
+    inc("dedup_collapsed_total", len(items) - len(kept))
+    inc("dedup_tokens_saved_total", saved)
+    return kept
+
+
+def _candidates(user_data: Dict) -> List[Dict]:
+    """Turn posts and comments into scored, pre-rendered prompt items."""
+    items = [_candidate("post", post) for post in user_data["posts"]]
+    items += [_candidate("comment", comment) for comment in user_data["comments"]]
+    return _score(_collapse(items))
+
+
+def select_items(user_data: Dict, budget: int, items: List[Dict] = None) -> List[Dict]:
+    """
+    Choose the most informative items that fit in ``budget`` tokens.
+
+    Items are taken greedily by informativeness (length, score, recency).
+    Every item already taken from a subreddit discounts the rest of that
+    subreddit, so a single community cannot crowd out the others. Items
+    that no longer fit are skipped and smaller ones are tried, which fills
+    the budget as fully as the candidates allow.
+
+    Args:
+        user_data: Dictionary containing posts and comments
+        budget: Token budget for the packed items
+        items: Scored candidates already built from ``user_data``
+
+    Returns:
+        Selected candidate items, in their original order
+    """
+    if items is None:
+        items = _candidates(user_data)
+    decay = config.PACK_SUBREDDIT_DECAY
+    per_subreddit = Counter()
+
+    heap = [(-item["value"], index, 0) for index, item in enumerate(items)]
+    heapq.heapify(heap)
+    chosen = []
+    remaining = budget
+
+    while heap and remaining > 0:
+        _, index, seen = heapq.heappop(heap)
+        item = items[index]
+        subreddit = item["source"]["subreddit"]
+
+        # Re-queue if the subreddit gained items since this entry was scored
+        if seen != per_subreddit[subreddit]:
+            seen = per_subreddit[subreddit]
+            heapq.heappush(heap, (-item["value"] * decay**seen, index, seen))
+            continue
+
+        if item["tokens"] > remaining:
+            continue
+
+        chosen.append(index)
+        remaining -= item["tokens"]
+        per_subreddit[subreddit] += 1
+
+    return [items[index] for index in sorted(chosen)]
+
+
+def pack_content(user_data: Dict, budget: int = None) -> str:
+    """
+    Render the best-fitting posts and comments as the prompt's content.
+
+    Args:
+        user_data: Dictionary containing posts and comments
+        budget: Token budget (default: config.PROMPT_TOKEN_BUDGET)
+
+    Returns:
+        Content summary with POSTS and COMMENTS sections
+    """
+    budget = budget or config.PROMPT_TOKEN_BUDGET
+    return _render(select_items(user_data, budget))
+
+
+def chunk_content(user_data: Dict, budget: int = None) -> List[str]:
+    """
+    Split the whole corpus into content summaries of at most ``budget`` tokens.
+
+    Items are taken newest first, so every chunk covers one contiguous
+    stretch of the user's history with posts and comments interleaved.
+
+    Args:
+        user_data: Dictionary containing posts and comments
+        budget: Token budget per chunk (default: config.PROMPT_TOKEN_BUDGET)
+
+    Returns:
+        One content summary per chunk; a single summary if everything fits
+    """
+    budget = budget or config.PROMPT_TOKEN_BUDGET
+    items = _candidates(user_data)
+    items.sort(key=lambda item: item["recency"], reverse=True)
+
+    chunks = [[]]
+    used = 0
+    for item in items:
+        if used + item["tokens"] > budget and chunks[-1]:
+            chunks.append([])
+            used = 0
+        chunks[-1].append(item)
+        used += item["tokens"]
+
+    return [_render(chunk) for chunk in chunks]
+
+
+class IncrementalPacker:
+    """
+    Build prompt candidates page by page while items are still streaming.
+
+    Candidates are tokenized as pages arrive, so packing only has to score
+    and select once the stream ends. ``full`` reports when enough content
+    has arrived that further (older) pages are unlikely to be selected.
+    """
+
+    def __init__(self, budget: int = None, oversample: float = None):
+        """
+        Args:
+            budget: Token budget (default: config.PROMPT_TOKEN_BUDGET)
+            oversample: Budgets' worth of candidates after which the stream
+                can stop (default: config.STREAM_OVERSAMPLE)
+        """
+        self.budget = budget or config.PROMPT_TOKEN_BUDGET
+        self.oversample = oversample or config.STREAM_OVERSAMPLE
+        self.tokens = 0
+        self._items = {"post": [], "comment": []}
+
+    def add(self, kind: str, sources: List[Dict]) -> None:
+        """Add a page of posts (``kind="post"``) or comments."""
+        for source in sources:
+            item = _candidate(kind, source)
+            self._items[kind].append(item)
+            self.tokens += item["tokens"]
+
+    @property
+    def full(self) -> bool:
+        """Whether the candidates cover ``oversample`` token budgets."""
+        return self.tokens >= self.budget * self.oversample
+
+    def pack(self, budget: int = None) -> str:
+        """Render the best-fitting candidates, as pack_content would."""
+        # Posts before comments, like _candidates, so ties break the same way
+        items = _score(_collapse(self._items["post"] + self._items["comment"]))
+        return _render(select_items(None, budget or self.budget, items))
+
+
+def _render(selected: List[Dict]) -> str:
+    """Render selected items as POSTS and COMMENTS sections."""
+    summary_parts = ["POSTS:"]
+    posts = [item for item in selected if item["kind"] == "post"]
+    for i, item in enumerate(posts):
+        summary_parts.append(f"Post {i + 1} ({_label(item)}): {item['text']}")
+
+    summary_parts.append("\nCOMMENTS:")
+    comments = [item for item in selected if item["kind"] == "comment"]
+    for i, item in enumerate(comments):
+        summary_parts.append(f"Comment {i + 1} ({_label(item)}): {item['text']}")
+
+    return "\n".join(summary_parts)
+
+
+def _label(item: Dict) -> str:
+    """Subreddit of an item, plus its copy count if it stands for several."""
+    label = f"r/{item['source']['subreddit']}"
+    if item.get("copies"):
+        label += f", {item['copies']} near-identical"
+    return label
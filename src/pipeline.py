@@ -0,0 +1,253 @@
+"""Concurrent batch pipeline for analyzing many Reddit users in one run."""
+
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List
+
+import config
+from .output_index import OutputIndex
+from .utils import format_output, parse_user_reference, sanitize_filename
+
+# Marker placed on a queue to tell the consuming stage to shut down
+_STOP = object()
+
+
+@dataclass
+class BatchStats:
+    """Aggregate results of a batch run."""
+
+    total: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    elapsed: float = 0.0
+    scrape_time: float = 0.0
+    analyze_time: float = 0.0
+    write_time: float = 0.0
+    errors: Dict[str, str] = field(default_factory=dict)
+
+    @property
+    def throughput(self) -> float:
+        """Completed users per second over the whole run."""
+        if self.elapsed <= 0:
+            return 0.0
+        return self.succeeded / self.elapsed
+
+    def summary(self) -> str:
+        """Return a human-readable report of the run."""
+        lines = [
+            f"Users processed: {self.total} "
+            f"({self.succeeded} succeeded, {self.failed} failed)",
+            f"Wall time: {self.elapsed:.1f}s "
+            f"({self.throughput * 60:.1f} users/min)",
+        ]
+        if self.succeeded:
+            lines.append(
+                "Average stage time per user: "
+                f"scrape {self.scrape_time / self.succeeded:.2f}s, "
+                f"analyze {self.analyze_time / self.succeeded:.2f}s, "
+                f"write {self.write_time / self.succeeded:.3f}s"
+            )
+        return "\n".join(lines)
+
+
+class BatchPipeline:
+    """
+    Staged scrape -> analyze -> write pipeline.
+
+    Each stage runs on its own pool of threads and hands work to the next
+    stage through a bounded queue, so network waits in one stage overlap
+    with work in the others. A single scraper and analyzer are shared by
+    all workers for the whole run; the scraper gives each scrape worker its
+    own PRAW client (praw.Reddit is not thread-safe), paced by one shared
+    rate limiter.
+    """
+
+    def __init__(
+        self,
+        scraper,
+        analyzer,
+        output_dir: str = None,
+        scrape_workers: int = None,
+        llm_workers: int = None,
+        queue_size: int = None,
+        verbose: bool = False,
+        index: OutputIndex = None,
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            scraper: Shared RedditScraper instance
+            analyzer: Shared PersonaAnalyzer instance
+            output_dir: Directory for persona files (default: config.OUTPUT_DIR)
+            scrape_workers: Number of concurrent scrape workers
+            llm_workers: Number of concurrent LLM workers
+            queue_size: Capacity of the queues between stages
+            verbose: Print a line for every finished user
+            index: Index of saved personas to record written files in
+        """
+        self.scraper = scraper
+        self.analyzer = analyzer
+        self.output_dir = output_dir or config.OUTPUT_DIR
+        self.scrape_workers = max(1, scrape_workers or config.BATCH_SCRAPE_WORKERS)
+        self.llm_workers = max(1, llm_workers or config.BATCH_LLM_WORKERS)
+        self.queue_size = queue_size or config.BATCH_QUEUE_SIZE
+        self.verbose = verbose
+        self.index = index
+
+        self._stats = BatchStats()
+        self._lock = threading.Lock()
+
+    def run(self, usernames: Iterable[str]) -> BatchStats:
+        """
+        Process every username and return aggregate statistics.
+
+        Args:
+            usernames: Iterable of Reddit usernames
+
+        Returns:
+            BatchStats for the run
+        """
+        self._stats = BatchStats()
+        os.makedirs(self.output_dir, exist_ok=True)
+        scrape_queue = queue.Queue(maxsize=self.queue_size)
+        analyze_queue = queue.Queue(maxsize=self.queue_size)
+        write_queue = queue.Queue(maxsize=self.queue_size)
+
+        scrapers = self._start(
+            self.scrape_workers, self._scrape_stage, scrape_queue, analyze_queue
+        )
+        analyzers = self._start(
+            self.llm_workers, self._analyze_stage, analyze_queue, write_queue
+        )
+        writers = self._start(1, self._write_stage, write_queue, None)
+
+        start = time.perf_counter()
+        for username in usernames:
+            with self._lock:
+                self._stats.total += 1
+            scrape_queue.put(username)
+
+        # Drain each stage in order so downstream workers see every item
+        self._stop(scrapers, scrape_queue)
+        self._stop(analyzers, analyze_queue)
+        self._stop(writers, write_queue)
+        self._stats.elapsed = time.perf_counter() - start
+
+        return self._stats
+
+    def _start(self, count: int, target, inbox, outbox) -> List[threading.Thread]:
+        """Start ``count`` daemon workers consuming ``inbox``."""
+        threads = []
+        for _ in range(count):
+            thread = threading.Thread(target=target, args=(inbox, outbox))
+            thread.daemon = True
+            thread.start()
+            threads.append(thread)
+        return threads
+
+    def _stop(self, threads: List[threading.Thread], inbox) -> None:
+        """Signal a stage to finish and wait for its workers."""
+        for _ in threads:
+            inbox.put(_STOP)
+        for thread in threads:
+            thread.join()
+
+    def _scrape_stage(self, inbox, outbox) -> None:
+        """Scrape and pack users and pass their data to the analyze stage."""
+        while True:
+            username = inbox.get()
+            if username is _STOP:
+                return
+            start = time.perf_counter()
+            try:
+                # Read only the pages the analyzer asks for
+                prepared = self.analyzer.consume_pages(
+                    username, self.scraper.iter_pages(username)
+                )
+            except Exception as e:
+                self._fail(username, e)
+                continue
+            outbox.put((username, prepared, {"scrape": time.perf_counter() - start}))
+
+    def _analyze_stage(self, inbox, outbox) -> None:
+        """Build personas and pass formatted text to the writer."""
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            username, prepared, timings = item
+            start = time.perf_counter()
+            try:
+                persona = self.analyzer.analyze_user(*prepared)
+                output_text = format_output(username, persona)
+            except Exception as e:
+                self._fail(username, e)
+                continue
+            timings["analyze"] = time.perf_counter() - start
+            outbox.put((username, persona, output_text, timings))
+
+    def _write_stage(self, inbox, _outbox) -> None:
+        """Write finished personas to the output directory."""
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            username, persona, output_text, timings = item
+            start = time.perf_counter()
+            output_path = os.path.join(
+                self.output_dir, f"{sanitize_filename(username)}.txt"
+            )
+            try:
+                with open(output_path, "w", encoding="utf-8") as f:
+                    f.write(output_text)
+            except OSError as e:
+                self._fail(username, e)
+                continue
+            if self.index is not None:
+                self.index.record(output_path, username, persona)
+            timings["write"] = time.perf_counter() - start
+            self._succeed(username, output_path, timings)
+
+    def _succeed(self, username: str, output_path: str, timings: Dict) -> None:
+        """Record a completed user."""
+        with self._lock:
+            self._stats.succeeded += 1
+            self._stats.scrape_time += timings["scrape"]
+            self._stats.analyze_time += timings["analyze"]
+            self._stats.write_time += timings["write"]
+        if self.verbose:
+            print(f"[ok] u/{username} -> {output_path}")
+
+    def _fail(self, username: str, error: Exception) -> None:
+        """Record a user that could not be processed."""
+        with self._lock:
+            self._stats.failed += 1
+            self._stats.errors[username] = str(error)
+        print(f"[error] u/{username}: {error}")
+
+
+def read_user_list(stream) -> Iterable[str]:
+    """
+    Yield usernames from a stream of URLs or bare usernames.
+
+    Blank lines and lines starting with ``#`` are skipped.
+
+    Args:
+        stream: Iterable of text lines (open file or sys.stdin)
+
+    Yields:
+        Usernames in input order
+    """
+    for line in stream:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        username = parse_user_reference(line)
+        if username:
+            yield username
+        else:
+            print(f"[skip] Could not extract username from: {line}")
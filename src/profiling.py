@@ -0,0 +1,181 @@
+"""Profiling of a single analysis run: CPU, allocations and a timeline."""
+
+import cProfile
+import json
+import os
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+import config
+from .metrics import get_registry
+from .utils import sanitize_filename
+
+# Stages that mostly wait (on the network, the rate limiter or a free LLM
+# slot), not burn CPU
+NETWORK_STAGES = frozenset(
+    {
+        "scrape.posts",
+        "scrape.comments",
+        "reddit.request",
+        "ratelimit.wait",
+        "llm",
+        "llm.queue",
+    }
+)
+
+
+class Profiler:
+    """
+    Profile everything the current thread does inside a ``with`` block.
+
+    Three artifacts are written to ``<OUTPUT_DIR>/profiles/<username>/``
+    when the block exits:
+
+    * ``cprofile.prof`` – cProfile stats (``python -m pstats`` or snakeviz)
+    * ``tracemalloc.txt`` – peak traced memory and the top allocation sites
+    * ``trace.json`` – Chrome trace events (chrome://tracing or Perfetto)
+      with every metrics span, network waits and CPU stages on separate
+      tracks of one timeline
+
+    cProfile only sees the thread that entered the block; spans recorded
+    by worker threads (e.g. parallel LLM requests) still appear on the
+    timeline. Tracing allocations slows the run down noticeably, so
+    timings from a profiled run are only comparable with other profiled
+    runs.
+    """
+
+    def __init__(self, username: str, output_dir: str = None, top: int = 25):
+        """
+        Args:
+            username: User being analyzed; names the artifact directory
+            output_dir: Base directory (default: config.OUTPUT_DIR)
+            top: Number of allocation sites listed in the report
+        """
+        self.directory = os.path.join(
+            output_dir or config.OUTPUT_DIR, "profiles", sanitize_filename(username)
+        )
+        self.top = top
+        self.paths: Dict[str, str] = {}
+        self._profile = cProfile.Profile()
+        self._events: List[Dict] = []
+        # (thread ident, category) -> trace track id
+        self._tracks: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.Lock()
+        self._origin = 0.0
+
+    def __enter__(self):
+        self._origin = time.perf_counter()
+        self._started_at = datetime.now()
+        tracemalloc.start()
+        get_registry().add_listener(self._on_span)
+        self._profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        finished = time.perf_counter()
+        self._profile.disable()
+        get_registry().remove_listener(self._on_span)
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._write_cprofile()
+        self._write_allocations(snapshot, current, peak)
+        self._write_trace(finished)
+        return False
+
+    def _on_span(self, stage: str, start: float, end: float, user) -> None:
+        """Metrics listener: keep every finished span as a trace event."""
+        thread = threading.current_thread()
+        category = "network" if stage in NETWORK_STAGES else "cpu"
+        with self._lock:
+            track = self._tracks.get((thread.ident, category))
+            if track is None:
+                track = self._tracks[(thread.ident, category)] = len(self._tracks) + 1
+                self._events.append(
+                    {
+                        "name": "thread_name",
+                        "ph": "M",
+                        "pid": os.getpid(),
+                        "tid": track,
+                        "args": {"name": f"{thread.name} – {category}"},
+                    }
+                )
+            self._events.append(
+                {
+                    "name": stage,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": os.getpid(),
+                    "tid": track,
+                    "args": {"user": user},
+                }
+            )
+
+    def _write_cprofile(self) -> None:
+        path = os.path.join(self.directory, "cprofile.prof")
+        self._profile.dump_stats(path)
+        self.paths["cprofile"] = path
+
+    def _write_allocations(self, snapshot, current: int, peak: int) -> None:
+        path = os.path.join(self.directory, "tracemalloc.txt")
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            )
+        )
+        lines = [
+            f"Profiled run started {self._started_at:%Y-%m-%d %H:%M:%S}",
+            f"Peak traced memory: {peak / 1024:.1f} KiB",
+            f"Still allocated at exit: {current / 1024:.1f} KiB",
+            "",
+            f"Top {self.top} allocation sites still alive at exit:",
+        ]
+        for stat in snapshot.statistics("lineno")[: self.top]:
+            frame = stat.traceback[0]
+            lines.append(
+                f"{stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  "
+                f"{frame.filename}:{frame.lineno}"
+            )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+        self.paths["tracemalloc"] = path
+
+    def _write_trace(self, finished: float) -> None:
+        path = os.path.join(self.directory, "trace.json")
+        events = list(self._events)
+        events.append(
+            {
+                "name": "analysis run",
+                "cat": "run",
+                "ph": "X",
+                "ts": 0,
+                "dur": (finished - self._origin) * 1e6,
+                "pid": os.getpid(),
+                "tid": 0,
+            }
+        )
+        events.append(
+            {
+                "name": "process_name",
+                "ph": "M",
+                "pid": os.getpid(),
+                "args": {"name": "Reddit Persona Analyzer"},
+            }
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+        self.paths["trace"] = path
+
+    def summary(self) -> str:
+        """List the written artifacts."""
+        return "Profile written:\n" + "\n".join(
+            f"  {kind:<12} {path}" for kind, path in self.paths.items()
+        )
@@ -0,0 +1,185 @@
+"""Process-wide rate limiting for Reddit API calls."""
+
+import threading
+import time
+from typing import Dict, Mapping
+
+import config
+
+
+class RateLimiter:
+    """
+    Token-bucket limiter that follows Reddit's rate-limit headers.
+
+    Tokens refill continuously at the configured rate. Once a response
+    reports how many requests remain and when the window resets, the
+    refill rate is retuned so the remaining quota is spread evenly over
+    the rest of the window; the reported count only ever lowers the
+    balance, so reservations already queued in the window keep their
+    place. When the window resets, the configured rate and a full bucket
+    come back, so no caller waits past the reset for quota of the old
+    window. Slots are handed out under a lock, so one
+    limiter can be shared by every thread in the process.
+    """
+
+    def __init__(
+        self,
+        requests_per_period: float = None,
+        period: float = None,
+        burst: int = None,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            requests_per_period: Requests allowed per period
+                (default: config.RATE_LIMIT_REQUESTS)
+            period: Length of the rate-limit window in seconds
+                (default: config.RATE_LIMIT_PERIOD)
+            burst: Maximum requests issued back to back
+                (default: config.RATE_LIMIT_BURST)
+        """
+        requests_per_period = requests_per_period or config.RATE_LIMIT_REQUESTS
+        period = period or config.RATE_LIMIT_PERIOD
+
+        self.capacity = float(burst or config.RATE_LIMIT_BURST)
+        self.period = period
+        self.base_rate = requests_per_period / period
+        self.rate = self.base_rate
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+        # Server-reported window: when it resets, and how many reservations
+        # were already scheduled into the next window
+        self._reset_at = None
+        self._carried = 0
+
+        # Wait counters
+        self.calls = 0
+        self.waited_calls = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update. Caller holds the lock."""
+        if self._reset_at is not None and now >= self._reset_at:
+            # New window: configured rate, full bucket, no debt from the old one
+            self.rate = self.base_rate
+            self._tokens = self.capacity - self._carried
+            self._updated = self._reset_at
+            self._reset_at = None
+            self._carried = 0
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Claim one token.
+
+        The balance may go negative; callers then queue up behind each
+        other in the order they reserved. A caller whose turn would come
+        after the server's window resets is scheduled into the new window
+        instead, at the configured rate.
+
+        Returns:
+            Seconds the caller must wait before issuing its request
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+            if self._reset_at is not None and now + delay > self._reset_at:
+                self._carried += 1
+                backlog = max(0.0, self._carried - self.capacity)
+                delay = self._reset_at - now + backlog / self.base_rate
+
+            self.calls += 1
+            if delay > 0:
+                self.waited_calls += 1
+                self.total_wait += delay
+                self.max_wait = max(self.max_wait, delay)
+            return delay
+
+    def acquire(self) -> None:
+        """Block the calling thread until a request may be made."""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+    def update(self, remaining: float, reset: float) -> None:
+        """
+        Retune the bucket from the server's view of the quota.
+
+        Args:
+            remaining: Requests left in the current window
+            reset: Seconds until the window resets
+        """
+        reset = max(reset, 1.0)
+        with self._lock:
+            now = time.monotonic()
+            if (
+                self._reset_at is not None
+                and now + reset > self._reset_at + self.period / 2
+            ):
+                # The server already rolled into a new window: settle the
+                # old one as if its deadline had just passed
+                self._reset_at = now
+            self._refill(now)
+            self._reset_at = now + reset
+            if remaining >= 1:
+                # Spend what is left evenly over the rest of the window. The
+                # server's count only lowers ours: raising it would let new
+                # callers jump the reservations already queued in the window
+                self.rate = remaining / reset
+                self._tokens = min(self._tokens, remaining)
+            else:
+                # Quota exhausted: nobody goes before the window resets
+                self._tokens = min(self._tokens, -reset * self.rate)
+
+    def update_from_headers(self, headers: Mapping[str, str]) -> None:
+        """Retune the bucket from ``x-ratelimit-*`` response headers."""
+        remaining = headers.get("x-ratelimit-remaining")
+        reset = headers.get("x-ratelimit-reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            self.update(float(remaining), float(reset))
+        except ValueError:
+            pass
+
+    def stats(self) -> Dict[str, float]:
+        """Return wait counters for reporting."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "waited_calls": self.waited_calls,
+                "total_wait": self.total_wait,
+                "max_wait": self.max_wait,
+                "rate": self.rate,
+            }
+
+    def summary(self) -> str:
+        """Return a one-line human-readable report of the wait counters."""
+        stats = self.stats()
+        return (
+            f"Rate limiter: {stats['calls']} calls, "
+            f"{stats['waited_calls']} waited, "
+            f"{stats['total_wait']:.1f}s total wait "
+            f"(max {stats['max_wait']:.1f}s)"
+        )
+
+
+_shared_limiter = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_limiter() -> RateLimiter:
+    """Return the limiter shared by every scraper in this process."""
+    global _shared_limiter
+    with _shared_lock:
+        if _shared_limiter is None:
+            _shared_limiter = RateLimiter()
+        return _shared_limiter
@@ -0,0 +1,235 @@
+"""Compact records for scraped Reddit posts and comments."""
+
+import sys
+from collections.abc import Mapping
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+
+from .utils import format_timestamp
+
+REDDIT_URL = "https://reddit.com"
+LINK_POST = "[Link Post]"
+_TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def _intern(value) -> str:
+    """Intern a (possibly non-str) name so repeated values share one object."""
+    return sys.intern(str(value)) if value is not None else ""
+
+
+def _parse_timestamp(value):
+    """
+    Inverse of format_timestamp; also accepts raw Unix timestamps.
+
+    Strings in any other format are kept as they are.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.strptime(value, _TIMESTAMP_FORMAT).timestamp()
+    except ValueError:
+        return value
+
+
+def _permalink(url: str) -> str:
+    """Strip the Reddit host from a URL, keeping other URLs whole."""
+    if url and url.startswith(REDDIT_URL):
+        return url[len(REDDIT_URL) :]
+    return url or ""
+
+
+class _Record(Mapping):
+    """
+    Slot-based record with a read-only dict view.
+
+    Records are ``Mapping`` objects, so existing code that reads
+    ``post["title"]`` or ``post.get("score")`` keeps working, and
+    ``dict(record)`` / ``to_dict()`` rebuild the original item dict.
+    ``url`` and ``created_utc`` are computed on access from the stored
+    permalink and Unix timestamp.
+    """
+
+    __slots__ = ("subreddit", "permalink", "created", "score", "id")
+
+    # Keys of the dict view, in the scraper's original order
+    KEYS = ()
+    _KEY_SET = frozenset()
+
+    def __getitem__(self, key):
+        if key in self._KEY_SET:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key, default=None):
+        return getattr(self, key) if key in self._KEY_SET else default
+
+    def __iter__(self):
+        return iter(self.KEYS)
+
+    def __len__(self):
+        return len(self.KEYS)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return (type(self).from_dict, (self.to_dict(),))
+
+    @property
+    def url(self) -> str:
+        permalink = self.permalink
+        return REDDIT_URL + permalink if permalink.startswith("/") else permalink
+
+    @property
+    def created_utc(self) -> str:
+        created = self.created
+        if created is None:
+            return ""
+        if isinstance(created, str):
+            return created
+        return format_timestamp(created)
+
+    def to_dict(self) -> Dict:
+        """Return the item as the scraper's original plain dict."""
+        return {key: getattr(self, key) for key in self.KEYS}
+
+
+class Post(_Record):
+    """A scraped submission."""
+
+    __slots__ = ("title", "content", "num_comments")
+
+    KEYS = (
+        "title",
+        "content",
+        "subreddit",
+        "url",
+        "created_utc",
+        "score",
+        "num_comments",
+        "id",
+    )
+    _KEY_SET = frozenset(KEYS)
+
+    def __init__(
+        self,
+        title: str,
+        content: str,
+        subreddit: str,
+        permalink: str,
+        created: Optional[float],
+        score: int,
+        num_comments: int,
+        id: str,
+    ):
+        self.title = title
+        # Link posts share a single placeholder string
+        self.content = LINK_POST if content == LINK_POST else content
+        self.subreddit = _intern(subreddit)
+        self.permalink = permalink
+        self.created = created
+        self.score = score
+        self.num_comments = num_comments
+        self.id = id
+
+    @classmethod
+    def from_praw(cls, post) -> "Post":
+        """Build a record from a PRAW (or Async PRAW) submission."""
+        return cls(
+            title=post.title,
+            content=post.selftext if post.is_self else LINK_POST,
+            subreddit=post.subreddit,
+            permalink=post.permalink,
+            created=post.created_utc,
+            score=post.score,
+            num_comments=post.num_comments,
+            id=post.id,
+        )
+
+    @classmethod
+    def from_dict(cls, item: Dict) -> "Post":
+        """Build a record from a post dict (e.g. loaded from JSON)."""
+        return cls(
+            title=item.get("title", ""),
+            content=item.get("content", ""),
+            subreddit=item.get("subreddit"),
+            permalink=_permalink(item.get("url")),
+            created=_parse_timestamp(item.get("created_utc")),
+            score=item.get("score", 0),
+            num_comments=item.get("num_comments", 0),
+            id=item.get("id"),
+        )
+
+
+class Comment(_Record):
+    """A scraped comment."""
+
+    __slots__ = ("body", "parent_id")
+
+    KEYS = ("body", "subreddit", "url", "created_utc", "score", "id", "parent_id")
+    _KEY_SET = frozenset(KEYS)
+
+    def __init__(
+        self,
+        body: str,
+        subreddit: str,
+        permalink: str,
+        created: Optional[float],
+        score: int,
+        id: str,
+        parent_id: Optional[str],
+    ):
+        self.body = body
+        self.subreddit = _intern(subreddit)
+        self.permalink = permalink
+        self.created = created
+        self.score = score
+        self.id = id
+        self.parent_id = parent_id
+
+    @classmethod
+    def from_praw(cls, comment) -> "Comment":
+        """Build a record from a PRAW (or Async PRAW) comment."""
+        return cls(
+            body=comment.body,
+            subreddit=comment.subreddit,
+            permalink=comment.permalink,
+            created=comment.created_utc,
+            score=comment.score,
+            id=comment.id,
+            parent_id=comment.parent_id,
+        )
+
+    @classmethod
+    def from_dict(cls, item: Dict) -> "Comment":
+        """Build a record from a comment dict (e.g. loaded from JSON)."""
+        return cls(
+            body=item.get("body", ""),
+            subreddit=item.get("subreddit"),
+            permalink=_permalink(item.get("url")),
+            created=_parse_timestamp(item.get("created_utc")),
+            score=item.get("score", 0),
+            id=item.get("id"),
+            parent_id=item.get("parent_id"),
+        )
+
+
+RECORD_TYPES = {"post": Post, "comment": Comment}
+
+
+def to_records(kind: str, items: Iterable[Dict]) -> List[_Record]:
+    """Convert item dicts of one kind (``"post"``/``"comment"``) to records."""
+    record_type = RECORD_TYPES[kind]
+    return [
+        item if isinstance(item, record_type) else record_type.from_dict(item)
+        for item in items
+    ]
+
+
+def to_json_default(value):
+    """``json.dumps`` hook that serializes records as their dict view."""
+    if isinstance(value, _Record):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
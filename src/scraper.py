@@ -1,20 +1,99 @@
 """Reddit scraping functionality."""
 
-import time
-from typing import List, Dict
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Iterator, List, Dict, Set, Tuple
 from datetime import datetime
-
-import praw
+from functools import lru_cache
+from itertools import islice
 
 import config
-from .utils import format_timestamp
+from .metrics import current_user, inc, span, user_scope
+from .ratelimit import RateLimiter, get_shared_limiter
+from .records import Comment, Post
+from .store import ItemStore
+
+
+# Reddit fullname prefixes, used to continue a listing below a stored item
+_FULLNAME_PREFIX = {"post": "t3_", "comment": "t1_"}
+
+class UserNotFound(ValueError):
+    """Raised when a Reddit user does not exist or is suspended."""
+
+
+# praw and prawcore are imported on first use: they take a large share of
+# the startup time of commands that never talk to Reddit
+
+
+def _missing_user_errors() -> Tuple[type, ...]:
+    """Listing errors meaning the user does not exist or is suspended."""
+    import prawcore
+
+    return (
+        prawcore.exceptions.NotFound,
+        prawcore.exceptions.Forbidden,
+        prawcore.exceptions.Redirect,
+    )
+
+
+@lru_cache(maxsize=None)
+def _requestor_class() -> type:
+    """Define RateLimitedRequestor once prawcore is needed."""
+    import prawcore
+
+    class RateLimitedRequestor(prawcore.Requestor):
+        """PRAW requestor that paces every call through a shared limiter."""
+
+        def __init__(self, *args, limiter: RateLimiter = None, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.limiter = limiter or get_shared_limiter()
+
+        def request(self, *args, **kwargs):
+            """Issue the HTTP request once the limiter grants a slot."""
+            with span("ratelimit.wait"):
+                self.limiter.acquire()
+            try:
+                with span("reddit.request"):
+                    response = super().request(*args, **kwargs)
+            except prawcore.sessions.Session.RETRY_EXCEPTIONS:
+                inc("reddit_retries_total")
+                raise
+            inc("reddit_requests_total", status=response.status_code)
+            if response.status_code in prawcore.sessions.Session.RETRY_STATUSES:
+                inc("reddit_retries_total")
+            self.limiter.update_from_headers(response.headers)
+            return response
+
+    return RateLimitedRequestor
+
+
+def __getattr__(name):
+    if name == "RateLimitedRequestor":
+        return _requestor_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 class RedditScraper:
-    """Scrape Reddit user posts and comments."""
+    """
+    Scrape Reddit user posts and comments.
+
+    praw.Reddit is not thread-safe, so every thread that scrapes (batch
+    workers, GUI jobs, service requests) gets its own clients, one per
+    listing, and all of them share one rate limiter and item store. A
+    page stream started on one thread and resumed on another (e.g.
+    deferred citation pages) keeps using the first thread's clients,
+    guarded by their locks. The posts and comments listings do not
+    depend on each other, so their pages are requested concurrently on
+    a fetch pool shared by every stream of the scraper.
+    """
 
     def __init__(
-        self, client_id: str = None, client_secret: str = None, user_agent: str = None
+        self,
+        client_id: str = None,
+        client_secret: str = None,
+        user_agent: str = None,
+        limiter: RateLimiter = None,
+        store: ItemStore = None,
     ):
         """
         Initialize Reddit scraper with API credentials.
@@ -23,93 +102,356 @@ class RedditScraper:
             client_id: Reddit API client ID
             client_secret: Reddit API client secret
             user_agent: User agent string for Reddit API
+            limiter: Rate limiter shared with other scrapers
+                (default: the process-wide limiter)
+            store: Optional local item cache for incremental refreshes
+        """
+        self.limiter = limiter or get_shared_limiter()
+        self.store = store
+        self._credentials = {
+            "client_id": client_id or config.REDDIT_CLIENT_ID,
+            "client_secret": client_secret or config.REDDIT_CLIENT_SECRET,
+            "user_agent": user_agent or config.REDDIT_USER_AGENT,
+        }
+        self._local = threading.local()
+        self._fetcher = ThreadPoolExecutor(
+            max_workers=config.SCRAPE_FETCH_THREADS, thread_name_prefix="reddit-fetch"
+        )
+        # Create this thread's client now, so bad settings fail early
+        self._client()
+
+    @property
+    def reddit(self):
+        """The calling thread's PRAW client."""
+        return self._client()[0]
+
+    def _client(self, kind: str = "post") -> Tuple[object, threading.Lock]:
+        """
+        Return the calling thread's PRAW client and the lock guarding it.
+
+        Args:
+            kind: Listing the client reads ("post" or "comment"); each gets
+                its own client so both can be fetched at once
         """
-        self.reddit = praw.Reddit(
-            client_id=client_id or config.REDDIT_CLIENT_ID,
-            client_secret=client_secret or config.REDDIT_CLIENT_SECRET,
-            user_agent=user_agent or config.REDDIT_USER_AGENT,
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+        if kind not in clients:
+            clients[kind] = (self._new_reddit(), threading.Lock())
+        return clients[kind]
+
+    def _new_reddit(self):
+        """Create a PRAW client paced by the shared limiter."""
+        import praw
+
+        return praw.Reddit(
+            **self._credentials,
             check_for_async=False,
+            requestor_class=_requestor_class(),
+            requestor_kwargs={"limiter": self.limiter},
         )
 
     def scrape_user(self, username: str) -> Dict[str, List[Dict]]:
         """
         Scrape posts and comments for a Reddit user.
 
+        With a store attached, a user refreshed within the store's TTL is
+        served without any network calls, and otherwise only items newer
+        than the newest stored ones are fetched.
+
         Args:
             username: Reddit username to scrape
 
         Returns:
             Dictionary containing posts and comments
         """
-        try:
-            user = self.reddit.redditor(username)
-
-            # Check if user exists
+        with user_scope(username), span("scrape"):
+            posts, comments = [], []
             try:
-                user.id  # This will fail if user doesn't exist
-            except Exception:
-                raise ValueError(f"User '{username}' not found or suspended")
-
-            # Scrape posts
-            posts = self._scrape_posts(user)
-
-            # Add delay to respect rate limits
-            time.sleep(config.REQUEST_DELAY)
-
-            # Scrape comments
-            comments = self._scrape_comments(user)
+                for kind, page in self.iter_pages(username):
+                    (posts if kind == "post" else comments).extend(page)
+            except Exception as e:
+                raise Exception(f"Error scraping user {username}: {str(e)}")
 
+            refreshed = self.store.refreshed_at(username) if self.store else None
+            scraped_at = datetime.fromtimestamp(refreshed) if refreshed else None
             return {
                 "username": username,
                 "posts": posts,
                 "comments": comments,
-                "scrape_timestamp": datetime.now().isoformat(),
+                "scrape_timestamp": (scraped_at or datetime.now()).isoformat(),
             }
 
-        except Exception as e:
-            raise Exception(f"Error scraping user {username}: {str(e)}")
+    def iter_pages(self, username: str) -> Iterator[Tuple[str, List[Dict]]]:
+        """
+        Yield a user's posts and comments one listing page at a time.
 
-    def _scrape_posts(self, user) -> List[Dict]:
-        """Scrape user's posts."""
-        posts = []
+        Pages of posts and comments alternate, newest first, so consumers
+        get a mix of both early and can stop (``close()`` the generator)
+        once they have enough. The next page of each listing is requested
+        concurrently, so a consumer that stops part way through a round
+        has had at most one page per listing read ahead of it; pages
+        beyond that are never requested from Reddit.
 
-        try:
-            for post in user.submissions.new(limit=config.MAX_POSTS):
-                posts.append(
-                    {
-                        "title": post.title,
-                        "content": (post.selftext if post.is_self else "[Link Post]"),
-                        "subreddit": str(post.subreddit),
-                        "url": f"https://reddit.com{post.permalink}",
-                        "created_utc": format_timestamp(post.created_utc),
-                        "score": post.score,
-                        "num_comments": post.num_comments,
-                        "id": post.id,
-                    }
-                )
-        except Exception as e:
-            print(f"Error scraping posts: {e}")
-
-        return posts
-
-    def _scrape_comments(self, user) -> List[Dict]:
-        """Scrape user's comments."""
-        comments = []
+        With a store attached, a fresh user is served from the store.
+        Otherwise only items newer than the stored ones are fetched,
+        followed by the stored items. If only the newest part of a
+        listing is stored, reading past it continues the listing below
+        the oldest stored item. Whatever was read is stored when the
+        stream ends or is closed: a listing read down to the stored
+        items (or its end) is merged, and one closed before that point
+        replaces the stored items with the newest items read, so the
+        store never holds a gap and the next run within the TTL needs no
+        requests for the items it already read.
+
+        Args:
+            username: Reddit username to scrape
+
+        Yields:
+            ``("post", [Post, ...])`` and ``("comment", [Comment, ...])``
+
+        Raises:
+            UserNotFound: If the user does not exist or is suspended
+        """
+        fresh = self.store is not None and self.store.is_fresh(username)
+
+        # Per kind: items read above and below the stored ones, and why
+        # reading the newest items stopped ("known", "end" or "error")
+        reads = {
+            kind: {
+                "new": [],
+                "stop": "known" if fresh else None,
+                "old": [],
+                "old_stop": None,
+            }
+            for kind in ("post", "comment")
+        }
+        listings = []
+        for kind, read in reads.items():
+            # No separate existence check: the first listing page reports a
+            # missing or suspended user, which saves a request per user
+            reddit, lock = self._client(kind)
+            user = reddit.redditor(username)
+            pages = self._kind_pages(username, user, lock, kind, fresh, read)
+            listings.append((kind, pages))
 
         try:
-            for comment in user.comments.new(limit=config.MAX_COMMENTS):
-                comments.append(
-                    {
-                        "body": comment.body,
-                        "subreddit": str(comment.subreddit),
-                        "url": f"https://reddit.com{comment.permalink}",
-                        "created_utc": format_timestamp(comment.created_utc),
-                        "score": comment.score,
-                        "id": comment.id,
-                        "parent_id": comment.parent_id,
-                    }
-                )
-        except Exception as e:
-            print(f"Error scraping comments: {e}")
-
-        return comments
+            # A fresh user is served from the store, with nothing to wait on
+            yield from _interleave(listings) if fresh else self._fetch(listings)
+        except GeneratorExit:
+            if self.store is not None:
+                self._save(username, reads, refreshed=not fresh)
+            raise
+
+        if self.store is not None:
+            self._save(username, reads, refreshed=not fresh)
+
+    def _fetch(self, listings) -> Iterator[Tuple[str, List]]:
+        """
+        Alternate between ``(kind, pages)`` iterators like _interleave, but
+        advance all of them at once on the fetch pool.
+
+        Every round of pages has been read when the generator returns or is
+        closed, so the caller can store what was read.
+        """
+        user = current_user()
+
+        def advance(pages):
+            with user_scope(user):
+                return next(pages, None)
+
+        active = list(listings)
+        while active:
+            round_ = [
+                (entry, self._fetcher.submit(advance, entry[1])) for entry in active
+            ]
+            try:
+                for entry, future in round_:
+                    page = future.result()
+                    if page is None:
+                        active.remove(entry)
+                    else:
+                        yield entry[0], page
+            finally:
+                wait([future for _, future in round_])
+
+    def _kind_pages(
+        self,
+        username: str,
+        user,
+        lock: threading.Lock,
+        kind: str,
+        fresh: bool,
+        read: Dict,
+    ) -> Iterator[List[Dict]]:
+        """
+        Yield the pages of one kind for iter_pages, recording them in ``read``.
+
+        New items come from Reddit (unless the user is fresh), then the
+        stored items below them, then, if the stored items are only the
+        newest part of the listing, the listing below the oldest of them.
+        """
+        limit = _limit(kind)
+        record_type = Post if kind == "post" else Comment
+        listing = user.submissions if kind == "post" else user.comments
+
+        stored, complete = [], True
+        if self.store is not None:
+            with span("scrape.store"):
+                stored = self.store.load(username, kind, limit)
+                complete = self.store.is_complete(username, kind)
+
+        if not fresh:
+            known = {item["id"] for item in stored}
+            read["stop"] = yield from self._listing_pages(
+                username,
+                listing.new(limit=limit),
+                record_type,
+                lock,
+                known,
+                read["new"],
+            )
+            if read["stop"] != "known":
+                # Read to the end of the listing, or failed part way
+                return
+
+        new_ids = {item["id"] for item in read["new"]}
+        older = [item for item in stored if item["id"] not in new_ids]
+        older = older[: limit - len(read["new"])]
+        yield from _chunks(older, config.SCRAPE_PAGE_SIZE)
+
+        remaining = limit - len(read["new"]) - len(older)
+        if complete or remaining <= 0:
+            return
+        params = {"after": _FULLNAME_PREFIX[kind] + older[-1]["id"]} if older else None
+        read["old_stop"] = yield from self._listing_pages(
+            username,
+            listing.new(limit=remaining, params=params),
+            record_type,
+            lock,
+            read=read["old"],
+        )
+
+    def _save(self, username: str, reads: Dict[str, Dict], refreshed: bool) -> None:
+        """
+        Merge the items iter_pages read into the store.
+
+        Args:
+            username: Reddit username
+            reads: Items read of each kind, as recorded by _kind_pages
+            refreshed: Whether Reddit was asked for new items; only then is
+                the user marked refreshed
+        """
+        with span("scrape.store"):
+            for kind, read in reads.items():
+                keep = _limit(kind)
+                if read["stop"] == "known":
+                    # The new items sit directly above the stored ones and
+                    # the older ones directly below them
+                    complete = True if read["old_stop"] == "end" else None
+                    self.store.merge(
+                        username,
+                        kind,
+                        read["new"] + read["old"],
+                        keep=keep,
+                        complete=complete,
+                    )
+                elif read["stop"] == "end":
+                    self.store.merge(
+                        username, kind, read["new"], keep, complete=True, replace=True
+                    )
+                elif read["new"]:
+                    # Stopped above the stored items: keep the newest part
+                    self.store.merge(
+                        username, kind, read["new"], keep, complete=False, replace=True
+                    )
+            if refreshed:
+                self.store.mark_refreshed(username)
+
+    def _listing_pages(
+        self,
+        username: str,
+        listing,
+        record_type,
+        lock: threading.Lock,
+        known_ids: Set[str] = None,
+        read: List[Dict] = None,
+    ) -> Iterator[List[Dict]]:
+        """
+        Turn a PRAW listing into pages of records.
+
+        Each page is one listing request, made while holding the client's
+        ``lock``, and is appended to ``read`` before it is yielded. Paging
+        stops at the first already-known id, at the end of the listing, or
+        on an error.
+
+        Returns:
+            Why paging stopped: ``"known"``, ``"end"`` or ``"error"``
+
+        Raises:
+            UserNotFound: If the first page reports a missing or suspended user
+        """
+        kind = "post" if record_type is Post else "comment"
+        iterator = iter(listing)
+        size = config.SCRAPE_PAGE_SIZE
+        first = True
+
+        while True:
+            page = []
+            stop = None
+            try:
+                with span(f"scrape.{kind}s"), lock:
+                    for item in islice(iterator, size):
+                        if known_ids and item.id in known_ids:
+                            stop = "known"
+                            break
+                        page.append(record_type.from_praw(item))
+                    else:
+                        if len(page) < size:
+                            stop = "end"
+            except Exception as e:
+                if first and isinstance(e, _missing_user_errors()):
+                    raise UserNotFound(f"User '{username}' not found or suspended")
+                print(f"Error scraping {kind}s: {e}")
+                stop = "error"
+            first = False
+
+            if page:
+                if read is not None:
+                    read.extend(page)
+                yield page
+            if stop:
+                return stop
+
+
+def _limit(kind: str) -> int:
+    """Maximum number of items of one kind scraped per user."""
+    return config.MAX_POSTS if kind == "post" else config.MAX_COMMENTS
+
+
+def _chunks(items: List, size: int) -> Iterator[List]:
+    for start in range(0, len(items), size):
+        yield items[start : start + size]
+
+
+def _interleave(listings) -> Iterator[Tuple[str, List]]:
+    """Alternate between ``(kind, pages)`` iterators until all are used up."""
+    active = list(listings)
+    while active:
+        for entry in list(active):
+            kind, pages = entry
+            page = next(pages, None)
+            if page is None:
+                active.remove(entry)
+            else:
+                yield kind, page
+
+
+def paginate(
+    posts: List[Dict], comments: List[Dict], page_size: int = None
+) -> Iterator[Tuple[str, List[Dict]]]:
+    """Split already-scraped items into pages, as RedditScraper.iter_pages does."""
+    size = page_size or config.SCRAPE_PAGE_SIZE
+    return _interleave(
+        [("post", _chunks(posts, size)), ("comment", _chunks(comments, size))]
+    )
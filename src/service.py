@@ -0,0 +1,195 @@
+"""Long-running local HTTP service that builds personas on request."""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from aiohttp import web
+
+import config
+from .metrics import get_registry, inc, span, user_scope
+from .scraper import UserNotFound
+from .utils import parse_user_reference
+
+
+class PersonaService:
+    """
+    Serve personas from one warm scraper and analyzer.
+
+    The scraper's HTTP session and the OpenAI client are created once and
+    reused by every request, so their pooled keep-alive connections skip
+    the setup and handshakes a CLI run pays each time. Concurrent requests
+    for the same username (case-insensitively) share a single in-flight
+    computation, and at most ``max_concurrency`` users are scraped and
+    analyzed at once; the blocking work runs on a thread pool of that size
+    while the event loop keeps answering health and metrics requests.
+    """
+
+    def __init__(self, scraper, analyzer, max_concurrency: int = None):
+        """
+        Initialize the service.
+
+        Args:
+            scraper: Scraper providing ``iter_pages`` (RedditScraper or a
+                ReplayScraper stand-in)
+            analyzer: PersonaAnalyzer (optionally with a replay client)
+            max_concurrency: Users analyzed at the same time
+                (default: config.SERVICE_MAX_CONCURRENCY)
+        """
+        self.scraper = scraper
+        self.analyzer = analyzer
+        self.max_concurrency = max(
+            1, max_concurrency or config.SERVICE_MAX_CONCURRENCY
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_concurrency, thread_name_prefix="persona-service"
+        )
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self._in_flight: Dict[str, asyncio.Task] = {}
+        self._running = 0
+        self._started = time.monotonic()
+
+    async def persona(self, username: str) -> Dict:
+        """
+        Build the persona of ``username``, joining a computation in progress.
+
+        Returns:
+            Dict with username, post and comment counts and the persona
+
+        Raises:
+            UserNotFound: If the user does not exist or is suspended
+        """
+        key = username.lower()
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._compute(username))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._settle(key, done))
+        else:
+            inc("service_coalesced_total")
+        # A waiter that goes away must not cancel the others' computation
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, task: asyncio.Task) -> None:
+        """Forget a finished computation so the next request starts afresh."""
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved even if every waiter left
+            task.exception()
+
+    async def _compute(self, username: str) -> Dict:
+        """Wait for a free slot, then build the persona on the thread pool."""
+        async with self._slots:
+            self._running += 1
+            try:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, self._build, username)
+            finally:
+                self._running -= 1
+
+    def _build(self, username: str) -> Dict:
+        """Scrape, pack and analyze one user (runs on a pool thread)."""
+        with user_scope(username), span("service.persona"):
+            prepared = self.analyzer.consume_pages(
+                username, self.scraper.iter_pages(username)
+            )
+            persona = self.analyzer.analyze_user(*prepared)
+        user_data = prepared[0]
+        return {
+            "username": username,
+            "posts": len(user_data["posts"]),
+            "comments": len(user_data["comments"]),
+            "persona": persona,
+        }
+
+    def health(self) -> Dict:
+        """Return the service status and current load."""
+        return {
+            "status": "ok",
+            "uptime_s": round(time.monotonic() - self._started, 3),
+            "max_concurrency": self.max_concurrency,
+            "running": self._running,
+            "in_flight": len(self._in_flight),
+        }
+
+    async def handle_persona(self, request: web.Request) -> web.Response:
+        """GET /persona/{username}: the user's persona as JSON."""
+        username = parse_user_reference(request.match_info["username"])
+        if not username:
+            return self._respond({"error": "Invalid Reddit username"}, 400)
+        try:
+            result = await self.persona(username)
+        except UserNotFound as e:
+            return self._respond({"error": str(e)}, 404)
+        except Exception as e:
+            return self._respond({"error": f"Error analyzing u/{username}: {e}"}, 502)
+        return self._respond(result, 200)
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """GET /health: liveness and load."""
+        return web.json_response(self.health())
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """GET /metrics: Prometheus text, or JSON with ``?format=json``."""
+        if request.query.get("format") == "json":
+            report = get_registry().to_json()
+            report["service"] = self.health()
+            return web.json_response(report)
+        return web.Response(text=get_registry().to_prometheus())
+
+    def _respond(self, body: Dict, status: int) -> web.Response:
+        inc("service_requests_total", status=status)
+        return web.json_response(body, status=status)
+
+    def close(self) -> None:
+        """Wait for running analyses and release the thread pool."""
+        self._executor.shutdown(wait=True)
+
+
+def create_app(service: PersonaService) -> web.Application:
+    """Build the aiohttp application serving ``service``."""
+    app = web.Application()
+    app.router.add_get("/persona/{username}", service.handle_persona)
+    app.router.add_get("/health", service.handle_health)
+    app.router.add_get("/metrics", service.handle_metrics)
+
+    async def close(_app):
+        await asyncio.get_running_loop().run_in_executor(None, service.close)
+
+    app.on_cleanup.append(close)
+    return app
+
+
+def serve(
+    scraper,
+    analyzer,
+    host: str = None,
+    port: int = None,
+    max_concurrency: int = None,
+) -> None:
+    """
+    Run the persona service until interrupted.
+
+    Args:
+        scraper: Scraper shared by every request
+        analyzer: Analyzer shared by every request
+        host: Interface to listen on (default: config.SERVICE_HOST)
+        port: Port to listen on (default: config.SERVICE_PORT)
+        max_concurrency: Users analyzed at the same time
+            (default: config.SERVICE_MAX_CONCURRENCY)
+    """
+    host = host or config.SERVICE_HOST
+    port = port or config.SERVICE_PORT
+
+    async def start():
+        # The semaphore and tasks belong to the loop run_app starts
+        service = PersonaService(scraper, analyzer, max_concurrency)
+        print(
+            f"Persona service listening on http://{host}:{port} "
+            f"(up to {service.max_concurrency} users at once)"
+        )
+        return create_app(service)
+
+    web.run_app(start(), host=host, port=port, print=None)
@@ -0,0 +1,183 @@
+"""Persistent SQLite store of scraped Reddit posts and comments."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Set
+
+import config
+from .records import to_json_default, to_records
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    refreshed_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS items (
+    username TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    data TEXT NOT NULL,
+    PRIMARY KEY (username, kind, id)
+);
+CREATE INDEX IF NOT EXISTS items_by_age ON items (username, kind, seq DESC);
+CREATE TABLE IF NOT EXISTS listings (
+    username TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    complete INTEGER NOT NULL,
+    PRIMARY KEY (username, kind)
+);
+"""
+
+
+def _item_seq(item_id: str) -> int:
+    """Order key for a Reddit id; base-36 ids grow with creation time."""
+    try:
+        return int(item_id, 36)
+    except (TypeError, ValueError):
+        return 0
+
+
+class ItemStore:
+    """
+    Local cache of scraped items keyed by username and item id.
+
+    Items are ordered newest first by their Reddit id, so an incremental
+    refresh only has to page listings until it reaches a stored id. The
+    stored items of a kind never have gaps: they are either the whole
+    listing or, when a read stopped early, its newest part, which later
+    reads can extend from the oldest stored item.
+    """
+
+    def __init__(self, path: str = None, ttl: float = None):
+        """
+        Open (or create) the store.
+
+        Args:
+            path: SQLite database file (default: config.ITEM_CACHE_PATH)
+            ttl: Seconds a refresh stays fresh (default: config.ITEM_CACHE_TTL)
+        """
+        self.path = path or config.ITEM_CACHE_PATH
+        self.ttl = config.ITEM_CACHE_TTL if ttl is None else ttl
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def refreshed_at(self, username: str) -> Optional[float]:
+        """Return the Unix time of the user's last refresh, if any."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT refreshed_at FROM users WHERE username = ?", (username,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def is_fresh(self, username: str) -> bool:
+        """Return True if the user was refreshed within the TTL."""
+        refreshed_at = self.refreshed_at(username)
+        return refreshed_at is not None and time.time() - refreshed_at < self.ttl
+
+    def mark_refreshed(self, username: str) -> None:
+        """Record that the user's listings were just refreshed."""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (username, refreshed_at) VALUES (?, ?)",
+                (username, time.time()),
+            )
+
+    def ids(self, username: str, kind: str) -> Set[str]:
+        """Return the ids of all stored items of one kind."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id FROM items WHERE username = ? AND kind = ?",
+                (username, kind),
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def is_complete(self, username: str, kind: str) -> bool:
+        """Return False if only the newest part of a listing is stored."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT complete FROM listings WHERE username = ? AND kind = ?",
+                (username, kind),
+            ).fetchone()
+        # Stores written before partial listings were kept hold whole ones
+        return bool(row[0]) if row else True
+
+    def load(self, username: str, kind: str, limit: int) -> List[Dict]:
+        """Return up to ``limit`` stored records of one kind, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT data FROM items WHERE username = ? AND kind = ? "
+                "ORDER BY seq DESC LIMIT ?",
+                (username, kind, limit),
+            ).fetchall()
+        return to_records(kind, (json.loads(row[0]) for row in rows))
+
+    def merge(
+        self,
+        username: str,
+        kind: str,
+        items: List[Dict],
+        keep: int,
+        complete: bool = None,
+        replace: bool = False,
+    ) -> None:
+        """
+        Insert or update items and trim the user's history.
+
+        Args:
+            username: Reddit username
+            kind: ``"post"`` or ``"comment"``
+            items: Records (or item dicts) as produced by the scraper
+            keep: Number of newest items of this kind to retain
+            complete: Whether the stored items now cover the whole listing
+                (default: unchanged)
+            replace: Drop the stored items of this kind first
+        """
+        rows = [
+            (
+                username,
+                kind,
+                item["id"],
+                _item_seq(item["id"]),
+                json.dumps(item, default=to_json_default),
+            )
+            for item in items
+        ]
+        with self._lock, self._conn:
+            if replace:
+                self._conn.execute(
+                    "DELETE FROM items WHERE username = ? AND kind = ?",
+                    (username, kind),
+                )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO items (username, kind, id, seq, data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                rows,
+            )
+            self._conn.execute(
+                "DELETE FROM items WHERE username = ? AND kind = ? AND id NOT IN "
+                "(SELECT id FROM items WHERE username = ? AND kind = ? "
+                "ORDER BY seq DESC LIMIT ?)",
+                (username, kind, username, kind, keep),
+            )
+            if complete is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO listings (username, kind, complete) "
+                    "VALUES (?, ?, ?)",
+                    (username, kind, int(complete)),
+                )
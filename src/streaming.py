@@ -0,0 +1,86 @@
+"""Incremental parsing of streamed persona JSON."""
+
+import json
+from typing import Dict, List, Optional, Tuple
+
+
+class IncrementalPersonaParser:
+    """
+    Emit persona traits as soon as their JSON objects are complete.
+
+    The model streams an object of the form
+    ``{"category": {"trait": {...}, ...}, ...}``. Text is fed in arbitrary
+    pieces; each ``feed`` call returns the traits whose closing brace has
+    arrived, so callers can show them long before the whole response is
+    in. Besides object keys, only complete trait objects are decoded.
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        # Most recent complete string at each depth (candidate object key)
+        self._last_string: Dict[int, str] = {}
+        self._category: Optional[str] = None
+        self._trait: Optional[str] = None
+        self._trait_start = 0
+        self._text = ""
+
+    def feed(self, chunk: str) -> List[Tuple[str, str, Dict]]:
+        """
+        Consume the next piece of the response.
+
+        Args:
+            chunk: Newly received response text
+
+        Returns:
+            ``(category, trait_name, trait_info)`` for every trait object
+            completed by this chunk
+        """
+        events = []
+        offset = len(self._text)
+        self._text += chunk
+
+        for position in range(offset, len(self._text)):
+            char = self._text[position]
+
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    raw = self._text[self._string_start : position + 1]
+                    self._last_string[self._depth] = json.loads(raw)
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = position
+            elif char in "{[":
+                if char == "{" and self._depth == 1:
+                    self._category = self._last_string.get(1)
+                elif char == "{" and self._depth == 2:
+                    self._trait = self._last_string.get(2)
+                    self._trait_start = position
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if char == "}" and self._depth == 2 and self._trait is not None:
+                    raw = self._text[self._trait_start : position + 1]
+                    try:
+                        info = json.loads(raw)
+                    except ValueError:
+                        info = None
+                    if isinstance(info, dict) and self._category is not None:
+                        events.append((self._category, self._trait, info))
+                    self._trait = None
+
+        return events
+
+    @property
+    def text(self) -> str:
+        """All text fed so far."""
+        return self._text
@@ -2,7 +2,9 @@
 
 import re
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
+
+from .metrics import span, user_scope
 
 
 def extract_username_from_url(url: str) -> Optional[str]:
@@ -30,6 +32,30 @@ def extract_username_from_url(url: str) -> Optional[str]:
     return None
 
 
+def parse_user_reference(value: str) -> Optional[str]:
+    """
+    Resolve a profile URL or bare username to a username.
+
+    Accepts full profile URLs as well as ``username``, ``u/username`` and
+    ``/u/username`` forms, as found in batch input files.
+
+    Args:
+        value: Profile URL or username
+
+    Returns:
+        Username if found, None otherwise
+    """
+    username = extract_username_from_url(value)
+    if username:
+        return username
+
+    match = re.fullmatch(r"/?(?:u/|user/)?([A-Za-z0-9_-]{3,20})/?", value.strip())
+    if match:
+        return match.group(1)
+
+    return None
+
+
 def format_timestamp(timestamp: float) -> str:
     """Convert Unix timestamp to readable date."""
     return datetime.fromtimestamp(timestamp).strftime("%Y-%m-%d %H:%M:%S")
@@ -58,33 +84,49 @@ def format_output(username: str, persona_data: dict) -> str:
     Returns:
         Formatted string output
     """
-    output = []
-    output.append(f"{'=' * 50}")
-    output.append(f"Reddit User Persona: {username}")
-    output.append(f"{'=' * 50}")
-    output.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    output.append("")
-
-    # Add each persona category
-    for category, data in persona_data.items():
-        output.append(f"\n{category.upper()}")
-        output.append("-" * len(category))
-
-        if isinstance(data, dict):
-            for trait, info in data.items():
-                output.append(f"\n• {trait}")
-                if "description" in info:
-                    output.append(f"  {info['description']}")
-                if "citations" in info:
-                    output.append("  Citations:")
-                    # Limit to 3 citations
-                    for citation in info["citations"][:3]:
-                        output.append(f"    - {citation['text'][:100]}...")
-                        output.append(f"      Link: {citation['url']}")
-        else:
-            output.append(str(data))
-
-    return "\n".join(output)
+    with user_scope(username), span("render"):
+        output = []
+        output.append(f"{'=' * 50}")
+        output.append(f"Reddit User Persona: {username}")
+        output.append(f"{'=' * 50}")
+        output.append(f"Generated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        output.append("")
+
+        # Add each persona category
+        for category, data in persona_data.items():
+            output.append(f"\n{category.upper()}")
+            output.append("-" * len(category))
+
+            if isinstance(data, dict):
+                for trait, info in data.items():
+                    output.extend(format_trait(trait, info))
+            else:
+                output.append(str(data))
+
+        return "\n".join(output)
+
+
+def format_trait(trait: str, info: dict) -> List[str]:
+    """
+    Format one persona trait as output lines.
+
+    Args:
+        trait: Trait name
+        info: Trait dict with description and citations
+
+    Returns:
+        Lines for the trait, starting with a blank line
+    """
+    output = [f"\n• {trait}"]
+    if "description" in info:
+        output.append(f"  {info['description']}")
+    if "citations" in info:
+        output.append("  Citations:")
+        # Limit to 3 citations
+        for citation in info["citations"][:3]:
+            output.append(f"    - {citation['text'][:100]}...")
+            output.append(f"      Link: {citation['url']}")
+    return output
 
 
 def sanitize_filename(username: str) -> str:
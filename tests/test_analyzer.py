@@ -0,0 +1,50 @@
+"""Tests for the LLM fan-out of the persona analyzer."""
+
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import config
+from src import analyzer as analyzer_module
+from src.analyzer import CATEGORIES, PersonaAnalyzer
+
+
+class SlowClient:
+    """Chat completions stand-in that records how many calls overlap."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        time.sleep(0.05)
+        with self._lock:
+            self.active -= 1
+        content = json.dumps({category: {} for category in CATEGORIES})
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def test_llm_calls_share_one_process_wide_limit(monkeypatch):
+    monkeypatch.setattr(config, "LLM_MAX_CONCURRENCY", 3)
+    monkeypatch.setattr(analyzer_module, "_llm_slots", None)
+    client = SlowClient()
+    analyzer = PersonaAnalyzer(client=client, parallel_categories=True)
+
+    # Four users, each fanning out one request per category
+    threads = [
+        threading.Thread(target=analyzer._request_persona, args=("content",))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.peak == 3
@@ -0,0 +1,29 @@
+"""Tests for the locally computed activity features."""
+
+import time
+
+from benchmarks.synthetic import make_user
+from src.features import extract_features
+from src.records import to_records
+
+
+def test_dicts_and_records_give_the_same_activity_times(monkeypatch):
+    # Formatted timestamps are local time; use a zone away from UTC
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    try:
+        user_data = make_user(50, seed=5)
+        records = {
+            "posts": to_records("post", user_data["posts"]),
+            "comments": to_records("comment", user_data["comments"]),
+        }
+
+        from_dicts = extract_features(user_data)
+        from_records = extract_features(records)
+    finally:
+        monkeypatch.undo()
+        time.tzset()
+
+    assert sum(from_dicts["hours"]) == 100
+    assert from_dicts["hours"] == from_records["hours"]
+    assert from_dicts["weekdays"] == from_records["weekdays"]
@@ -0,0 +1,15 @@
+"""Tests for the in-process metrics registry."""
+
+from src.metrics import MetricsRegistry, user_scope
+
+
+def test_only_the_most_recent_users_keep_a_breakdown():
+    registry = MetricsRegistry(max_users=3)
+    for name in ["a", "b", "c", "a", "d"]:
+        with user_scope(name), registry.span("scrape"):
+            pass
+
+    users = registry.to_json()["users"]
+
+    assert list(users) == ["c", "a", "d"]
+    assert registry.to_json()["stages"]["scrape"]["count"] == 5
@@ -0,0 +1,79 @@
+"""Tests for the shared Reddit rate limiter."""
+
+import time
+
+import pytest
+
+from src.ratelimit import RateLimiter
+
+
+def drain(limiter: RateLimiter) -> None:
+    """Spend the burst so the next reservation has to wait."""
+    for _ in range(int(limiter.capacity)):
+        assert limiter.reserve() == 0
+
+
+def test_queued_delays_never_pass_the_window_reset():
+    limiter = RateLimiter(100, 60, 10)
+    limiter.update(1, 600)
+
+    delays = [limiter.reserve() for _ in range(11)]
+
+    assert delays[0] == 0
+    assert all(delay <= 600.01 for delay in delays)
+
+
+def test_callers_beyond_the_burst_continue_at_the_configured_rate():
+    limiter = RateLimiter(100, 60, 10)
+    limiter.update(0, 30)
+
+    delays = [limiter.reserve() for _ in range(12)]
+
+    assert max(delays[:10]) <= 30.01
+    assert delays[11] - delays[10] == pytest.approx(60 / 100, abs=0.01)
+
+
+def test_reports_within_a_window_keep_callers_paced():
+    limiter = RateLimiter(600, 600, 10)
+    drain(limiter)
+
+    delays = []
+    for i in range(50):
+        delays.append(limiter.reserve())
+        limiter.update(500 - i, 300)
+
+    assert all(later > earlier for earlier, later in zip(delays, delays[1:]))
+    assert delays[-1] > 20
+
+
+def test_more_quota_within_a_window_does_not_clear_the_debt():
+    limiter = RateLimiter(100, 60, 10)
+    limiter.update(5, 3000)
+    for _ in range(30):
+        limiter.reserve()
+
+    limiter.update(400, 2999)
+
+    assert limiter.reserve() > 0
+
+
+def test_a_new_window_restores_the_quota():
+    limiter = RateLimiter(100, 60, 10)
+    limiter.update(0, 10)
+    assert limiter.reserve() > 0
+
+    limiter.update(600, 60)
+
+    assert limiter.reserve() == 0
+
+
+def test_reset_restores_the_configured_rate_and_bucket():
+    limiter = RateLimiter(100, 60, 10)
+    drain(limiter)
+    limiter.update(1, 1)
+    limiter._reset_at = time.monotonic()
+
+    drain(limiter)
+
+    assert limiter.rate == 100 / 60
+
@@ -0,0 +1,209 @@
+"""Tests for demand-driven scraping through the local item store."""
+
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import config
+from src.analyzer import PersonaAnalyzer
+from src.scraper import RedditScraper
+from src.store import ItemStore
+
+
+def base36(number: int) -> str:
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    text = ""
+    while number:
+        number, rest = divmod(number, 36)
+        text = digits[rest] + text
+    return text or "0"
+
+
+class Listing:
+    """Newest-first listing that counts page requests like PRAW does."""
+
+    def __init__(self, items, prefix, backend):
+        self.items = items
+        self.prefix = prefix
+        self.backend = backend
+
+    def new(self, limit, params=None):
+        start = 0
+        after = (params or {}).get("after")
+        if after:
+            ids = [item.id for item in self.items]
+            start = ids.index(after[len(self.prefix) :]) + 1
+        return self._generate(self.items[start : start + limit])
+
+    def _generate(self, items):
+        for index, item in enumerate(items):
+            if index % config.SCRAPE_PAGE_SIZE == 0:
+                with self.backend.lock:
+                    self.backend.requests += 1
+            yield item
+
+
+class Backend:
+    """Stand-in for praw.Reddit serving one user's history."""
+
+    def __init__(self, size):
+        self.requests = 0
+        self.lock = threading.Lock()
+        posts = [
+            SimpleNamespace(
+                id=base36(10**6 - i),
+                title=f"post {i}",
+                selftext=f"body of post number {i} about topic {i % 7}",
+                is_self=True,
+                subreddit=f"sub{i % 5}",
+                permalink=f"/r/sub{i % 5}/comments/p{i}/",
+                created_utc=1.7e9 - i * 60,
+                score=i % 11,
+                num_comments=i % 3,
+            )
+            for i in range(size)
+        ]
+        comments = [
+            SimpleNamespace(
+                id=base36(10**6 - i),
+                body=f"comment number {i} on thread {i % 13}",
+                subreddit=f"sub{i % 5}",
+                permalink=f"/r/sub{i % 5}/comments/c{i}/",
+                created_utc=1.7e9 - i * 30,
+                score=i % 9,
+                parent_id=f"t3_{i}",
+            )
+            for i in range(size)
+        ]
+        self.user = SimpleNamespace(
+            submissions=Listing(posts, "t3_", self),
+            comments=Listing(comments, "t1_", self),
+        )
+
+    def redditor(self, username):
+        return self.user
+
+
+class StubScraper(RedditScraper):
+    """RedditScraper whose clients all talk to one stub backend."""
+
+    def __init__(self, backend, store):
+        self.backend = backend
+        super().__init__(client_id="id", client_secret="secret", store=store)
+
+    def _new_reddit(self):
+        return self.backend
+
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "MAX_POSTS", 500)
+    monkeypatch.setattr(config, "MAX_COMMENTS", 500)
+    store = ItemStore(path=str(tmp_path / "items.sqlite3"))
+    scraper = StubScraper(Backend(1000), store)
+    yield scraper
+    scraper.store.close()
+
+
+def analyze_pages(scraper):
+    analyzer = PersonaAnalyzer(client=object())
+    user_data, _, corpus = analyzer.consume_pages("bob", scraper.iter_pages("bob"))
+    corpus.close()
+    return user_data
+
+
+def test_second_run_is_served_from_the_store(scraper):
+    first = analyze_pages(scraper)
+    assert scraper.reddit.requests > 0
+    assert scraper.store.is_fresh("bob")
+    assert not scraper.store.is_complete("bob", "post")
+
+    scraper.reddit.requests = 0
+    second = analyze_pages(scraper)
+
+    assert scraper.reddit.requests == 0
+    assert [p["id"] for p in second["posts"]] == [p["id"] for p in first["posts"]]
+    assert [c["id"] for c in second["comments"]] == [
+        c["id"] for c in first["comments"]
+    ]
+
+
+def test_reading_past_a_stored_prefix_continues_the_listing(scraper):
+    analyze_pages(scraper)
+    stored = len(scraper.store.ids("bob", "post"))
+
+    scraper.reddit.requests = 0
+    user_data = scraper.scrape_user("bob")
+
+    posts = [p["id"] for p in user_data["posts"]]
+    assert len(posts) == config.MAX_POSTS
+    assert len(set(posts)) == len(posts)
+    assert posts == sorted(posts, key=lambda i: int(i, 36), reverse=True)
+    # Only the items below the stored prefix were requested
+    pages = -(-(config.MAX_POSTS - stored) // config.SCRAPE_PAGE_SIZE) * 2
+    assert scraper.reddit.requests == pages
+    assert scraper.store.is_complete("bob", "post")
+    assert len(scraper.store.ids("bob", "post")) == config.MAX_POSTS
+
+
+def test_expired_user_only_fetches_items_above_the_stored_ones(scraper):
+    analyze_pages(scraper)
+    scraper.store.ttl = 0
+
+    scraper.reddit.requests = 0
+    analyze_pages(scraper)
+
+    # One page per listing, stopping at the first stored id
+    assert scraper.reddit.requests == 2
+
+
+def test_pages_fetched_for_citations_are_stored(scraper):
+    analyzer = PersonaAnalyzer(client=object())
+    _, _, corpus = analyzer.consume_pages("bob", scraper.iter_pages("bob"))
+    while corpus._fetch_more():
+        pass
+    corpus.close()
+
+    extra = config.CITATION_FETCH_PAGES // 2 * config.SCRAPE_PAGE_SIZE
+    assert len(scraper.store.ids("bob", "post")) == config.SCRAPE_PAGE_SIZE + extra
+    assert len(scraper.store.ids("bob", "comment")) == config.SCRAPE_PAGE_SIZE + extra
+    assert scraper.store.is_fresh("bob")
+
+
+def test_both_listings_are_requested_at_once(scraper):
+    # Each listing waits for the other: requested one after the other,
+    # the first would time out
+    barrier = threading.Barrier(2, timeout=5)
+
+    def meeting(new):
+        def wrapper(*args, **kwargs):
+            barrier.wait()
+            return new(*args, **kwargs)
+
+        return wrapper
+
+    user = scraper.reddit.user
+    user.submissions.new = meeting(user.submissions.new)
+    user.comments.new = meeting(user.comments.new)
+
+    pages = scraper.iter_pages("bob")
+    kinds = [next(pages)[0], next(pages)[0]]
+    pages.close()
+
+    assert kinds == ["post", "comment"]
+
+
+def test_each_thread_gets_its_own_client():
+    class CountingScraper(RedditScraper):
+        def _new_reddit(self):
+            return object()
+
+    scraper = CountingScraper(client_id="id", client_secret="secret")
+    clients = []
+    thread = threading.Thread(target=lambda: clients.append(scraper.reddit))
+    thread.start()
+    thread.join()
+
+    assert scraper.reddit is scraper.reddit
+    assert clients[0] is not scraper.reddit
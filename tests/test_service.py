@@ -0,0 +1,177 @@
+"""Tests for the persona HTTP service against replay stand-ins."""
+
+import asyncio
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+from aiohttp.test_utils import TestClient, TestServer
+
+from benchmarks.synthetic import make_user
+from src.analyzer import PersonaAnalyzer
+from src.fixtures import (
+    SCRAPES_FILE,
+    RecordingOpenAIClient,
+    ReplayOpenAIClient,
+    ReplayScraper,
+    _append,
+)
+from src.metrics import get_registry
+from src.service import PersonaService, create_app
+
+PERSONA = {
+    "interests": {
+        "Gardening": {
+            "description": "Posts about growing vegetables",
+            "evidence": ["garden"],
+        }
+    }
+}
+
+
+class CannedOpenAIClient:
+    """Chat completions stand-in that always returns the same persona."""
+
+    def __init__(self):
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._create))
+
+    def _create(self, **request):
+        message = SimpleNamespace(content=json.dumps(PERSONA))
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+def record_fixtures(directory: str) -> None:
+    """Record user "bob" and the model's answer for him into ``directory``."""
+    user_data = make_user(40, seed=3)
+    user_data["username"] = "bob"
+    _append(
+        os.path.join(directory, SCRAPES_FILE),
+        {"username": "bob", "user_data": user_data},
+        threading.Lock(),
+    )
+    scraper = ReplayScraper(directory)
+    analyzer = PersonaAnalyzer(
+        client=RecordingOpenAIClient(CannedOpenAIClient(), directory)
+    )
+    analyzer.analyze_user(*analyzer.consume_pages("bob", scraper.iter_pages("bob")))
+
+
+def run(directory: str, scenario, latency: float = 0.0, error_rate: float = 0.0):
+    """Run ``scenario(client)`` against a service backed by replay fixtures."""
+
+    async def main():
+        service = PersonaService(
+            ReplayScraper(directory, latency=latency, error_rate=error_rate),
+            PersonaAnalyzer(client=ReplayOpenAIClient(directory)),
+            max_concurrency=2,
+        )
+        async with TestClient(TestServer(create_app(service))) as client:
+            return await scenario(client)
+
+    get_registry().reset()
+    return asyncio.run(main())
+
+
+def counter(name: str) -> float:
+    return get_registry().to_json()["counters"].get(name, 0)
+
+
+def test_concurrent_requests_share_one_computation(tmp_path):
+    record_fixtures(str(tmp_path))
+
+    async def scenario(client):
+        responses = await asyncio.gather(
+            *(client.get(f"/persona/{name}") for name in ["bob", "BOB", "Bob"] * 2)
+        )
+        return [(r.status, await r.json()) for r in responses]
+
+    results = run(str(tmp_path), scenario, latency=0.3)
+
+    assert [status for status, _ in results] == [200] * 6
+    body = results[0][1]
+    assert body["persona"]["interests"]["Gardening"]["description"]
+    assert body["posts"] == body["comments"] == 40
+    assert counter('llm_requests_total{outcome="ok"}') == 1
+    assert counter("service_coalesced_total") == 5
+
+
+def test_sequential_requests_compute_again(tmp_path):
+    record_fixtures(str(tmp_path))
+
+    async def scenario(client):
+        for _ in range(2):
+            assert (await client.get("/persona/bob")).status == 200
+
+    run(str(tmp_path), scenario)
+
+    assert counter('llm_requests_total{outcome="ok"}') == 2
+    assert counter("service_coalesced_total") == 0
+
+
+def test_errors_map_to_status_codes(tmp_path):
+    record_fixtures(str(tmp_path))
+
+    async def scenario(client):
+        missing = await client.get("/persona/nobody_here")
+        invalid = await client.get("/persona/!!")
+        return missing.status, (await missing.json())["error"], invalid.status
+
+    missing, error, invalid = run(str(tmp_path), scenario)
+
+    assert missing == 404
+    assert "nobody_here" in error
+    assert invalid == 400
+    assert counter('service_requests_total{status="404"}') == 1
+    assert counter('service_requests_total{status="400"}') == 1
+
+
+def test_upstream_failures_return_502(tmp_path):
+    record_fixtures(str(tmp_path))
+
+    async def scenario(client):
+        response = await client.get("/persona/bob")
+        return response.status, await response.json()
+
+    status, body = run(str(tmp_path), scenario, error_rate=1.0)
+
+    assert status == 502
+    assert "Injected error" in body["error"]
+
+
+def test_analysis_errors_are_not_reported_as_missing_users(tmp_path, monkeypatch):
+    record_fixtures(str(tmp_path))
+
+    def fail(self, *args):
+        raise ValueError("every persona category failed")
+
+    monkeypatch.setattr(PersonaAnalyzer, "analyze_user", fail)
+
+    async def scenario(client):
+        response = await client.get("/persona/bob")
+        return response.status, await response.json()
+
+    status, body = run(str(tmp_path), scenario)
+
+    assert status == 502
+    assert "every persona category failed" in body["error"]
+
+
+def test_health_and_metrics(tmp_path):
+    record_fixtures(str(tmp_path))
+
+    async def scenario(client):
+        await client.get("/persona/bob")
+        health = await (await client.get("/health")).json()
+        text = await (await client.get("/metrics")).text()
+        report = await (await client.get("/metrics?format=json")).json()
+        return health, text, report
+
+    health, text, report = run(str(tmp_path), scenario)
+
+    assert health["status"] == "ok"
+    assert health["max_concurrency"] == 2
+    assert health["running"] == health["in_flight"] == 0
+    assert 'persona_service_requests_total{status="200"} 1' in text
+    assert report["service"]["status"] == "ok"
+    assert "service.persona" in report["stages"]